@@ -0,0 +1,174 @@
+// チェック項目検索（tools/checklist_search.py が書き出すインデックスを使う）
+//
+// checklist-search.json（項目の一覧）と checklist-search.bin（文字バイグラムの
+// 転置インデックス）を、検索欄に最初にフォーカスしたときに読み込む。
+// 検索は tools/checklist_search.py の SearchReader.search() と同じ手順で行う。
+(function () {
+    "use strict";
+
+    var FIELD_BITS = 3;
+    var FIELD_MASK = (1 << FIELD_BITS) - 1;
+    var FIELD_WEIGHTS = [[2, 3], [1, 2], [4, 1]];  // [field, weight]: text, meta, body
+    var LIMIT = 20;
+
+    var root = typeof path_to_root === "string" ? path_to_root : "";
+    var loading = null;
+
+    function load() {
+        if (!loading) {
+            loading = fetch(root + "checklist-search.json")
+                .then(function (response) { return response.json(); })
+                .then(function (docs) {
+                    return fetch(root + docs.index)
+                        .then(function (response) { return response.arrayBuffer(); })
+                        .then(function (buffer) { return open(docs, buffer); });
+                });
+        }
+        return loading;
+    }
+
+    function open(docs, buffer) {
+        var header = new DataView(buffer);
+        var magic = String.fromCharCode.apply(null, new Uint8Array(buffer, 0, 4));
+        if (magic !== "CKS1") {
+            throw new Error("not a checklist search index");
+        }
+        var nkeys = header.getUint32(4, true);
+        var nentries = header.getUint32(8, true);
+        var keys = new Uint32Array(buffer, 12, nkeys);
+        var offsets = new Uint32Array(buffer, 12 + 4 * nkeys, nkeys + 1);
+        var entries = new Uint16Array(buffer, 12 + 8 * nkeys + 4, nentries);
+        return { docs: docs.docs, keys: keys, offsets: offsets, entries: entries };
+    }
+
+    function bisect(keys, value, lo) {
+        var hi = keys.length;
+        while (lo < hi) {
+            var mid = (lo + hi) >>> 1;
+            if (keys[mid] < value) {
+                lo = mid + 1;
+            } else {
+                hi = mid;
+            }
+        }
+        return lo;
+    }
+
+    function weight(mask) {
+        for (var i = 0; i < FIELD_WEIGHTS.length; i++) {
+            if (mask & FIELD_WEIGHTS[i][0]) {
+                return FIELD_WEIGHTS[i][1];
+            }
+        }
+        return 0;
+    }
+
+    // [low, high) key ranges of a query: every bigram of every term, and
+    // for a one-character term all bigrams starting with it.
+    function ranges(query) {
+        var result = {};
+        query.normalize("NFKC").toLowerCase().split(/\s+/).forEach(function (term) {
+            if (term.length === 1) {
+                var c = term.charCodeAt(0);
+                result[c * 65536] = (c + 1) * 65536;
+            }
+            for (var i = 0; i + 1 < term.length; i++) {
+                var key = term.charCodeAt(i) * 65536 + term.charCodeAt(i + 1);
+                result[key] = key + 1;
+            }
+        });
+        return Object.keys(result).map(Number).sort(function (a, b) { return a - b; })
+            .map(function (low) { return [low, result[low]]; });
+    }
+
+    function search(index, query) {
+        var scores = null;
+        var list = ranges(query);
+        if (!list.length) {
+            return [];
+        }
+        for (var r = 0; r < list.length; r++) {
+            var first = bisect(index.keys, list[r][0], 0);
+            var last = bisect(index.keys, list[r][1], first);
+            var found = new Map();
+            for (var i = index.offsets[first]; i < index.offsets[last]; i++) {
+                var entry = index.entries[i];
+                var doc = entry >>> FIELD_BITS;
+                found.set(doc, Math.max(found.get(doc) || 0, weight(entry & FIELD_MASK)));
+            }
+            if (scores !== null) {
+                found.forEach(function (score, doc) {
+                    if (scores.has(doc)) {
+                        found.set(doc, score + scores.get(doc));
+                    } else {
+                        found.delete(doc);
+                    }
+                });
+            }
+            scores = found;
+            if (!scores.size) {
+                return [];
+            }
+        }
+        return Array.from(scores.keys())
+            .sort(function (a, b) { return scores.get(b) - scores.get(a) || a - b; })
+            .slice(0, LIMIT);
+    }
+
+    function render(list, index, docs, elapsed) {
+        list.textContent = "";
+        docs.forEach(function (doc) {
+            var record = index.docs[doc];
+            var link = document.createElement("a");
+            link.href = root + record[3] + (record[4] ? "#" + record[4] : "");
+            link.textContent = record[0] + " [" + record[1] + "] " + record[2];
+            var item = document.createElement("li");
+            item.appendChild(link);
+            list.appendChild(item);
+        });
+        list.dataset.status = docs.length + " 件（" + elapsed.toFixed(2) + " ms）";
+    }
+
+    function setup() {
+        var main = document.querySelector("#content main");
+        if (!main) {
+            return;
+        }
+        var box = document.createElement("div");
+        box.id = "checklist-search";
+        var input = document.createElement("input");
+        input.type = "search";
+        input.placeholder = "チェック項目を検索（例: 責任者、1.2.A、GOVERN 1.2）";
+        input.style.width = "100%";
+        var status = document.createElement("small");
+        var list = document.createElement("ol");
+        box.appendChild(input);
+        box.appendChild(status);
+        box.appendChild(list);
+        main.insertBefore(box, main.firstChild);
+
+        input.addEventListener("focus", load, { once: true });
+        input.addEventListener("input", function () {
+            var query = input.value;
+            if (!query.trim()) {
+                list.textContent = "";
+                status.textContent = "";
+                return;
+            }
+            load().then(function (index) {
+                var start = performance.now();
+                var docs = search(index, query);
+                render(list, index, docs, performance.now() - start);
+                status.textContent = list.dataset.status;
+            }).catch(function () {
+                status.textContent = "検索インデックスを読み込めません";
+            });
+        });
+    }
+
+    if (document.readyState === "loading") {
+        document.addEventListener("DOMContentLoaded", setup);
+    } else {
+        setup();
+    }
+})();
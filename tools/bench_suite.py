@@ -0,0 +1,1171 @@
+#!/usr/bin/env python3
+"""
+生成AI利用ガイドライン チェックリスト — ベンチマークスイート
+
+生成処理のフェーズと各機能（パース・ブックの構築・回答の集約・テンプレート・書き込みエンジン・
+検索・草案・重複検出・配信・履歴・ギャップ分析・サマリーの再計算）をケースごとに計測し、
+保存済みのベースラインと比較する。しきい値を超えて遅くなった計測値があれば終了コード1で終了する。
+対象は実際の src/ch0*.md と合成コーパス。各ケースの内容は仕様書 10.10 を参照。
+
+Usage:
+    python tools/bench_suite.py [--cases CASE,...] [--set CASE.PARAM=N ...]
+                                [--repeat N] [--json FILE] [--baseline FILE]
+                                [--save-baseline] [--threshold RATIO]
+
+Baseline:
+    tools/benchmarks/baseline.json
+
+仕様書: tools/docs/excel-spec.md
+"""
+
+import argparse
+import dataclasses
+import gc
+import itertools
+import json
+import platform
+import random
+import string
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+import openpyxl
+from openpyxl import Workbook, load_workbook
+from openpyxl.styles import (
+    Alignment,
+    Border,
+    Font,
+    PatternFill,
+    Protection,
+    Side,
+)
+
+import checklist as ck
+import checklist_excel as xl
+import collect_excel
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+
+BASELINE_FILE = Path(__file__).resolve().parent / "benchmarks" / "baseline.json"
+
+SCHEMA_VERSION = 2
+
+# Synthetic scales of the phases cases (None: the real src/ch0*.md)
+SCALES = {"real": None, "1k": 1_000, "10k": 10_000, "100k": 100_000}
+
+PHASES = ("parse_chapters", "build_checklist_sheet", "build_summary_sheet",
+          "save")
+
+# Scales at or above this size are run once regardless of --repeat.
+SINGLE_RUN_ITEMS = 100_000
+
+# Timings faster than this (seconds) in the baseline are never reported as
+# regressions: they are dominated by noise.
+MIN_DELTA = 0.005
+
+LEVELS = ["Required", "Recommended", "Option"]
+TAG_SUFFIXES = [
+    "[NIST: GOVERN 2.3] [METI]",
+    "[JDLA] [IPA]",
+    "[NIST-GAI] [EU-AIA] [AIACT-JP]",
+    "[FUJITSU]",
+    "",
+]
+
+
+class BenchError(Exception):
+    """A case produced wrong results, so its timings are meaningless."""
+
+
+# ---------------------------------------------------------------------------
+# Synthetic corpus and measurement helpers
+# ---------------------------------------------------------------------------
+
+
+def write_synthetic_corpus(directory, num_items, num_chapters=7):
+    """Write chapter files with num_items items shaped like src/ch0*.md.
+
+    Every item has a 説明 and a 定義例 sub-bullet, and every third item
+    has a multi-line continuation, so the ratio of item lines to body
+    lines matches the real chapters.
+
+    Returns:
+        list of written file paths
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    per_chapter = -(-num_items // num_chapters)
+    letters = string.ascii_uppercase
+    paths = []
+    written = 0
+
+    for ch in range(1, num_chapters + 1):
+        path = directory / f"ch{ch:02d}-synthetic.md"
+        with path.open("w", encoding="utf-8") as f:
+            f.write(f"# {ch}. 合成章{ch} (SYNTHETIC)\n\n")
+            count = min(per_chapter, num_items - written)
+            for i in range(count):
+                sec, pos = divmod(i, len(letters))
+                if pos == 0:
+                    f.write(f"\n## {ch}.{sec + 1} 合成節{sec + 1}\n\n")
+                number = f"{ch}.{sec + 1}.{letters[pos]}"
+                level = LEVELS[i % len(LEVELS)]
+                tags = TAG_SUFFIXES[i % len(TAG_SUFFIXES)]
+                f.write(
+                    f"- {number}. [{level}] 合成チェック項目{number}が"
+                    f"ガイドラインに定められている {tags}\n"
+                )
+                f.write(
+                    "  - **説明**: 合成された説明文。"
+                    "定められていないと判断が遅れ、リスクが組織全体に波及する。\n"
+                )
+                if i % 3 == 0:
+                    f.write("    続きの行。名目上の規定は意味がない。\n")
+                f.write(
+                    "  - **定義例**: 「担当者が手順に従って対応し、"
+                    "結果を責任者に報告する」\n"
+                )
+            written += count
+        paths.append(path)
+
+    return paths
+
+
+def scan_parse(path, chapters):
+    """The streaming single-pass scanner."""
+    with path.open(encoding="utf-8") as f:
+        yield from ck.scan_chapter(f, chapters)
+
+
+def time_best(func, *args, repeat=3):
+    """Best wall-clock time of `repeat` runs, in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def peak_memory(func, *args):
+    """Peak traced allocation of one run, in bytes."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func(*args)
+        _current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+# ---------------------------------------------------------------------------
+# Cases
+# ---------------------------------------------------------------------------
+#
+# A case is called as case(params, repeat, tmp) and returns
+# (seconds, info): the timings compared with the baseline, and other
+# figures that are recorded and printed only. Parameters are ints and can
+# be changed with --set; timings are compared only between runs with the
+# same parameters.
+
+
+def case_phases(params, repeat, tmp):
+    """Generator phases on the real chapters or a synthetic corpus."""
+    num_items = params["items"]
+    if num_items is None:
+        paths = None
+    else:
+        paths = write_synthetic_corpus(Path(tmp) / "src", num_items)
+        if num_items >= SINGLE_RUN_ITEMS:
+            repeat = 1
+
+    best = {}
+    for _ in range(repeat):
+        timings = {}
+        start = time.perf_counter()
+        items, chapters = ck.parse_chapters(paths=paths)
+        timings["parse_chapters"] = time.perf_counter() - start
+
+        wb = Workbook()
+        tally = Counter()
+        start = time.perf_counter()
+        data_end_row = xl.build_checklist_sheet(wb, items, tally=tally)
+        timings["build_checklist_sheet"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        xl.build_summary_sheet(wb, chapters, data_end_row, tally=tally)
+        timings["build_summary_sheet"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        wb.save(Path(tmp) / "phases.xlsx")
+        timings["save"] = time.perf_counter() - start
+
+        for phase, seconds in timings.items():
+            best[phase] = min(seconds, best.get(phase, seconds))
+    return best, {"items": len(items), "repeat": repeat}
+
+
+def legacy_parse(path, chapters):
+    """The original parser: whole-file read and every regex on every line.
+
+    Extended to read the 説明/定義例 bodies the way scan_chapter does, so
+    both parsers yield the same items and only the scanning differs.
+    """
+    chapter = section = pending = body = None
+    bodies = {}
+
+    def finish():
+        number, level, raw_text = pending.groups()
+        raw_text = raw_text.strip()
+        found = ck.RE_TAG.findall(raw_text)
+        mask = 0
+        for tag, _detail in found:
+            mask |= ck.TAG_BITS[tag]
+        return ck.ChecklistItem(
+            number, item_chapter, item_section, level,
+            ck.RE_TAG.sub("", raw_text).strip(), mask,
+            tuple((tag, clause) for tag, detail in found if detail
+                  for clause in ck.split_clauses(detail)),
+            ck._join_lines(bodies["説明"]) if bodies.get("説明") else "",
+            ck._join_lines(bodies["定義例"]) if bodies.get("定義例") else "",
+        )
+
+    for line in path.read_text(encoding="utf-8").splitlines():
+        stripped = line.strip()
+        m = ck.RE_CHAPTER.match(line)
+        n = ck.RE_SECTION.match(line)
+        i = ck.RE_ITEM.match(line)
+        b = ck.RE_BODY.match(stripped)
+        if line[:1] == " ":
+            if pending is None:
+                continue
+            if b:
+                label, text = b.groups()
+                body = bodies.setdefault(label, [])
+                if text:
+                    body.append(text.strip())
+            elif not stripped or stripped[:2] == "- ":
+                body = None
+            elif body is not None and stripped[:4] != "<!--":
+                body.append(stripped)
+            continue
+        body = None
+        if pending is not None and line[:2] in ("- ", "# ", "##"):
+            yield finish()
+            pending = None
+            bodies = {}
+        if m:
+            chapter = ck.Chapter(int(m.group(1)), m.group(2).strip())
+            chapters[chapter.num] = chapter.title
+        elif n:
+            section = ck.Section(n.group(1), n.group(2).strip())
+        elif i:
+            pending, item_chapter, item_section = i, chapter, section
+    if pending is not None:
+        yield finish()
+
+
+PARSERS = [("legacy", legacy_parse), ("scanner", scan_parse)]
+
+
+def _collect(parser, paths):
+    chapters = {}
+    items = []
+    for path in paths:
+        items.extend(parser(path, chapters))
+    return items
+
+
+def _count(parser, paths):
+    chapters = {}
+    n = 0
+    for path in paths:
+        for _item in parser(path, chapters):
+            n += 1
+    return n
+
+
+def case_parse(params, repeat, tmp):
+    """Whole-file regex parser against the streaming scanner.
+
+    Both must yield the same items. Info: peak memory collecting every item into a list and streaming
+    them, per parser.
+    """
+    paths = write_synthetic_corpus(tmp, params["items"])
+    seconds, info = {}, {}
+    results = []
+    for name, parser in PARSERS:
+        results.append(_collect(parser, paths))
+        seconds[name] = time_best(_collect, parser, paths, repeat=repeat)
+        info[f"{name} peak (list)"] = peak_memory(_collect, parser, paths)
+        info[f"{name} peak (stream)"] = peak_memory(_count, parser, paths)
+    if any(items != results[0] for items in results):
+        raise BenchError("parsers disagree on the items")
+    return seconds, info
+
+
+def _build_corpus(paths, write_only, out):
+    """Parse the corpus and build + save both sheets."""
+    chapters = {}
+    items = (item for path in paths for item in scan_parse(path, chapters))
+    wb = Workbook(write_only=write_only)
+    data_end_row = xl.build_checklist_sheet(wb, items)
+    xl.build_summary_sheet(wb, chapters, data_end_row)
+    wb.save(out)
+
+
+STYLE_CLASSES = (Font, PatternFill, Alignment, Border, Side, Protection)
+
+
+@contextmanager
+def count_instances(classes):
+    """Count constructor calls of the given classes inside the block."""
+    counts = Counter()
+    originals = {cls: cls.__init__ for cls in classes}
+
+    def counting(cls, init):
+        def __init__(self, *args, **kwargs):
+            counts[cls.__name__] += 1
+            init(self, *args, **kwargs)
+        return __init__
+
+    for cls, init in originals.items():
+        cls.__init__ = counting(cls, init)
+    try:
+        yield counts
+    finally:
+        for cls, init in originals.items():
+            cls.__init__ = init
+
+
+def case_build(params, repeat, tmp):
+    """Regular against write-only (streaming) workbooks, build + save.
+
+    Info: peak memory and style objects constructed, per mode.
+    """
+    paths = write_synthetic_corpus(Path(tmp) / "src", params["items"])
+    out = Path(tmp) / "build.xlsx"
+    seconds, info = {}, {}
+    for name, write_only in [("regular", False), ("streaming", True)]:
+        seconds[name] = time_best(_build_corpus, paths, write_only, out,
+                                  repeat=1)
+        info[f"{name} peak"] = peak_memory(_build_corpus, paths, write_only,
+                                           out)
+        with count_instances(STYLE_CLASSES) as counts:
+            _build_corpus(paths, write_only, out)
+        info[f"{name} style objects"] = sum(counts.values())
+    return seconds, info
+
+
+def write_returned_workbooks(directory, num_files, variants=10):
+    """Write num_files filled-in copies of the real checklist.
+
+    A few answer variants are built and then copied, so that setup time
+    stays small next to the reads being measured.
+    """
+    directory = Path(directory)
+    items = list(ck.iter_items())
+    chapters = {item.chapter_num: item.chapter for item in items}
+    statuses = ck.CHECK_STATUSES + [""]
+    sources = []
+    for k in range(variants):
+        rng = random.Random(k)
+        answers = {
+            item.number: ck.Answer(
+                rng.choice(statuses), "備考" if rng.random() < 0.1 else ""
+            )
+            for item in items
+        }
+        wb = Workbook()
+        data_end_row = xl.build_checklist_sheet(wb, items, answers=answers)
+        xl.build_summary_sheet(wb, chapters, data_end_row)
+        path = directory / f"variant{k}.xlsx"
+        wb.save(path)
+        sources.append(path.read_bytes())
+
+    paths = []
+    for n in range(num_files):
+        path = directory / f"dept{n:04d}.xlsx"
+        path.write_bytes(sources[n % variants])
+        paths.append(path)
+    return paths
+
+
+def openpyxl_read(path):
+    """Baseline reader: openpyxl read-only mode, every column of A–Q."""
+    wb = load_workbook(path, read_only=True, data_only=True)
+    answers = {}
+    ws = wb[collect_excel.CHECKLIST_SHEET]
+    for row in ws.iter_rows(min_row=ck.DATA_START_ROW, max_col=len(ck.COLUMNS),
+                            values_only=True):
+        if row[1]:
+            answers[row[1]] = ck.Answer(row[0] or "", row[15] or "",
+                                        row[16] or "")
+    wb.close()
+    return answers
+
+
+def case_collect(params, repeat, tmp):
+    """Reading returned workbooks: openpyxl read-only against the XML reader.
+
+    Timings are per file.
+    """
+    paths = write_returned_workbooks(tmp, params["files"])
+    seconds = {}
+    results = {}
+    for name, read in [
+        ("openpyxl", openpyxl_read),
+        ("xml", lambda path: collect_excel.read_response(path).answers),
+    ]:
+        start = time.perf_counter()
+        results[name] = [read(path) for path in paths]
+        seconds[name] = (time.perf_counter() - start) / len(paths)
+    if results["openpyxl"] != results["xml"]:
+        raise BenchError("collect readers disagree")
+    return seconds, {}
+
+
+def case_template(params, repeat, tmp):
+    """Personalised copies: full rebuild against template patching.
+
+    Timings are per workbook. The outputs are compared by check_excel.py.
+    """
+    items = list(ck.iter_items())
+    chapters = {item.chapter_num: item.chapter for item in items}
+    template = xl.load_template(items, chapters)
+    statuses = ck.CHECK_STATUSES + [""]
+    copies = params["copies"]
+    rebuild = patch = 0.0
+    for n in range(copies):
+        rng = random.Random(n)
+        answers = {
+            item.number: ck.Answer(rng.choice(statuses), f"備考 {n} & <x>")
+            for item in items
+        }
+        respondent = ck.Respondent(f"組織{n}", "記入者", "2026-04-01")
+
+        start = time.perf_counter()
+        wb, _, _ = xl.build_workbook(
+            items, chapters, answers=answers, respondent=respondent
+        )
+        wb.save(Path(tmp) / "full.xlsx")
+        rebuild += time.perf_counter() - start
+
+        start = time.perf_counter()
+        template.personalize(Path(tmp) / "patched.xlsx", answers, respondent)
+        patch += time.perf_counter() - start
+    return {"rebuild": rebuild / copies, "template": patch / copies}, {}
+
+
+def case_engines(params, repeat, tmp):
+    """Writer engines (openpyxl / fast), build + save.
+
+    Their outputs are compared by check_excel.py.
+    """
+    paths = write_synthetic_corpus(Path(tmp) / "src", params["items"])
+    items, chapters = ck.parse_chapters(paths=paths)
+
+    def build(engine):
+        wb, _, direct_rows = xl.build_workbook(
+            items, dict(chapters), writer=engine
+        )
+        xl.save_workbook(wb, Path(tmp) / f"{engine}.xlsx",
+                         direct_rows=direct_rows)
+
+    seconds = {}
+    for engine in xl.WRITER_ENGINES:
+        (Path(tmp) / f"{engine}.xlsx").unlink(missing_ok=True)
+        seconds[engine] = time_best(build, engine, repeat=repeat)
+    return seconds, {"speedup": seconds["openpyxl"] / seconds["fast"]}
+
+
+SEARCH_QUERIES = ["合成", "責任者に報告", "3.2.b", "govern", "リスク 波及", "項",
+                  "存在しない語句"]
+
+
+def case_search(params, repeat, tmp):
+    """Search index: full build, one-chapter update, mean query time.
+
+    A query fails the case when an item containing every term (in any
+    field) is not among its results.
+    """
+    import checklist_search as cs
+
+    paths = write_synthetic_corpus(tmp, params["items"])
+    parsed = {path: list(scan_parse(path, {})) for path in paths}
+    index = cs.SearchIndex(paths)
+
+    def full():
+        for path in paths:
+            index.update(path, parsed[path])
+        return index.build()
+
+    def chapter():
+        index.update(paths[0], parsed[paths[0]])
+        return index.build()
+
+    seconds = {"full": time_best(full, repeat=repeat),
+               "chapter": time_best(chapter, repeat=repeat)}
+    _records, data = index.build()
+    reader = cs.SearchReader(data)
+
+    def queries():
+        for query in SEARCH_QUERIES:
+            reader.search(query)
+
+    seconds["query"] = time_best(queries, repeat=repeat) / len(SEARCH_QUERIES)
+
+    items = [item for path in paths for item in parsed[path]]
+    texts = [
+        "\n".join(cs.normalize(text)
+                  for _field, text in cs.document(item, "")[1])
+        for item in items
+    ]
+    missed = []
+    for query in SEARCH_QUERIES:
+        terms = cs.normalize(query).split()
+        expected = {doc for doc, text in enumerate(texts)
+                    if all(term in text for term in terms)}
+        if not expected <= set(reader.search(query, limit=None)):
+            missed.append(query)
+    if missed:
+        raise BenchError(f"search misses items for {missed}")
+    return seconds, {"asset bytes": len(data)}
+
+
+def case_sample(params, repeat, tmp):
+    """Guideline draft: full render, one changed 定義例, nothing changed.
+
+    The incremental render must equal a full render of the same items.
+    """
+    import checklist_sample as cs
+
+    paths = write_synthetic_corpus(tmp, params["items"])
+    items = [item for path in paths for item in scan_parse(path, {})]
+    renderer = cs.SampleRenderer()
+    seconds = {"full": time_best(
+        lambda: cs.SampleRenderer().render(items), repeat=repeat
+    )}
+    renderer.render(items)
+    edits = itertools.count()
+    pos = len(items) // 2
+
+    def item():
+        items[pos] = dataclasses.replace(
+            items[pos], example=f"「変更{next(edits)}」"
+        )
+        return renderer.render(items)
+
+    seconds["item"] = time_best(item, repeat=repeat)
+    rendered = renderer.rendered
+    seconds["unchanged"] = time_best(renderer.render, items, repeat=repeat)
+    if not (renderer.render(items) == cs.SampleRenderer().render(items)
+            and rendered == 1 and renderer.rendered == 0):
+        raise BenchError("incremental draft differs from a full render")
+    return seconds, {"sections": renderer.reused}
+
+
+OVERLAP_ALPHABET = [chr(c) for c in range(0x4E00, 0x4E00 + 400)]
+
+
+def overlap_items(num_items, seed=0):
+    """Return items with random texts; every 10th is a near copy.
+
+    A copy changes about one character in ten of an earlier item's
+    text, which keeps their shingle Jaccard similarity near 0.5–0.7.
+    """
+    rng = random.Random(seed)
+    texts = []
+    for n in range(num_items):
+        if n % 10 == 9:
+            text = [ch if rng.random() > 0.1 else rng.choice(OVERLAP_ALPHABET)
+                    for ch in texts[rng.randrange(n)]]
+        else:
+            text = rng.choices(OVERLAP_ALPHABET, k=60)
+        texts.append(text)
+    return [
+        ck.ChecklistItem(f"{n}", None, None, LEVELS[n % len(LEVELS)],
+                         "".join(text), 0)
+        for n, text in enumerate(texts)
+    ]
+
+
+def case_overlap(params, repeat, tmp, threshold=0.5):
+    """Similar items: signatures, re-hash of one item, LSH, all pairs.
+
+    LSH may miss at most 5% of the pairs at or above `threshold`.
+    """
+    import checklist_overlap as co
+
+    items = overlap_items(params["items"])
+    cache = co.SignatureCache()
+    seconds = {"hash": time_best(
+        lambda: co.find_overlaps(items, co.SignatureCache(), threshold),
+        repeat=1,
+    )}
+    co.find_overlaps(items, cache, threshold)   # fill the cache
+    edits = itertools.count()
+
+    def rehash():
+        items[0] = dataclasses.replace(items[0],
+                                       text=f"{items[0].text}{next(edits)}")
+        return co.find_overlaps(items, cache, threshold)
+
+    seconds["rehash"] = time_best(rehash, repeat=repeat)
+    seconds["lsh"] = time_best(co.find_overlaps, items, cache, threshold,
+                               repeat=repeat)
+
+    sets = [co.shingles(co.item_text(item)) for item in items]
+
+    def brute():
+        return {
+            (items[i].number, items[j].number)
+            for i, j in itertools.combinations(range(len(sets)), 2)
+            if co.jaccard(sets[i], sets[j]) >= threshold
+        }
+
+    seconds["brute"] = time_best(brute, repeat=1)
+    found = {(o.first.number, o.second.number)
+             for o in co.find_overlaps(items, cache, threshold)}
+    missed = len(brute() - found)
+    if missed > len(found) // 20:
+        raise BenchError("LSH misses more than 5% of the similar pairs")
+    return seconds, {"pairs found": len(found), "pairs missed": missed}
+
+
+async def _fetch_all(port, targets, concurrency):
+    """GET every target over `concurrency` keep-alive connections.
+
+    Returns (per-request latencies in seconds, wall-clock seconds,
+    X-Cache header values).
+    """
+    import asyncio
+
+    async def client(queue, latencies, caches):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        try:
+            while not queue.empty():
+                target = queue.get_nowait()
+                start = time.perf_counter()
+                writer.write(
+                    f"GET {target} HTTP/1.1\r\nHost: bench\r\n\r\n"
+                    .encode("ascii")
+                )
+                status = await reader.readline()
+                headers = {}
+                while (line := await reader.readline()) not in (b"\r\n", b""):
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.lower()] = value.strip()
+                await reader.readexactly(int(headers["content-length"]))
+                latencies.append(time.perf_counter() - start)
+                if b" 200 " not in status:
+                    raise BenchError(f"{target}: {status.decode().strip()}")
+                caches.append(headers.get("x-cache"))
+        finally:
+            writer.close()
+            await writer.wait_closed()
+
+    queue = asyncio.Queue()
+    for target in targets:
+        queue.put_nowait(target)
+    latencies, caches = [], []
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        client(queue, latencies, caches) for _ in range(concurrency)
+    ))
+    return latencies, time.perf_counter() - start, caches
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def case_serve(params, repeat, tmp):
+    """HTTP service latency: distinct requests (cold), then repeated (warm).
+
+    serve_excel and the clients share one event loop; workbooks are built
+    in a process pool as in the service. Every cold request must miss the
+    cache and every warm one hit it.
+    """
+    import asyncio
+    from concurrent.futures import ProcessPoolExecutor
+
+    import serve_excel
+
+    paths = write_synthetic_corpus(tmp, params["items"])
+    requests = params["requests"]
+    targets = [
+        f"/checklist.xlsx?organization=org{n:04d}&level=Required,Recommended"
+        for n in range(requests)
+    ]
+
+    async def run(executor):
+        service = serve_excel.ChecklistService(
+            executor,
+            render_cache=serve_excel.RenderCache(requests, 1 << 30),
+            paths=paths,
+        )
+        server = await serve_excel.start_server(service, port=0)
+        port = server.sockets[0].getsockname()[1]
+        seconds, info = {}, {}
+        async with server:
+            for phase in ("cold", "warm"):
+                latencies, wall, caches = await _fetch_all(
+                    port, targets, params["concurrency"]
+                )
+                seconds[f"{phase} p50"] = _percentile(latencies, 0.50)
+                seconds[f"{phase} p95"] = _percentile(latencies, 0.95)
+                info[f"{phase} req/s"] = len(latencies) / wall
+                info[f"{phase} cache hits"] = caches.count("hit")
+        return seconds, info
+
+    with ProcessPoolExecutor() as executor:
+        executor.submit(int).result()   # fork before any connection
+        seconds, info = asyncio.run(run(executor))
+    if info["cold cache hits"] or info["warm cache hits"] != requests:
+        raise BenchError("unexpected cache hits/misses")
+    return seconds, info
+
+
+def case_history(params, repeat, tmp):
+    """History store: inserts, then trend queries on the rollup tables.
+
+    `scan` is the quarterly trend aggregated from the answers table
+    instead; both must give the same numbers.
+    """
+    import sqlite3
+
+    import history_excel as hx
+
+    items = list(ck.iter_items())
+    db_path = Path(tmp) / "history.sqlite3"
+    statuses = ck.CHECK_STATUSES + [""]
+    answers = 0
+    start = time.perf_counter()
+    with hx.HistoryStore(db_path) as store:
+        for q in range(params["quarters"]):
+            assessed_on = f"{2020 + q // 4}-{q % 4 * 3 + 1:02d}-15"
+            records = []
+            for unit in range(params["units"]):
+                rng = random.Random(unit * 1000 + q)
+                records.append(hx.Record(
+                    f"unit{unit:04d}", assessed_on, "1.0.0",
+                    tuple(
+                        (item.number, item.chapter_num, item.level,
+                         rng.choice(statuses), None, None)
+                        for item in items
+                    ),
+                ))
+            answers += store.add(records)
+    seconds = {"insert": time.perf_counter() - start}
+
+    queries = [
+        ("one unit", ["unit0000"], False),
+        ("all units", (), False),
+        ("quarterly", (), True),
+    ]
+    with hx.HistoryStore(db_path) as store:
+        for name, organizations, quarterly in queries:
+            seconds[name] = time_best(store.trend, "chapter", organizations,
+                                      quarterly, repeat=repeat)
+
+    db = sqlite3.connect(db_path)
+
+    def scan():
+        return db.execute(
+            "SELECT a.quarter, n.chapter, COUNT(*), "
+            "SUM(n.status = '対応済'), "
+            "SUM(n.level = 'Required'), "
+            "SUM(n.level = 'Required' AND n.status = '対応済') "
+            "FROM answers n JOIN assessments a ON a.id = n.assessment_id "
+            "GROUP BY a.quarter, n.chapter ORDER BY a.quarter, n.chapter"
+        ).fetchall()
+
+    seconds["scan"] = time_best(scan, repeat=1)
+    with hx.HistoryStore(db_path) as store:
+        rollup = store.trend("chapter", quarterly=True)
+    scanned = scan()
+    db.close()
+    if [
+        (r["quarter"], r["chapter"], r["total"], r["done"],
+         round(r["required_rate"] or 0, 9))
+        for r in rollup
+    ] != [
+        (q, chapter, total, done, round(req_done / req if req else 0, 9))
+        for q, chapter, total, done, req, req_done in scanned
+    ]:
+        raise BenchError("history rollups differ from the answers table")
+    return seconds, {"answers/s": answers / seconds["insert"]}
+
+
+def python_gap(statuses, items, top):
+    """Per-organization loops over dicts: the reference for gap_excel.
+
+    Returns (rates, priorities) as lists per organization, in the
+    RATE_COLUMNS and priority order of gap_excel.analyze().
+    """
+    import gap_excel as gx
+
+    groups = [
+        [True] * len(items),
+        [item.level == "Required" for item in items],
+        *([item.has_tag(tag) for item in items] for tag in ck.REFERENCE_TAGS),
+    ]
+    weights = [1 + len(item.tags) for item in items]
+    ranks = {level: rank for rank, level in enumerate(ck.LEVELS)}
+    results = []
+    for answers in statuses:
+        rates = []
+        for group in groups:
+            total = sum(group)
+            done = sum(1 for on, status in zip(group, answers)
+                       if on and status == "対応済")
+            rates.append(done / total if total else None)
+        scored = []
+        for i, (item, status) in enumerate(zip(items, answers)):
+            score = gx.GAP[status] * weights[i]
+            if score > 0:
+                scored.append((ranks.get(item.level, len(ck.LEVELS)),
+                               -score, i))
+        results.append((rates, [i for *_key, i in sorted(scored)[:top]]))
+    return results
+
+
+def case_gap(params, repeat, tmp, top=10, seed=0):
+    """Gap analysis of random answers: python_gap() against NumPy.
+
+    `json` is the time of the JSON records of the analysis. Both
+    implementations must give the same rates and priorities.
+    """
+    import numpy as np
+
+    import gap_excel as gx
+
+    items = list(ck.iter_items())
+    units = params["units"]
+    rng = np.random.default_rng(seed)
+    status = rng.integers(0, len(gx.STATUSES), (units, len(items)),
+                          dtype=np.uint8)
+    matrix = gx.AnswerMatrix(tuple(items),
+                             tuple(f"組織{o:05d}" for o in range(units)),
+                             ("",) * units, status)
+    statuses = [[gx.STATUSES[code] for code in row]
+                for row in status.tolist()]
+
+    reference = python_gap(statuses, items, top)
+    analysis = gx.analyze(matrix, top)
+    seconds = {
+        "python": time_best(python_gap, statuses, items, top, repeat=1),
+        "numpy": time_best(gx.analyze, matrix, top, repeat=repeat),
+        "json": time_best(gx.gap_records, analysis, repeat=1),
+    }
+    mismatched = 0
+    for o, (rates, priorities) in enumerate(reference):
+        got = [i for i in analysis.priorities[o].tolist() if i >= 0]
+        expected = np.array([np.nan if r is None else r for r in rates])
+        if got != priorities or not np.allclose(
+                analysis.rates[o], expected, equal_nan=True):
+            mismatched += 1
+    if mismatched:
+        raise BenchError(f"gap analysis differs from the reference for "
+                         f"{mismatched} organizations")
+    return seconds, {"items": len(items),
+                     "speedup": seconds["python"] / seconds["numpy"]}
+
+
+def countblank(values):
+    """COUNTBLANK for pycel, which does not implement it (see plugins)."""
+    return sum(1 for row in values for v in row if v in (None, ""))
+
+
+def case_recalc(params, repeat, tmp, edits=20):
+    """Summary engines under pycel: full calculation, then recalculation.
+
+    `calc` evaluates every count cell of the summary from scratch;
+    `recalc` changes `edits` answers in column A and evaluates again.
+    The values are compared by check_excel.py.
+    """
+    from pycel import ExcelCompiler
+
+    paths = write_synthetic_corpus(tmp, params["items"])
+    out = Path(tmp) / "recalc.xlsx"
+    rng = random.Random(0)
+    statuses = ck.CHECK_STATUSES + [""]
+    answers = {
+        item.number: ck.Answer(rng.choice(statuses))
+        for path in paths
+        for item in scan_parse(path, {})
+    }
+    rng = random.Random(1)
+    seconds = {}
+    for engine in ck.SUMMARY_ENGINES:
+        chapters = {}
+        tally = Counter()
+        items = (item for path in paths for item in scan_parse(path, chapters))
+        wb = Workbook()
+        data_end_row = xl.build_checklist_sheet(
+            wb, items, answers=answers, tally=tally,
+        )
+        xl.build_summary_sheet(
+            wb, chapters, data_end_row, engine=engine, tally=tally
+        )
+        wb.save(out)
+
+        cells = [
+            f"サマリー!{col}{row}"
+            for row in [*range(3, 8), *range(12, 15), *range(18, 25)]
+            for col in "BCDEFGHI"
+        ]
+        excel = ExcelCompiler(filename=str(out), plugins=("bench_suite",))
+        start = time.perf_counter()
+        for cell in cells:
+            excel.evaluate(cell)
+        seconds[f"{engine} calc"] = time.perf_counter() - start
+
+        edited = [
+            f"チェックリスト!A{rng.randint(ck.DATA_START_ROW, data_end_row)}"
+            for _ in range(edits)
+        ]
+        for cell in edited:
+            excel.evaluate(cell)  # set_value needs the cell in the map
+        start = time.perf_counter()
+        for cell in edited:
+            excel.set_value(cell, "対応済")
+        for cell in cells:
+            excel.evaluate(cell)
+        seconds[f"{engine} recalc"] = time.perf_counter() - start
+    return seconds, {}
+
+
+# Case name -> (function, default parameters, optional module it needs)
+CASES = {
+    **{
+        f"phases-{scale}": (case_phases, {"items": num_items}, None)
+        for scale, num_items in SCALES.items()
+    },
+    "parse": (case_parse, {"items": 100_000}, None),
+    "build": (case_build, {"items": 10_000}, None),
+    "collect": (case_collect, {"files": 200}, None),
+    "template": (case_template, {"copies": 20}, None),
+    "engines": (case_engines, {"items": 20_000}, None),
+    "search": (case_search, {"items": 5_000}, None),
+    "sample": (case_sample, {"items": 5_000}, None),
+    "overlap": (case_overlap, {"items": 1_000}, None),
+    "serve": (case_serve,
+              {"items": 2_000, "requests": 200, "concurrency": 8}, None),
+    "history": (case_history, {"units": 200, "quarters": 20}, None),
+    "gap": (case_gap, {"units": 10_000}, "numpy"),
+    "recalc": (case_recalc, {"items": 2_000}, "pycel"),
+}
+
+
+def environment():
+    return {
+        "python": platform.python_version(),
+        "openpyxl": openpyxl.__version__,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Baseline comparison
+# ---------------------------------------------------------------------------
+
+
+def compare(results, baseline, threshold):
+    """Return rows of (case, metric, baseline s, current s, ratio, regressed).
+
+    A case is compared only if it ran with the same parameters (and on
+    the same number of items) in both result sets.
+    """
+    rows = []
+    for name, entry in results["cases"].items():
+        base_entry = baseline.get("cases", {}).get(name)
+        if (base_entry is None
+                or base_entry["params"] != entry["params"]
+                or base_entry["info"].get("items")
+                != entry["info"].get("items")):
+            continue
+        for metric, current in entry["seconds"].items():
+            base = base_entry["seconds"].get(metric)
+            if base is None:
+                continue
+            ratio = current / base if base else float("inf")
+            regressed = (
+                ratio > 1 + threshold and current - base > MIN_DELTA
+            )
+            rows.append((name, metric, base, current, ratio, regressed))
+    return rows
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+
+def _format_info(value):
+    if isinstance(value, float):
+        return f"{value:.2f}"
+    return str(value)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Time the Excel generator and its features against a "
+        "baseline."
+    )
+    parser.add_argument(
+        "--cases",
+        default=",".join(CASES),
+        help="comma-separated cases to run; 'phases' selects every "
+        "phases-* case (default: all)",
+    )
+    parser.add_argument(
+        "--set",
+        action="append",
+        default=[],
+        metavar="CASE.PARAM=N",
+        help="change a case parameter, e.g. serve.requests=50 (repeatable)",
+    )
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="runs per timing; the best time is kept")
+    parser.add_argument("--json", type=Path, metavar="FILE",
+                        help="write the results as JSON")
+    parser.add_argument(
+        "--baseline",
+        type=Path,
+        default=BASELINE_FILE,
+        metavar="FILE",
+        help="baseline to compare against (default: %(default)s)",
+    )
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="write the results to the baseline file")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        metavar="RATIO",
+        help="allowed slowdown per timing before failing (default: 0.25)",
+    )
+    args = parser.parse_args(argv)
+
+    cases = []
+    for name in (s.strip() for s in args.cases.split(",")):
+        if name == "phases":
+            cases += [case for case in CASES if case.startswith("phases-")]
+        elif name in CASES:
+            cases.append(name)
+        elif name:
+            parser.error(f"unknown case: {name}")
+    args.cases = list(dict.fromkeys(cases))
+
+    args.params = {name: dict(CASES[name][1]) for name in args.cases}
+    for setting in args.set:
+        key, _, value = setting.partition("=")
+        name, _, param = key.partition(".")
+        if name not in args.params or param not in args.params[name]:
+            parser.error(f"unknown parameter: {key}")
+        try:
+            args.params[name][param] = int(value)
+        except ValueError:
+            parser.error(f"{key} must be a number")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    results = {
+        "schema": SCHEMA_VERSION,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "environment": environment(),
+        "cases": {},
+    }
+
+    failed = []
+    for name in args.cases:
+        func, _defaults, needs = CASES[name]
+        params = args.params[name]
+        settings = ", ".join(f"{k}={v}" for k, v in params.items()
+                             if v is not None)
+        print(f"\n{name}" + (f" ({settings})" if settings else ""))
+        if needs:
+            try:
+                __import__(needs)
+            except ImportError:
+                print("  skipped (pip install -r "
+                      "tools/requirements-optional.txt)")
+                continue
+        with tempfile.TemporaryDirectory() as tmp:
+            try:
+                seconds, info = func(params, args.repeat, tmp)
+            except BenchError as e:
+                print(f"Error: {name}: {e}", file=sys.stderr)
+                failed.append(name)
+                continue
+        results["cases"][name] = {
+            "params": params, "seconds": seconds, "info": info,
+        }
+        for metric, value in seconds.items():
+            print(f"  {metric:<22} {value * 1000:>11.3f}ms")
+        for key, value in info.items():
+            print(f"  {key:<22} {_format_info(value):>13}")
+
+    text = json.dumps(results, indent=2, ensure_ascii=False) + "\n"
+    if args.json:
+        args.json.write_text(text, encoding="utf-8")
+        print(f"\nResults: {args.json}")
+
+    if failed:
+        sys.exit(1)
+
+    if args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(text, encoding="utf-8")
+        print(f"Baseline saved: {args.baseline}")
+        return
+
+    if not args.baseline.exists():
+        print(f"No baseline at {args.baseline}; nothing to compare.")
+        return
+
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    if baseline.get("schema") != SCHEMA_VERSION:
+        print(f"Baseline {args.baseline} has another schema; "
+              "re-record it with --save-baseline.", file=sys.stderr)
+        sys.exit(1)
+    if baseline.get("environment") != results["environment"]:
+        print(
+            "Warning: baseline was recorded in a different environment "
+            f"({baseline.get('environment')}).",
+            file=sys.stderr,
+        )
+
+    rows = compare(results, baseline, args.threshold)
+    regressions = [row for row in rows if row[5]]
+    print(f"\nAgainst baseline {args.baseline} (threshold +{args.threshold:.0%}):")
+    for name, metric, base, current, ratio, regressed in rows:
+        mark = "REGRESSION" if regressed else ""
+        print(
+            f"{name:<12} {metric:<22} {base * 1000:>10.3f}ms -> "
+            f"{current * 1000:>10.3f}ms  {ratio:>5.2f}x {mark}"
+        )
+    if regressions:
+        print(f"Error: {len(regressions)} timings regressed.", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+生成AI利用ガイドライン チェックリスト — Excel 出力の整合性チェック
+
+src/ch*.md から作るブックについて、次の出力が一致することを確認する。
+
+- 書き込みエンジン（openpyxl / fast）: 集計方式ごとに両エンジンで生成したブックがバイト単位で同じ
+  （異なる場合は openpyxl で読み戻し、値・スタイル・セル結合・入力規則・条件付き書式・保護を
+  シートごとに比較して、異なるシートを表示する）
+- テンプレートの書き換え（--template）: 回答と記入欄を埋めたコピーが通常の生成とバイト単位で同じ
+- サマリーの集計方式（countifs / static）: pycel で計算したサマリーの値が同じ
+  （pycel が未インストールなら省略）
+
+回答には「=」で始まる文字列やエラー値と同じ文字列を含める。
+いずれかが一致しなければ終了コード1で終了する（CI の structure ジョブで実行）。
+
+Usage:
+    python tools/check_excel.py [--seed N]
+
+仕様書: tools/docs/excel-spec.md
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+from io import BytesIO
+from pathlib import Path
+
+from openpyxl import load_workbook
+
+import checklist as ck
+import checklist_excel as xl
+
+# Answer texts that must stay text in every writer
+TRICKY_TEXTS = ["=1+1", '=HYPERLINK("x")', "#N/A", " 前後に空白 ", "&<>", ""]
+
+
+def sample_answers(items, seed=0):
+    """Return random answers to `items`, some with TRICKY_TEXTS."""
+    rng = random.Random(seed)
+    statuses = ck.CHECK_STATUSES + [""]
+    return {
+        item.number: ck.Answer(
+            rng.choice(statuses),
+            rng.choice(TRICKY_TEXTS),
+            rng.choice(TRICKY_TEXTS),
+        )
+        for item in items
+        if rng.random() < 0.8
+    }
+
+
+SAMPLE_RESPONDENT = ck.Respondent("=総務部", "記入者", "2026-04-01")
+
+
+# ---------------------------------------------------------------------------
+# Writer engines and templates
+# ---------------------------------------------------------------------------
+
+
+def _sheet_snapshot(ws):
+    """Return everything two writers must agree on for a sheet."""
+    cells = {
+        cell.coordinate: (
+            cell.value, cell.data_type, cell.number_format, repr(cell.font),
+            repr(cell.fill), repr(cell.alignment), repr(cell.border),
+            repr(cell.protection),
+        )
+        for row in ws.iter_rows()
+        for cell in row
+    }
+    return {
+        "cells": cells,
+        "dimensions": ws.dimensions,
+        "merged": sorted(str(r) for r in ws.merged_cells.ranges),
+        "validations": [
+            (dv.formula1, str(dv.sqref))
+            for dv in ws.data_validations.dataValidation
+        ],
+        "conditional": sorted(
+            (str(rng.sqref), rule.operator, tuple(rule.formula or ()))
+            for rng in ws.conditional_formatting
+            for rule in rng.rules
+        ),
+        "protection": ws.protection.sheet,
+        "freeze": ws.freeze_panes,
+    }
+
+
+def differing_sheets(data, other):
+    """Return the names of the sheets that differ between two workbooks."""
+    reference, other = (load_workbook(BytesIO(d)) for d in (data, other))
+    names = reference.sheetnames + [
+        name for name in other.sheetnames if name not in reference.sheetnames
+    ]
+    return [
+        name for name in names
+        if name not in reference.sheetnames or name not in other.sheetnames
+        or _sheet_snapshot(reference[name]) != _sheet_snapshot(other[name])
+    ]
+
+
+def build_bytes(items, chapters, summary, writer, answers=None,
+                respondent=ck.NO_RESPONDENT):
+    wb, _, direct_rows = xl.build_workbook(
+        items, dict(chapters), summary=summary, answers=answers,
+        respondent=respondent, writer=writer,
+    )
+    return xl.workbook_bytes(wb, True, direct_rows)
+
+
+def check_writers(items, chapters, answers):
+    """Compare the writer engines for every summary engine.
+
+    Returns a list of problems (empty if all agree).
+    """
+    problems = []
+    for summary in ck.SUMMARY_ENGINES:
+        outputs = {
+            writer: build_bytes(items, chapters, summary, writer, answers,
+                                SAMPLE_RESPONDENT)
+            for writer in ck.WRITER_ENGINES
+        }
+        reference, *others = ck.WRITER_ENGINES
+        for writer in others:
+            if outputs[writer] != outputs[reference]:
+                sheets = differing_sheets(outputs[reference], outputs[writer])
+                problems.append(
+                    f"--summary {summary}: {writer} differs from {reference}"
+                    f" (sheets: {', '.join(sheets) or 'bytes only'})"
+                )
+    return problems
+
+
+def check_templates(items, chapters, answers, directory):
+    """Compare patched template copies with full rebuilds."""
+    problems = []
+    for summary in ck.SUMMARY_ENGINES:
+        if summary == "static":
+            continue    # templates need a formula summary
+        template = xl.load_template(items, chapters, summary=summary)
+        path = Path(directory) / f"template-{summary}.xlsx"
+        template.personalize(path, answers, SAMPLE_RESPONDENT,
+                             reproducible=True)
+        patched = path.read_bytes()
+        rebuilt = build_bytes(items, chapters, summary, "openpyxl", answers,
+                              SAMPLE_RESPONDENT)
+        if patched != rebuilt:
+            sheets = differing_sheets(rebuilt, patched)
+            problems.append(
+                f"--summary {summary}: template copy differs from a rebuild"
+                f" (sheets: {', '.join(sheets) or 'bytes only'})"
+            )
+    return problems
+
+
+# ---------------------------------------------------------------------------
+# Summary engines
+# ---------------------------------------------------------------------------
+
+
+def countblank(values):
+    """COUNTBLANK for pycel, which does not implement it (see plugins)."""
+    return sum(1 for row in values for v in row if v in (None, ""))
+
+
+def summary_values(path, cells):
+    """Evaluate `cells` of the サマリー sheet with pycel."""
+    from pycel import ExcelCompiler
+
+    excel = ExcelCompiler(filename=str(path), plugins=("check_excel",))
+    values = []
+    for cell in cells:
+        value = excel.evaluate(f"サマリー!{cell}")
+        values.append(round(value, 9) if isinstance(value, float) else value)
+    return values
+
+
+def check_summaries(items, chapters, answers, directory):
+    """Compare the evaluated サマリー values of every summary engine."""
+    paths = {}
+    for summary in ck.SUMMARY_ENGINES:
+        paths[summary] = Path(directory) / f"summary-{summary}.xlsx"
+        paths[summary].write_bytes(
+            build_bytes(items, chapters, summary, "openpyxl", answers)
+        )
+
+    reference, *others = ck.SUMMARY_ENGINES
+    ws = load_workbook(paths[reference])["サマリー"]
+    cells = [
+        cell.coordinate
+        for row in ws.iter_rows(min_col=2, max_col=9)
+        for cell in row
+        if cell.value is not None
+    ]
+    expected = summary_values(paths[reference], cells)
+    problems = []
+    for summary in others:
+        values = summary_values(paths[summary], cells)
+        differing = [
+            cell for cell, value, want in zip(cells, values, expected)
+            if value != want
+        ]
+        if differing:
+            problems.append(
+                f"--summary {summary}: サマリー differs from {reference} in "
+                f"{', '.join(differing[:10])}"
+                + (" ..." if len(differing) > 10 else "")
+            )
+    return problems
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Check that the writer engines, templates and summary "
+        "engines produce the same workbooks."
+    )
+    parser.add_argument("--seed", type=int, default=0,
+                        help="seed of the sample answers (default: 0)")
+    args = parser.parse_args(argv)
+
+    items, chapters = ck.parse_chapters()
+    answers = sample_answers(items, args.seed)
+    print(f"Checking {len(items)} items, {len(answers)} answers")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = [
+            ("writer engines", check_writers(items, chapters, answers)),
+            ("templates", check_templates(items, chapters, answers, tmp)),
+        ]
+        try:
+            import pycel  # noqa: F401
+        except ImportError:
+            results.append(("summary engines", None))
+        else:
+            results.append((
+                "summary engines",
+                check_summaries(items, chapters, answers, tmp),
+            ))
+
+    problems = []
+    for name, found in results:
+        if found is None:
+            print(f"{name:<16} skipped "
+                  "(pip install -r tools/requirements-optional.txt)")
+            continue
+        print(f"{name:<16} {'FAIL' if found else 'OK'}")
+        problems += found
+    for problem in problems:
+        print(f"Error: {problem}", file=sys.stderr)
+    if problems:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,1202 @@
+#!/usr/bin/env python3
+"""
+生成AI利用ガイドライン チェックリスト — チェックリストのモデルとパーサ
+
+src/ch01-governance.md – src/ch07-document-quality.md のパース、パースキャッシュ、
+チェック項目・回答のレコード型、回答ファイル・マニフェストの読込みを提供する。
+openpyxl に依存しないため、Excel を出力しない処理（パース・検証・JSON 出力など）は
+このモジュールだけで完結する。
+
+Excel の構築は tools/checklist_excel.py、コマンドラインは tools/generate_excel.py。
+
+仕様書: tools/docs/excel-spec.md
+"""
+
+import csv
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass
+from functools import lru_cache
+from datetime import datetime, timezone
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+SRC_DIR = REPO_ROOT / "src"
+OUTPUT_DIR = REPO_ROOT / "excel"
+OUTPUT_FILE = OUTPUT_DIR / "genai-governance-checklist.xlsx"
+CACHE_DIR = REPO_ROOT / ".cache" / "generate_excel"
+BOOK_DIR = REPO_ROOT / "book"   # mdBook output (book.toml build-dir)
+
+CHAPTER_FILES = [
+    "ch01-governance.md",
+    "ch02-risk-mapping.md",
+    "ch03-input-data.md",
+    "ch04-output-management.md",
+    "ch05-trustworthiness.md",
+    "ch06-incident-response.md",
+    "ch07-document-quality.md",
+]
+
+REFERENCE_TAGS = ["NIST", "NIST-GAI", "METI", "JDLA", "IPA", "FUJITSU", "EU-AIA"]
+
+CHAPTER_COLORS = {
+    1: "E2EFDA",  # 薄緑
+    2: "DEEBF7",  # 薄青
+    3: "FFF2CC",  # 薄黄
+    4: "F2DCDB",  # 薄紅
+    5: "E2D9F3",  # 薄紫
+    6: "FCE4D6",  # 薄橙
+    7: "D6DCE4",  # 薄灰
+}
+
+CHECK_STATUSES = ["対応済", "一部対応", "未対応", "該当なし"]
+
+FONT_NAME = "メイリオ"
+
+# Colors
+DARK_NAVY = "1F3864"
+DARK_BLUE_GRAY = "44546A"
+LIGHT_GRAY = "D9E2F3"
+WHITE = "FFFFFF"
+
+HEADER_ROW = 3
+DATA_START_ROW = 4
+
+SUMMARY_ENGINES = ("countifs", "static")
+
+# Writers of the checklist rows (see build_checklist_sheet)
+WRITER_ENGINES = ("openpyxl", "fast")
+
+# Column definitions: (header_name, width_in_chars)
+COLUMNS = [
+    ("チェック結果", 12),     # A
+    ("項目番号", 8),           # B
+    ("章", 5),                 # C
+    ("章タイトル", 28),        # D
+    ("節", 6),                 # E
+    ("節タイトル", 24),        # F
+    ("準拠レベル", 14),        # G
+    ("チェック項目", 60),      # H
+    ("NIST", 6),               # I
+    ("NIST-GAI", 9),           # J
+    ("METI", 6),               # K
+    ("JDLA", 6),               # L
+    ("IPA", 5),                # M
+    ("FUJITSU", 9),            # N
+    ("EU-AIA", 8),             # O
+    ("備考", 30),              # P
+    ("対応状況メモ", 40),      # Q
+]
+
+
+# ---------------------------------------------------------------------------
+# Regex patterns
+# ---------------------------------------------------------------------------
+
+RE_CHAPTER = re.compile(r"^# (\d+)\.\s+(.+)$")
+RE_SECTION = re.compile(r"^## (\d+\.\d+)\s+(.+)$")
+RE_ITEM = re.compile(
+    r"^- (\d+\.\d+\.[A-Z])\.\s+\[(Required|Recommended|Option)\]\s+(.+)$"
+)
+RE_TAG = re.compile(
+    r"\[(NIST(?:-GAI)?|METI|JDLA|IPA|FUJITSU|EU-AIA)(?::\s*([^\]]+))?\]"
+)
+# Indented 説明/定義例 sub-bullet of an item (stripped line); the label
+# markup is matched loosely and checked by FileLint.body()
+RE_BODY = re.compile(r"^- [\\*]*(説明|定義例)[\\*]*\s*[:：]?\s*(.*)$")
+# Any bracketed tag-like name, for reporting tags RE_TAG does not know
+RE_TAG_NAME = re.compile(r"\[([A-Z][A-Z0-9]*(?:-[A-Z0-9]+)*)(?::[^\]]*)?\]")
+RE_DATE = re.compile(r"^(\d{4})-(\d{1,2})-(\d{1,2})$")
+RE_INPUT_TEXT = re.compile(r"^組織名:(.*?)\s*記入者:(.*?)\s*記入日:(.*)$")
+
+# Bump when the parser's output (or a FileLint check) changes without a
+# regex change, so that stale parse cache entries are discarded.
+PARSER_VERSION = 6
+
+# ---------------------------------------------------------------------------
+# Checklist records
+# ---------------------------------------------------------------------------
+
+LEVELS = ("Required", "Recommended", "Option")
+
+# Reference tag -> bit in ChecklistItem.tag_mask (same order as columns I–O)
+TAG_BITS = {tag: 1 << i for i, tag in enumerate(REFERENCE_TAGS)}
+
+# Shared level strings, so that items do not each hold their own copy
+_LEVELS = {level: level for level in LEVELS}
+
+
+@dataclass(frozen=True, slots=True)
+class Chapter:
+    num: int
+    title: str
+
+
+@dataclass(frozen=True, slots=True)
+class Section:
+    num: str
+    title: str
+
+
+@dataclass(frozen=True, slots=True)
+class ChecklistItem:
+    """A parsed checklist item.
+
+    Chapter and Section instances are shared by all items under the same
+    heading. Reference tags are stored as a bitmask over REFERENCE_TAGS
+    (see TAG_BITS); the clauses given after a tag's colon, such as
+    "GOVERN 1.2" in [NIST: GOVERN 1.2], as (tag, clause) pairs.
+    description and example hold the 説明 and 定義例 sub-bullets, with
+    continuation lines joined.
+    """
+
+    number: str
+    chapter: Chapter | None
+    section: Section | None
+    level: str
+    text: str
+    tag_mask: int
+    clauses: tuple[tuple[str, str], ...] = ()
+    description: str = ""
+    example: str = ""
+
+    @property
+    def chapter_num(self):
+        return self.chapter.num if self.chapter else None
+
+    @property
+    def chapter_title(self):
+        return self.chapter.title if self.chapter else None
+
+    @property
+    def section_num(self):
+        return self.section.num if self.section else None
+
+    @property
+    def section_title(self):
+        return self.section.title if self.section else None
+
+    @property
+    def tags(self):
+        """Reference tags as a set of names (built on demand)."""
+        return {tag for tag, bit in TAG_BITS.items() if self.tag_mask & bit}
+
+    def has_tag(self, tag):
+        return bool(self.tag_mask & TAG_BITS[tag])
+
+
+@dataclass(frozen=True, slots=True)
+class Answer:
+    """A prefilled answer for one checklist item."""
+
+    status: str = ""    # A: チェック結果
+    note: str = ""      # P: 備考
+    memo: str = ""      # Q: 対応状況メモ
+
+
+NO_ANSWER = Answer()
+
+
+@dataclass(frozen=True, slots=True)
+class Respondent:
+    """Who fills in the checklist (row 2 記入欄); blanks stay as ＿＿＿."""
+
+    organization: str = ""
+    person: str = ""
+    date: str = ""      # YYYY-MM-DD or free text
+
+    def input_text(self):
+        blank = "＿＿＿＿＿"
+        date = "＿＿＿＿年＿＿月＿＿日"
+        if self.date:
+            m = RE_DATE.match(self.date)
+            date = (
+                f"{m.group(1)}年{int(m.group(2))}月{int(m.group(3))}日"
+                if m else self.date
+            )
+        return (
+            f"組織名: {self.organization or blank}　"
+            f"記入者: {self.person or blank}　"
+            f"記入日: {date}"
+        )
+
+    @classmethod
+    def from_input_text(cls, text):
+        """Parse a row 2 記入欄 back into a Respondent.
+
+        Fields still holding ＿ placeholders are blank. Text that does not
+        follow the 記入欄 layout is kept whole as the organization.
+        """
+        m = RE_INPUT_TEXT.match(text.strip())
+        if m is None:
+            return cls(text.strip())
+        return cls(*("" if "＿" in value else value.strip()
+                     for value in m.groups()))
+
+
+NO_RESPONDENT = Respondent()
+
+
+@dataclass(frozen=True, slots=True)
+class Diagnostic:
+    """A structural problem found in a chapter file."""
+
+    path: str
+    line: int
+    severity: str   # "error" or "warning"
+    message: str
+
+    def __str__(self):
+        return f"{self.path}:{self.line}: {self.severity}: {self.message}"
+
+
+def split_tags(raw_text):
+    """Split an item line's text from its reference tags in one RE_TAG pass.
+
+    Returns (text, mask, clauses): the text without the tags, the
+    TAG_BITS mask of the tags, and the (tag, clause) pairs in order.
+    """
+    if "[" not in raw_text:
+        return raw_text.strip(), 0, ()
+    # [text, tag, detail, text, tag, detail, ..., text]
+    parts = RE_TAG.split(raw_text)
+    if len(parts) == 1:
+        return raw_text.strip(), 0, ()
+    mask, clauses = _tag_info(tuple(parts[1::3]), tuple(parts[2::3]))
+    return "".join(parts[::3]).strip(), mask, clauses
+
+
+@lru_cache(maxsize=4096)
+def _tag_info(tags, details):
+    """Return (mask, clauses) of a tag list; few distinct lists repeat."""
+    mask = 0
+    clauses = []
+    for tag, detail in zip(tags, details):
+        mask |= TAG_BITS[tag]
+        if detail:
+            clauses.extend((tag, clause) for clause in split_clauses(detail))
+    return mask, tuple(clauses)
+
+
+def tag_mask(raw_text):
+    """Return the TAG_BITS mask of the reference tags found in raw_text."""
+    return split_tags(raw_text)[1]
+
+
+def split_clauses(detail):
+    """Split a tag's clause list, e.g. "MANAGE 4.2, 4.3" -> [MANAGE 4.2, MANAGE 4.3].
+
+    A part that starts with a digit continues the previous part's prefix.
+    """
+    clauses = []
+    prefix = ""
+    for part in detail.split(","):
+        part = " ".join(part.split())
+        if not part:
+            continue
+        if part[0].isdigit():
+            part = f"{prefix} {part}".lstrip()
+        elif " " in part:
+            prefix = part.rsplit(" ", 1)[0]
+        clauses.append(part)
+    return clauses
+
+
+def tag_clauses(raw_text):
+    """Return the (tag, clause) pairs found in raw_text, in order."""
+    return split_tags(raw_text)[2]
+
+
+def _clause_key(clause):
+    """Sort key ordering "GOVERN 1.10" after "GOVERN 1.9"."""
+    return [
+        (0, int(part), "") if part.isdigit() else (1, 0, part)
+        for part in re.split(r"(\d+)", clause)
+    ]
+
+
+class CrossReference:
+    """Inverted index of the reference tags: framework -> clause -> items.
+
+    Built in one pass over the items (add() per item), so that questions
+    such as "which items cover NIST GOVERN 2.1" are dict lookups instead
+    of a rescan of the chapters. Item numbers are kept in item order.
+    """
+
+    def __init__(self, items=()):
+        self.tagged = {tag: [] for tag in REFERENCE_TAGS}
+        self.clauses = {tag: {} for tag in REFERENCE_TAGS}
+        # Items carrying a tag without any clause for it
+        self.unspecified = {tag: [] for tag in REFERENCE_TAGS}
+        for item in items:
+            self.add(item)
+
+    def add(self, item):
+        with_clause = set()
+        for tag, clause in item.clauses:
+            numbers = self.clauses[tag].setdefault(clause, [])
+            if not numbers or numbers[-1] != item.number:
+                numbers.append(item.number)
+            with_clause.add(tag)
+        for tag, bit in TAG_BITS.items():
+            if item.tag_mask & bit:
+                self.tagged[tag].append(item.number)
+                if tag not in with_clause:
+                    self.unspecified[tag].append(item.number)
+
+    def items_for(self, tag, clause=None):
+        """Item numbers tagged `tag`, or citing `clause` of it."""
+        if clause is None:
+            return self.tagged.get(tag, [])
+        return self.clauses.get(tag, {}).get(" ".join(clause.split()), [])
+
+    def rows(self):
+        """Yield (tag, clause, numbers) in column order and clause order.
+
+        clause is None for the items that carry the tag without a clause.
+        """
+        for tag in REFERENCE_TAGS:
+            for clause in sorted(self.clauses[tag], key=_clause_key):
+                yield tag, clause, self.clauses[tag][clause]
+            if self.unspecified[tag]:
+                yield tag, None, self.unspecified[tag]
+
+    def to_json(self):
+        """Return the index as a JSON-serialisable dict."""
+        return {
+            tag: {
+                "items": self.tagged[tag],
+                "clauses": {
+                    clause: self.clauses[tag][clause]
+                    for clause in sorted(self.clauses[tag], key=_clause_key)
+                },
+                "unspecified": self.unspecified[tag],
+            }
+            for tag in REFERENCE_TAGS
+        }
+
+
+# ---------------------------------------------------------------------------
+# Parsing
+# ---------------------------------------------------------------------------
+
+
+class FileLint:
+    """Structural checks of one chapter file, fed by scan_chapter().
+
+    Duplicates are found through an index of item number -> line, and
+    sequence gaps by comparing each item's letter with the one expected
+    after the previous item of its section, so every check is O(1) per
+    line. Results are kept in the parse cache next to the file's items.
+    """
+
+    def __init__(self, problems=(), numbers=()):
+        self.problems = list(problems)   # (line, severity, message)
+        self.numbers = dict(numbers)     # item number -> first line
+        self._chapter = None
+        self._section = None
+        self._sections = {}              # section number -> line
+        self._expected = "A"             # next letter in the section
+
+    def error(self, line, message):
+        self.problems.append((line, "error", message))
+
+    def warning(self, line, message):
+        self.problems.append((line, "warning", message))
+
+    def chapter(self, line, chapter):
+        self._chapter = chapter
+        self._section = None
+
+    def section(self, line, section):
+        self._section = section
+        self._expected = "A"
+        if section.num in self._sections:
+            self.error(line, f"duplicate section {section.num} "
+                             f"(first at line {self._sections[section.num]})")
+        self._sections.setdefault(section.num, line)
+        if self._chapter is None:
+            self.error(line, f"section {section.num} before any chapter heading")
+        elif section.num.split(".")[0] != str(self._chapter.num):
+            self.error(line, f"section {section.num} is in "
+                             f"chapter {self._chapter.num}")
+
+    def item(self, line, number, raw_text):
+        for name in RE_TAG_NAME.findall(raw_text):
+            if name not in TAG_BITS and name not in _LEVELS:
+                self.warning(line, f"{number}: unknown reference tag [{name}] "
+                                   "(left in the item text)")
+
+        if number in self.numbers:
+            self.error(line, f"duplicate item number {number} "
+                             f"(first at line {self.numbers[number]})")
+            return
+        self.numbers[number] = line
+
+        if self._section is None:
+            self.error(line, f"{number}: item before any section heading")
+            return
+        prefix, letter = number.rsplit(".", 1)
+        if prefix != self._section.num:
+            self.error(line, f"{number}: listed under section "
+                             f"{self._section.num}")
+            return
+        if letter > self._expected:
+            self.error(line, f"{number}: gap in the sequence, expected "
+                             f"{prefix}.{self._expected}")
+        elif letter < self._expected:
+            previous = chr(ord(self._expected) - 1)
+            self.error(line, f"{number}: out of order after {prefix}.{previous}")
+        self._expected = chr(max(ord(letter), ord(self._expected) - 1) + 1)
+
+    def body(self, line, label, text):
+        if not text.startswith(f"- **{label}**:"):
+            self.warning(line, f"malformed {label} label, expected "
+                               f"'- **{label}**: text'")
+
+    def malformed(self, line, text):
+        self.error(line, "malformed item line, expected "
+                         "'- N.N.X. [Required|Recommended|Option] text': "
+                         f"{text.strip()[:40]}")
+
+
+def _join_lines(parts):
+    """Join wrapped markdown lines; a space only between ASCII words."""
+    if len(parts) == 1:
+        return parts[0]
+    text = ""
+    for part in parts:
+        if (text and text[-1].isascii() and text[-1].isalnum()
+                and part[0].isascii() and part[0].isalnum()):
+            text += " "
+        text += part
+    return text
+
+
+def scan_chapter(lines, chapters, lint=None):
+    """Parse chapter markdown in a single pass over an iterable of lines.
+
+    Each line is classified by its prefix before any regex runs, so blank
+    lines and body continuation lines cost one slice comparison. RE_TAG
+    only runs on item lines. An item is yielded once its 説明/定義例
+    sub-bullets (and their indented continuation lines) have been read,
+    i.e. at the next item or heading. A line that is not indented ends
+    the body being read.
+
+    Args:
+        lines: iterable of lines (e.g. an open text file)
+        chapters: dict updated with chapter_num -> chapter_title
+        lint: optional FileLint checking the structure along the way
+
+    Yields:
+        ChecklistItem
+    """
+    chapter = None
+    section = None
+    pending = None   # RE_ITEM match of the item still collecting its bodies
+    bodies = {}      # label -> lines of the pending item's bodies
+    body = None      # line list of the body being read
+
+    def finish():
+        # The item is built once, after its bodies are read; its tags
+        # are split off in a single RE_TAG pass.
+        number, level, raw_text = pending.groups()
+        text, mask, clauses = split_tags(raw_text)
+        description = bodies.get("説明")
+        example = bodies.get("定義例")
+        return ChecklistItem(
+            number,
+            chapter,
+            section,
+            _LEVELS[level],
+            text,
+            mask,
+            clauses,
+            _join_lines(description) if description else "",
+            _join_lines(example) if example else "",
+        )
+
+    for lineno, line in enumerate(lines, 1):
+        if line[:1] == " ":
+            if pending is None:
+                continue
+            stripped = line.strip()
+            if not stripped:
+                body = None
+            elif stripped[:2] == "- ":
+                m = RE_BODY.match(stripped)
+                body = None
+                if m:
+                    label, text = m.groups()
+                    if lint is not None:
+                        lint.body(lineno, label, stripped)
+                    body = bodies.setdefault(label, [])
+                    if text:
+                        body.append(text.strip())
+            elif body is not None and stripped[:4] != "<!--":
+                body.append(stripped)
+            continue
+
+        body = None
+        head = line[:2]
+        if pending is not None and head in ("- ", "# ", "##"):
+            yield finish()
+            pending = None
+            bodies = {}
+
+        if head == "- ":
+            if not line[2:3].isdigit():
+                continue
+            m = RE_ITEM.match(line)
+            if m:
+                if lint is not None:
+                    lint.item(lineno, m.group(1), m.group(3).strip())
+                pending = m
+            elif lint is not None:
+                lint.malformed(lineno, line)
+
+        elif head == "# ":
+            m = RE_CHAPTER.match(line)
+            if m:
+                chapter = Chapter(int(m.group(1)), m.group(2).strip())
+                chapters[chapter.num] = chapter.title
+                if lint is not None:
+                    lint.chapter(lineno, chapter)
+
+        elif head == "##" and line[2:3] == " ":
+            m = RE_SECTION.match(line)
+            if m:
+                section = Section(m.group(1), m.group(2).strip())
+                if lint is not None:
+                    lint.section(lineno, section)
+
+    if pending is not None:
+        yield finish()
+
+
+def iter_items(cache=None, chapters=None, paths=None, lint=None):
+    """Lazily parse all chapter markdown files.
+
+    Files are read one at a time and items are yielded as they are
+    scanned, so the full item list is never materialised.
+
+    Args:
+        cache: optional ParseCache; unchanged files are loaded from it
+        chapters: optional dict updated with chapter_num -> chapter_title
+        paths: chapter files to parse (default: CHAPTER_FILES in SRC_DIR)
+        lint: optional list appended with (path, FileLint) per file
+
+    Yields:
+        ChecklistItem
+    """
+    if chapters is None:
+        chapters = {}
+    if paths is None:
+        paths = [SRC_DIR / filename for filename in CHAPTER_FILES]
+
+    for filepath in map(Path, paths):
+        filename = filepath.name
+        if not filepath.exists():
+            print(f"Warning: {filepath} not found, skipping.", file=sys.stderr)
+            continue
+
+        if cache is None:
+            file_lint = None if lint is None else FileLint()
+            with filepath.open(encoding="utf-8") as f:
+                yield from scan_chapter(f, chapters, file_lint)
+            if lint is not None:
+                lint.append((filepath, file_lint))
+            continue
+
+        key = cache.key(filepath)
+        entry = cache.load(filename, key)
+        if entry is None:
+            # Always checked, so that cached entries can answer lint runs.
+            file_chapters = {}
+            file_lint = FileLint()
+            with filepath.open(encoding="utf-8") as f:
+                file_items = list(scan_chapter(f, file_chapters, file_lint))
+            cache.store(filename, key, file_items, file_chapters, file_lint)
+        else:
+            file_items, file_chapters, file_lint = entry
+
+        chapters.update(file_chapters)
+        if lint is not None:
+            lint.append((filepath, file_lint))
+        yield from file_items
+
+
+def parse_chapters(cache=None, paths=None):
+    """Parse all chapter markdown files.
+
+    Args:
+        cache: optional ParseCache; unchanged files are loaded from it
+        paths: chapter files to parse (default: CHAPTER_FILES in SRC_DIR)
+
+    Returns:
+        items: list of ChecklistItem
+        chapters: dict mapping chapter_num -> chapter_title
+    """
+    chapters = {}
+    items = list(iter_items(cache, chapters, paths))
+    return items, chapters
+
+
+def _display_path(path):
+    try:
+        return path.resolve().relative_to(REPO_ROOT).as_posix()
+    except ValueError:
+        return str(path)
+
+
+def lint_chapters(cache=None, paths=None):
+    """Parse all chapter files and check their structure in the same pass.
+
+    Per-file checks run in scan_chapter() (or come from the cache); item
+    numbers repeated across files are then found from each file's index.
+
+    Args:
+        cache: optional ParseCache; unchanged files are loaded from it
+        paths: chapter files to parse (default: CHAPTER_FILES in SRC_DIR)
+
+    Returns:
+        items: list of ChecklistItem
+        chapters: dict mapping chapter_num -> chapter_title
+        diagnostics: list of Diagnostic, in file and line order
+    """
+    chapters = {}
+    results = []
+    items = list(iter_items(cache, chapters, paths, lint=results))
+
+    diagnostics = []
+    first = {}   # item number -> "path:line" of its first file
+    for filepath, file_lint in results:
+        path = _display_path(filepath)
+        found = [
+            Diagnostic(path, line, severity, message)
+            for line, severity, message in file_lint.problems
+        ]
+        for number, line in file_lint.numbers.items():
+            if number in first:
+                found.append(Diagnostic(
+                    path, line, "error",
+                    f"duplicate item number {number} (first at {first[number]})",
+                ))
+            else:
+                first[number] = f"{path}:{line}"
+        diagnostics.extend(sorted(found, key=lambda d: d.line))
+    return items, chapters, diagnostics
+
+
+# ---------------------------------------------------------------------------
+# Parse cache
+# ---------------------------------------------------------------------------
+
+
+def _parser_signature():
+    """Identify the parser so that cache entries die with regex changes."""
+    return "\n".join(
+        [
+            str(PARSER_VERSION),
+            RE_CHAPTER.pattern,
+            RE_SECTION.pattern,
+            RE_ITEM.pattern,
+            RE_TAG.pattern,
+            RE_TAG_NAME.pattern,
+            RE_BODY.pattern,
+            " ".join(REFERENCE_TAGS),
+        ]
+    ).encode("utf-8")
+
+
+class ParseCache:
+    """On-disk cache of parsed chapter files.
+
+    One JSON entry is kept per chapter file under CACHE_DIR. An entry is
+    used only when its key, the SHA-256 of the parser signature and the
+    file content, matches the current file. Entries also hold the file's
+    FileLint results, so lint runs over unchanged files skip the scan.
+    """
+
+    def __init__(self, directory=CACHE_DIR, rebuild=False):
+        self.directory = Path(directory)
+        self.rebuild = rebuild
+        self.hits = 0
+        self.misses = 0
+        self._signature = hashlib.sha256(_parser_signature()).digest()
+
+    def key(self, filepath):
+        """Return the cache key for a chapter file (read in chunks)."""
+        h = hashlib.sha256(self._signature)
+        with open(filepath, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 16), b""):
+                h.update(chunk)
+        return h.hexdigest()
+
+    def _path(self, filename):
+        return self.directory / f"{filename}.json"
+
+    def load(self, filename, key):
+        """Return (items, chapters, FileLint) for a matching entry, or None."""
+        if not self.rebuild:
+            try:
+                entry = json.loads(self._path(filename).read_text("utf-8"))
+            except (OSError, ValueError):
+                entry = None
+            if entry is not None and entry.get("key") == key:
+                self.hits += 1
+                return self._decode(entry)
+
+        self.misses += 1
+        return None
+
+    def store(self, filename, key, items, chapters, lint):
+        """Write the parse result of a chapter file (atomically)."""
+        entry = self._encode(items, chapters)
+        entry["key"] = key
+        entry["problems"] = lint.problems
+        entry["numbers"] = list(lint.numbers.items())
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._path(filename)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(entry, ensure_ascii=False), "utf-8")
+        os.replace(tmp, path)
+
+    @staticmethod
+    def _encode(items, chapters):
+        # Chapters and sections are stored once and referenced by index
+        # from each item row, mirroring the shared instances in memory.
+        headings = {}
+        rows = []
+        for item in items:
+            ch = headings.setdefault(item.chapter, len(headings))
+            sec = headings.setdefault(item.section, len(headings))
+            rows.append(
+                [item.number, ch, sec, item.level, item.text, item.tag_mask,
+                 item.clauses, item.description, item.example]
+            )
+        return {
+            "chapters": sorted(chapters.items()),
+            "headings": [
+                None if h is None
+                else ["chapter" if isinstance(h, Chapter) else "section",
+                      h.num, h.title]
+                for h in headings
+            ],
+            "items": rows,
+        }
+
+    @staticmethod
+    def _decode(entry):
+        kinds = {"chapter": Chapter, "section": Section}
+        headings = [
+            None if h is None else kinds[h[0]](h[1], h[2])
+            for h in entry["headings"]
+        ]
+        items = [
+            ChecklistItem(
+                number, headings[ch], headings[sec], _LEVELS[level], text,
+                mask, tuple(map(tuple, clauses)), description, example,
+            )
+            for (number, ch, sec, level, text, mask, clauses, description,
+                 example) in entry["items"]
+        ]
+        chapters = {num: title for num, title in entry["chapters"]}
+        lint = FileLint(map(tuple, entry["problems"]), entry["numbers"])
+        return items, chapters, lint
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def report(self):
+        total = self.hits + self.misses
+        return (
+            f"Parse cache: {self.hits}/{total} hits "
+            f"({self.hit_rate:.1%})"
+        )
+
+
+# ---------------------------------------------------------------------------
+# Watching
+# ---------------------------------------------------------------------------
+
+
+class ChapterWatcher:
+    """Keep the parse results of the chapter files up to date.
+
+    Files are polled by (mtime, size). refresh() re-parses only the given
+    files and keeps the other chapters' items, so one edited chapter costs
+    one file scan. The cache, if any, is updated along the way.
+    """
+
+    def __init__(self, paths=None, cache=None):
+        if paths is None:
+            paths = [SRC_DIR / filename for filename in CHAPTER_FILES]
+        self.paths = [Path(p) for p in paths]
+        self.cache = cache
+        self._stats = {}
+        self._parsed = {}   # path -> (items, chapters)
+        self.refresh(self.paths)
+
+    @staticmethod
+    def _stat(path):
+        try:
+            st = path.stat()
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def changed(self):
+        """Return the files whose mtime or size differs from the last parse."""
+        return [p for p in self.paths if self._stat(p) != self._stats.get(p)]
+
+    def wait(self, interval=0.2, debounce=0.1):
+        """Block until files change and then stay unchanged for `debounce`.
+
+        Editors often save in several writes (or write and rename), so the
+        files are only reported once their stats have settled.
+        """
+        while not self.changed():
+            time.sleep(interval)
+        stats = [self._stat(p) for p in self.paths]
+        while True:
+            time.sleep(debounce)
+            current = [self._stat(p) for p in self.paths]
+            if current == stats:
+                return self.changed()
+            stats = current
+
+    def refresh(self, paths):
+        """Re-parse the given files."""
+        for path in paths:
+            # Stat before reading: a write during the scan shows up as a
+            # change on the next poll.
+            self._stats[path] = self._stat(path)
+            chapters = {}
+            items = list(iter_items(self.cache, chapters, [path]))
+            if self._stats[path] is None:
+                self._parsed.pop(path, None)
+            else:
+                self._parsed[path] = (items, chapters)
+
+    def file_items(self, path):
+        """Return the items of one file from the last parse."""
+        return self._parsed.get(Path(path), ((), {}))[0]
+
+    def parsed(self):
+        """Return (items, chapters) of all files, in file order."""
+        items = []
+        chapters = {}
+        for path in self.paths:
+            file_items, file_chapters = self._parsed.get(path, ((), {}))
+            items.extend(file_items)
+            chapters.update(file_chapters)
+        return items, chapters
+
+
+def select_items(items, levels=(), chapters=(), tags=()):
+    """Return the items of the given levels, chapters and tags.
+
+    An empty filter passes every item; an item passes the tag filter
+    when it has any of the tags.
+    """
+    mask = 0
+    for tag in tags:
+        mask |= TAG_BITS[tag]
+    return [
+        item for item in items
+        if (not levels or item.level in levels)
+        and (not chapters or item.chapter_num in chapters)
+        and (not mask or item.tag_mask & mask)
+    ]
+
+
+def item_record(item):
+    """Return a JSON-serializable dict for a ChecklistItem."""
+    return {
+        "number": item.number,
+        "chapter": item.chapter_num,
+        "chapter_title": item.chapter_title,
+        "section": item.section_num,
+        "section_title": item.section_title,
+        "level": item.level,
+        "text": item.text,
+        "tags": [tag for tag in REFERENCE_TAGS if item.has_tag(tag)],
+        "clauses": [
+            {"tag": tag, "clause": clause} for tag, clause in item.clauses
+        ],
+        "description": item.description,
+        "example": item.example,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Reproducible output
+# ---------------------------------------------------------------------------
+
+# Timestamp of reproducible files unless SOURCE_DATE_EPOCH is set; the
+# earliest time a zip entry can hold.
+ZIP_EPOCH = datetime(1980, 1, 1, tzinfo=timezone.utc)
+
+
+def reproducible_timestamp():
+    """Return SOURCE_DATE_EPOCH as a UTC datetime, or ZIP_EPOCH if unset."""
+    epoch = os.environ.get("SOURCE_DATE_EPOCH")
+    if epoch:
+        stamp = datetime.fromtimestamp(int(epoch), timezone.utc)
+        if stamp >= ZIP_EPOCH:
+            return stamp
+    return ZIP_EPOCH
+
+
+def is_reproducible(reproducible=None):
+    """Resolve a reproducible flag; None means "only if SOURCE_DATE_EPOCH is set"."""
+    if reproducible is None:
+        return bool(os.environ.get("SOURCE_DATE_EPOCH"))
+    return reproducible
+
+
+def output_timestamp(reproducible=None):
+    """Return the time to record in a written file.
+
+    Reproducible output (see is_reproducible()) gets
+    reproducible_timestamp(); anything else gets the current time, so
+    ordinary files are not dated 1980.
+    """
+    if is_reproducible(reproducible):
+        return reproducible_timestamp()
+    return datetime.now(timezone.utc).replace(microsecond=0)
+
+
+# ---------------------------------------------------------------------------
+# Profiling
+# ---------------------------------------------------------------------------
+
+
+class Profiler:
+    """Per-phase wall-clock and CPU timings for --profile.
+
+    phase() times a named block; inside it, mark() starts a sub-phase
+    ("<phase>/<name>") that lasts until the next mark() or the end of the
+    phase, and repeated marks of the same name accumulate. With memory=True
+    each phase also records its tracemalloc peak, which is precise but
+    slows the run down; timings alone cost a few clock reads per phase.
+    The report's total runs from construction to report().
+    """
+
+    enabled = True
+
+    def __init__(self, memory=False):
+        self.memory = memory
+        self.phases = {}   # name -> {"wall", "cpu"[, "peak_bytes"]}
+        self.counts = {}
+        self._open = []    # every running record: [name, start, peak so far]
+        self._stack = []   # open phases: [name, record, open sub-phase]
+        if memory:
+            tracemalloc.start()
+        self._started = (time.perf_counter(), time.process_time())
+
+    def _start(self, name):
+        if self.memory:
+            # Keep the peaks of the enclosing records before resetting.
+            peak = tracemalloc.get_traced_memory()[1]
+            for record in self._open:
+                record[2] = max(record[2], peak)
+            tracemalloc.reset_peak()
+        record = [name, (time.perf_counter(), time.process_time()), 0]
+        self._open.append(record)
+        return record
+
+    def _stop(self, record):
+        wall, cpu = time.perf_counter(), time.process_time()
+        self._open.remove(record)
+        name, (wall0, cpu0), peak = record
+        entry = self.phases.setdefault(name, {"wall": 0.0, "cpu": 0.0})
+        entry["wall"] += wall - wall0
+        entry["cpu"] += cpu - cpu0
+        if self.memory:
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+            for outer in self._open:
+                outer[2] = max(outer[2], peak)
+            entry["peak_bytes"] = max(entry.get("peak_bytes", 0), peak)
+
+    @contextmanager
+    def phase(self, name):
+        if self._stack:
+            name = f"{self._stack[-1][0]}/{name}"
+        entry = [name, self._start(name), None]
+        self._stack.append(entry)
+        try:
+            yield
+        finally:
+            self._stack.pop()
+            if entry[2] is not None:
+                self._stop(entry[2])
+            self._stop(entry[1])
+
+    def mark(self, name):
+        """Start sub-phase `name` of the innermost open phase."""
+        if not self._stack:
+            return
+        entry = self._stack[-1]
+        if entry[2] is not None:
+            self._stop(entry[2])
+        entry[2] = self._start(f"{entry[0]}/{name}")
+
+    def count(self, name, value):
+        self.counts[name] = value
+
+    def report(self):
+        """Return the profile as a JSON-serialisable dict."""
+        wall, cpu = self._started
+        report = {
+            "total": {
+                "wall": round(time.perf_counter() - wall, 6),
+                "cpu": round(time.process_time() - cpu, 6),
+            },
+            "phases": {
+                name: {
+                    key: round(value, 6) if isinstance(value, float) else value
+                    for key, value in entry.items()
+                }
+                for name, entry in self.phases.items()
+            },
+            "counts": self.counts,
+        }
+        if self.memory:
+            report["tracemalloc_peak_bytes"] = tracemalloc.get_traced_memory()[1]
+        if resource is not None:
+            # ru_maxrss is in KiB on Linux
+            report["max_rss_bytes"] = (
+                resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+            )
+        return report
+
+
+class _NullProfiler:
+    """Stand-in when --profile is off; every hook is a no-op."""
+
+    enabled = False
+
+    def phase(self, name):
+        return nullcontext()
+
+    def mark(self, name):
+        pass
+
+    def count(self, name, value):
+        pass
+
+
+NULL_PROFILER = _NullProfiler()
+
+
+# ---------------------------------------------------------------------------
+# Answer and manifest files
+# ---------------------------------------------------------------------------
+
+
+# Manifest / answer file columns
+MANIFEST_FIELDS = ("組織名", "記入者", "記入日", "回答ファイル", "出力ファイル")
+ANSWER_FIELDS = ("項目番号", "チェック結果", "備考", "対応状況メモ")
+
+
+@dataclass(frozen=True, slots=True)
+class BatchJob:
+    """One workbook of a batch run."""
+
+    respondent: Respondent
+    answers_file: Path | None
+    output: Path
+
+
+def _read_records(path):
+    """Read a list of dict rows from a .json (array of objects) or .csv file."""
+    if path.suffix.lower() == ".json":
+        records = json.loads(path.read_text(encoding="utf-8"))
+        if not isinstance(records, list):
+            raise ValueError(f"{path}: expected a JSON array of objects")
+        return records
+    with path.open(encoding="utf-8-sig", newline="") as f:
+        return list(csv.DictReader(f))
+
+
+def _field(record, name):
+    value = record.get(name)
+    return "" if value is None else str(value).strip()
+
+
+def load_answers(path):
+    """Read prefilled answers keyed by 項目番号 from a CSV or JSON file.
+
+    Each record has the columns of ANSWER_FIELDS; チェック結果 must be
+    empty or one of CHECK_STATUSES.
+    """
+    answers = {}
+    for record in _read_records(path):
+        number = _field(record, "項目番号")
+        if not number:
+            continue
+        status = _field(record, "チェック結果")
+        if status and status not in CHECK_STATUSES:
+            raise ValueError(f"{path}: {number}: invalid チェック結果 '{status}'")
+        answers[number] = Answer(
+            status, _field(record, "備考"), _field(record, "対応状況メモ")
+        )
+    return answers
+
+
+def output_name(organization):
+    """Return the default workbook file name of an organization."""
+    safe = re.sub(r'[\\/:*?"<>|\s]+', "_", organization).strip("_")
+    return f"{OUTPUT_FILE.stem}-{safe or 'blank'}.xlsx"
+
+
+def load_manifest(path, output_dir):
+    """Read the batch manifest (CSV or JSON with MANIFEST_FIELDS columns).
+
+    Relative answer file paths are resolved against the manifest's
+    directory, and output paths against output_dir. 出力ファイル defaults to
+    genai-governance-checklist-<組織名>.xlsx.
+    """
+    jobs = []
+    outputs = set()
+    for record in _read_records(path):
+        respondent = Respondent(
+            _field(record, "組織名"),
+            _field(record, "記入者"),
+            _field(record, "記入日"),
+        )
+        answers = _field(record, "回答ファイル")
+        output = output_dir / (
+            _field(record, "出力ファイル")
+            or output_name(respondent.organization)
+        )
+        if output in outputs:
+            raise ValueError(f"{path}: duplicate output file {output.name}")
+        outputs.add(output)
+        jobs.append(
+            BatchJob(
+                respondent,
+                path.parent / answers if answers else None,
+                output,
+            )
+        )
+    return jobs
@@ -0,0 +1,1503 @@
+#!/usr/bin/env python3
+"""
+生成AI利用ガイドライン チェックリスト — Excel ワークブックの構築
+
+tools/checklist.py のパース結果から openpyxl でチェックリスト・サマリー・クロスリファレンスの
+各シートを構築する。
+組織ごとの一括生成（プロセスプール）と、テンプレートの書き換えによる個別化もここで行う。
+
+仕様書: tools/docs/excel-spec.md
+"""
+
+import hashlib
+import os
+import re
+import shutil
+import sys
+import tempfile
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from io import BytesIO
+from pathlib import Path
+from zipfile import ZIP_DEFLATED, BadZipFile, ZipFile, ZipInfo
+
+import openpyxl
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.cell.cell import ERROR_CODES, ILLEGAL_CHARACTERS_RE
+from openpyxl.formatting.rule import CellIsRule
+from openpyxl.styles import (
+    Alignment,
+    Border,
+    Font,
+    NamedStyle,
+    PatternFill,
+    Protection,
+    Side,
+)
+from openpyxl.styles.borders import DEFAULT_BORDER
+from openpyxl.styles.fills import DEFAULT_EMPTY_FILL
+from openpyxl.utils import column_index_from_string, get_column_letter
+from openpyxl.utils.exceptions import IllegalCharacterError
+from openpyxl.worksheet.datavalidation import DataValidation
+from openpyxl.worksheet.page import PageMargins
+from openpyxl.worksheet.properties import PageSetupProperties
+
+from checklist import (
+    CHAPTER_COLORS,
+    CHECK_STATUSES,
+    COLUMNS,
+    DARK_BLUE_GRAY,
+    DARK_NAVY,
+    DATA_START_ROW,
+    FONT_NAME,
+    HEADER_ROW,
+    LEVELS,
+    LIGHT_GRAY,
+    NO_ANSWER,
+    NO_RESPONDENT,
+    NULL_PROFILER,
+    REFERENCE_TAGS,
+    TAG_BITS,
+    WHITE,
+    WRITER_ENGINES,
+    CrossReference,
+    _parser_signature,
+    is_reproducible,
+    load_answers,
+    output_timestamp,
+)
+
+# ---------------------------------------------------------------------------
+# Excel building: helpers
+# ---------------------------------------------------------------------------
+#
+# Both sheet builders emit their rows strictly top to bottom through
+# ws.append(), so the same code drives a regular Workbook and a write-only
+# (streaming) one. On a write-only sheet, column widths, freeze panes and
+# sheet properties are written before the first row and row heights when
+# their row is written; they are therefore set before the rows are
+# appended. Everything after the rows (protection, filter, merges,
+# formatting, validation, print settings) may be set at any time before
+# wb.save().
+
+
+def styled_cell(ws, value=None, style=None):
+    """Return a detached cell for ws.append(); works in both modes."""
+    cell = WriteOnlyCell(ws, value=value)
+    if style is not None:
+        cell.style = style
+    return cell
+
+
+def _merge(ws, ref):
+    """Merge a cell range on a regular or write-only worksheet."""
+    if ws.parent.write_only:
+        ws.merged_cells.add(ref)
+    else:
+        ws.merge_cells(ref)
+
+
+def solid_fill(color):
+    return PatternFill(start_color=color, end_color=color, fill_type="solid")
+
+
+class StyleRegistry:
+    """Named styles shared by every cell of the same kind.
+
+    Each style is added to the workbook once as a hidden NamedStyle and
+    cells refer to it by name, instead of every cell being assigned its
+    own Font/PatternFill/Alignment/Protection objects (each of which
+    openpyxl hashes and looks up again per assignment).
+    """
+
+    def __init__(self, wb):
+        self.wb = wb
+        self._names = set(wb.named_styles)
+
+    def add(self, name, font, fill=None, alignment=None, border=None,
+            number_format="General", locked=True):
+        """Register a style unless it already exists; returns its name."""
+        if name not in self._names:
+            self.wb.add_named_style(
+                NamedStyle(
+                    name=name,
+                    font=font,
+                    fill=fill or DEFAULT_EMPTY_FILL,
+                    alignment=alignment or Alignment(),
+                    border=border or DEFAULT_BORDER,
+                    number_format=number_format,
+                    protection=Protection(locked=locked),
+                    hidden=True,
+                )
+            )
+            self._names.add(name)
+        return name
+
+
+def append_table(ws, styles, headers, widths, rows):
+    """Append a styled header row and plain data rows.
+
+    Data cells are left unstyled: a collection of hundreds of files can
+    produce tens of thousands of comment rows, and assigning a style to
+    every cell would dominate the run time.
+    """
+    hdr_style = styles.add(
+        "collect-header",
+        font=Font(name=FONT_NAME, size=10, bold=True, color=WHITE),
+        fill=solid_fill(DARK_BLUE_GRAY),
+        alignment=Alignment(horizontal="center", vertical="center",
+                            wrap_text=True),
+    )
+    for i, width in enumerate(widths, 1):
+        ws.column_dimensions[get_column_letter(i)].width = width
+    ws.freeze_panes = "A2"
+    ws.append([styled_cell(ws, h, hdr_style) for h in headers])
+    for row in rows:
+        ws.append(row)
+    ws.auto_filter.ref = f"A1:{get_column_letter(len(headers))}1"
+
+
+# Cells filled in by the respondent; always written as text, so that an
+# answer starting with "=" is not turned into a formula.
+ANSWER_COLUMNS = ("A", "P", "Q")  # チェック結果, 備考, 対応状況メモ
+ANSWER_INDEXES = tuple(column_index_from_string(c) - 1 for c in ANSWER_COLUMNS)
+
+
+def _escape(text):
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def _checked_text(value):
+    """Apply openpyxl's string cell checks: truncation and illegal characters."""
+    value = value[:32767]
+    if ILLEGAL_CHARACTERS_RE.search(value):
+        raise IllegalCharacterError(f"{value} cannot be used in worksheets.")
+    return value
+
+
+def _cell_xml(ref, style, value, text=False):
+    """Serialise a cell value the way openpyxl's worksheet writer does.
+
+    `style` is the cell's ' s="N"' attribute (or ""). Strings get the
+    same checks as openpyxl cells: truncation, illegal characters,
+    formulas ("=...") and error codes, except that a `text` cell (one
+    whose data_type is forced to "s") is never a formula or error code.
+    """
+    if value is None:
+        return f'<c r="{ref}"{style} t="n" />'
+    if not isinstance(value, str):
+        return f'<c r="{ref}"{style} t="n"><v>{value}</v></c>'
+    if not value:
+        return f'<c r="{ref}"{style} t="inlineStr" />'
+
+    value = _checked_text(value)
+    if not text and len(value) > 1 and value[0] == "=":
+        return f'<c r="{ref}"{style}><f>{_escape(value[1:])}</f><v /></c>'
+    if not text and value in ERROR_CODES:
+        return f'<c r="{ref}"{style} t="e"><v>{_escape(value)}</v></c>'
+    stripped = value.strip()
+    space = ' xml:space="preserve"' if stripped and stripped != value else ""
+    return (
+        f'<c r="{ref}"{style} t="inlineStr"><is><t{space}>{_escape(value)}'
+        "</t></is></c>"
+    )
+
+
+class DirectWorkbook(Workbook):
+    """A Workbook whose checklist item rows are held by a DirectRows.
+
+    The rows are not worksheet cells, so a plain save() would write the
+    checklist without them; it raises instead. Save with save_workbook()
+    or workbook_bytes(), passing the DirectRows.
+    """
+
+    def save(self, filename):
+        raise TypeError(
+            "a workbook built with the fast writer engine must be saved "
+            "with save_workbook() or workbook_bytes() and its direct rows"
+        )
+
+
+class DirectRows:
+    """Checklist item rows serialised straight to worksheet XML.
+
+    The fast writer engine appends rows here instead of creating an
+    openpyxl cell object per value; workbook_bytes() splices them into
+    the checklist part that openpyxl writes. This relies on openpyxl
+    internals (Worksheet._cells, Workbook._cell_styles, Cell._style),
+    hence the version pin in requirements.txt. Cells are written exactly as
+    openpyxl would write them, and their styles are registered in the
+    order openpyxl's writer would first meet them (after the cells
+    already in the sheet), so the style indices, and therefore the whole
+    file, match the openpyxl engine. The rows are spooled to a temporary
+    file so that large checklists do not stay in memory as strings.
+    """
+
+    def __init__(self, ws):
+        self.ws = ws
+        self.letters = [get_column_letter(i) for i in range(1, len(COLUMNS) + 1)]
+        self.text = [letter in ANSWER_COLUMNS for letter in self.letters]
+        self.last_row = None
+        self.rows = tempfile.SpooledTemporaryFile(max_size=1 << 23)
+        if not ws.parent.write_only:
+            # Rows 1-3 are written (and their styles indexed) first.
+            for _key, cell in sorted(ws._cells.items()):
+                ws.parent._cell_styles.add(cell._style)
+
+    def style_attrs(self, styles):
+        """Return the s attribute of each named style, registering them."""
+        attrs = []
+        for name in styles:
+            cell = WriteOnlyCell(self.ws)
+            cell.style = name
+            style_id = self.ws.parent._cell_styles.add(cell._style)
+            attrs.append(f' s="{style_id}"' if cell.has_style else "")
+        return attrs
+
+    def append(self, row, values, attrs):
+        cells = "".join(
+            _cell_xml(f"{letter}{row}", attr, value, text)
+            for letter, text, attr, value in zip(
+                self.letters, self.text, attrs, values
+            )
+        )
+        self.rows.write(f'<row r="{row}">{cells}</row>'.encode("utf-8"))
+        self.last_row = row
+
+    def write_part(self, data, out):
+        """Write the checklist part `data` to `out` with the rows inserted."""
+        head, end, tail = data.partition(b"</sheetData>")
+        if self.last_row is not None:
+            # openpyxl sized the sheet without the rows it did not see.
+            head = RE_DIMENSION.sub(
+                rb"\g<1>" + str(self.last_row).encode("ascii") + rb"\g<2>",
+                head,
+                count=1,
+            )
+        out.write(head)
+        self.rows.seek(0)
+        shutil.copyfileobj(self.rows, out)
+        out.write(end + tail)
+
+
+# ---------------------------------------------------------------------------
+# Excel building: Checklist sheet
+# ---------------------------------------------------------------------------
+
+
+class ChecklistSheet:
+    """The main checklist sheet, built one item at a time.
+
+    The constructor writes the column layout and rows 1–3, add() appends
+    one item row and finish() adds the validation, formatting, filter,
+    protection and print settings. Items can therefore be pushed from any
+    stream (see build_checklist_sheet() and the export sinks); with a
+    write-only workbook each row is serialised as soon as it is added.
+
+    Args:
+        answers: optional dict mapping item number -> Answer, prefilled
+            into columns A, P and Q
+        tally: optional Counter updated with (chapter_num, level, status)
+            for every row; status is "" when unanswered
+        xref: optional CrossReference updated with every item
+        respondent: Respondent written into the row 2 input field
+        writer: "openpyxl", or "fast" to serialise the item rows directly
+            into `direct_rows` (see DirectRows; `wb` must then be a
+            DirectWorkbook, saved with save_workbook() or
+            workbook_bytes() given the direct rows)
+        profiler: Profiler timing the setup, rows and formatting steps
+    """
+
+    def __init__(self, wb, answers=None, tally=None, xref=None,
+                 respondent=NO_RESPONDENT,
+                 writer="openpyxl", profiler=NULL_PROFILER):
+        self.answers = {} if answers is None else answers
+        self.tally = tally
+        self.xref = xref
+        self.profiler = profiler
+
+        profiler.mark("setup")
+        if wb.write_only:
+            ws = wb.create_sheet("チェックリスト")
+        else:
+            ws = wb.active
+            ws.title = "チェックリスト"
+        self.ws = ws
+
+        last_col_letter = get_column_letter(len(COLUMNS))
+
+        # --- Column widths ---
+        for i, (_name, width) in enumerate(COLUMNS, 1):
+            ws.column_dimensions[get_column_letter(i)].width = width
+
+        # --- Freeze panes ---
+        ws.freeze_panes = "B4"
+
+        # --- Print settings (sheet properties precede the rows) ---
+        ws.sheet_properties.pageSetUpPr = PageSetupProperties(fitToPage=True)
+
+        self.styles = styles = StyleRegistry(wb)
+
+        # --- Title row (row 1) ---
+        ws.row_dimensions[1].height = 36
+        title_style = styles.add(
+            "checklist-title",
+            font=Font(name=FONT_NAME, size=16, bold=True, color=WHITE),
+            fill=solid_fill(DARK_NAVY),
+            alignment=Alignment(horizontal="center", vertical="center"),
+        )
+        ws.append([
+            styled_cell(ws, "生成AI利用ガイドライン チェックリスト", title_style)
+        ])
+        _merge(ws, f"A1:{last_col_letter}1")
+
+        # --- Input row (row 2, unlocked) ---
+        ws.row_dimensions[2].height = 28
+        input_style = styles.add(
+            "checklist-input",
+            font=Font(name=FONT_NAME, size=10),
+            fill=solid_fill(LIGHT_GRAY),
+            alignment=Alignment(vertical="center"),
+            locked=False,
+        )
+        ws.append([styled_cell(ws, respondent.input_text(), input_style)])
+        _merge(ws, f"A2:{last_col_letter}2")
+
+        # --- Header row (row 3) ---
+        white_side = Side(style="thin", color=WHITE)
+        header_style = styles.add(
+            "checklist-header",
+            font=Font(name=FONT_NAME, size=11, bold=True, color=WHITE),
+            fill=solid_fill(DARK_NAVY),
+            alignment=Alignment(
+                horizontal="center", vertical="center", wrap_text=True
+            ),
+            border=Border(
+                left=white_side, right=white_side,
+                top=white_side, bottom=white_side,
+            ),
+        )
+
+        ws.row_dimensions[HEADER_ROW].height = 40
+        self.headers = [name for name, _ in COLUMNS]
+        ws.append([styled_cell(ws, name, header_style) for name in self.headers])
+
+        # --- Data rows ---
+        self.data_font = Font(name=FONT_NAME, size=10)
+        self.wrap_top = Alignment(vertical="top", wrap_text=True)
+        self.center = Alignment(horizontal="center", vertical="center")
+
+        # Editable columns A (1), P (16), Q (17) are unlocked.
+        self.check_style = styles.add(
+            "checklist-check", font=self.data_font, locked=False
+        )
+        self.memo_style = styles.add(
+            "checklist-memo", font=self.data_font, alignment=self.wrap_top,
+            locked=False,
+        )
+        self.key_style = styles.add("checklist-key", font=self.data_font)
+        self.row_styles = {}
+
+        if writer not in WRITER_ENGINES:
+            raise ValueError(f"unknown writer engine: {writer}")
+        self.direct_rows = None
+        if writer == "fast":
+            if not isinstance(wb, DirectWorkbook):
+                raise ValueError("the fast writer engine needs a DirectWorkbook")
+            self.direct_rows = DirectRows(ws)
+
+        profiler.mark("rows")
+        self.row = DATA_START_ROW - 1
+
+    def _chapter_row_styles(self, ch_num):
+        """Styles of columns A–Q for a chapter, one set per chapter color."""
+        styles = self.styles
+        color = CHAPTER_COLORS.get(ch_num, WHITE)
+        fill = solid_fill(color)
+        # Chapter background for B–O; wrapping for H; centered tags I–O
+        base = styles.add(f"checklist-{color}", font=self.data_font, fill=fill)
+        text = styles.add(
+            f"checklist-{color}-text",
+            font=self.data_font, fill=fill, alignment=self.wrap_top,
+        )
+        tag = styles.add(
+            f"checklist-{color}-tag",
+            font=self.data_font, fill=fill, alignment=self.center,
+        )
+        return (
+            [self.check_style] + [base] * 6 + [text]
+            + [tag] * len(REFERENCE_TAGS) + [self.memo_style] * 2
+            + [self.key_style]
+        )
+
+    def add(self, item):
+        """Append the row of one ChecklistItem."""
+        self.row += 1
+        row = self.row
+        ch_num = item.chapter_num
+        row_styles = self.row_styles.get(ch_num)
+        if row_styles is None:
+            row_styles = self._chapter_row_styles(ch_num)
+            if self.direct_rows is not None:
+                # Only the styles of written columns get an index.
+                row_styles = self.direct_rows.style_attrs(
+                    row_styles[:len(self.headers)]
+                )
+            self.row_styles[ch_num] = row_styles
+
+        answer = self.answers.get(item.number, NO_ANSWER)
+        if self.tally is not None:
+            self.tally[(ch_num, item.level, answer.status)] += 1
+        if self.xref is not None:
+            self.xref.add(item)
+
+        row_data = [
+            answer.status,              # A: チェック結果
+            item.number,                # B: 項目番号
+            ch_num,                     # C: 章
+            item.chapter_title,         # D: 章タイトル
+            item.section_num,           # E: 節
+            item.section_title,         # F: 節タイトル
+            item.level,                 # G: 準拠レベル
+            item.text,                  # H: チェック項目
+        ]
+        # Reference tags (I–O)
+        for bit in TAG_BITS.values():
+            row_data.append("○" if item.tag_mask & bit else "")
+        # User columns (P–Q)
+        row_data.append(answer.note)  # P: 備考
+        row_data.append(answer.memo)  # Q: 対応状況メモ
+
+        if self.direct_rows is not None:
+            self.direct_rows.append(row, row_data, row_styles)
+            return
+        ws = self.ws
+        cells = [
+            styled_cell(ws, value, style)
+            for value, style in zip(row_data, row_styles)
+        ]
+        for index in ANSWER_INDEXES:
+            cells[index].data_type = "s"
+        ws.append(cells)
+
+    def finish(self):
+        """Add validation, formatting and print settings; returns data_end_row."""
+        ws = self.ws
+        profiler = self.profiler
+        last_col_letter = get_column_letter(len(COLUMNS))
+        data_end_row = self.row
+        num_rows = data_end_row - DATA_START_ROW + 1
+        profiler.count("checklist_rows", data_end_row)
+        profiler.count(
+            "checklist_cells", 2 + len(self.headers) * (1 + num_rows)
+        )
+
+        # --- Data validation: A column dropdown ---
+        profiler.mark("formatting")
+        dv = DataValidation(
+            type="list",
+            formula1='"対応済,一部対応,未対応,該当なし"',
+            allow_blank=True,
+        )
+        dv.error = "対応済・一部対応・未対応・該当なしから選択してください"
+        dv.errorTitle = "入力エラー"
+        dv.showErrorMessage = True
+        ws.data_validations.append(dv)
+        dv.add(f"A{DATA_START_ROW}:A{data_end_row}")
+
+        # --- Conditional formatting ---
+        a_range = f"A{DATA_START_ROW}:A{data_end_row}"
+        g_range = f"G{DATA_START_ROW}:G{data_end_row}"
+        tag_range = f"I{DATA_START_ROW}:O{data_end_row}"
+
+        # A column: check result
+        for status, bg, fg, italic in [
+            ("対応済", "C6EFCE", "006100", False),
+            ("一部対応", "FFEB9C", "9C6500", False),
+            ("未対応", "FFC7CE", "9C0006", False),
+            ("該当なし", "D9D9D9", "808080", True),
+        ]:
+            ws.conditional_formatting.add(
+                a_range,
+                CellIsRule(
+                    operator="equal",
+                    formula=[f'"{status}"'],
+                    fill=solid_fill(bg),
+                    font=Font(name=FONT_NAME, color=fg, italic=italic),
+                ),
+            )
+
+        # G column: enforcement level
+        for level, bg, fg, bold in [
+            ("Required", "F4B084", "843C0C", True),
+            ("Recommended", "BDD7EE", "1F4E79", False),
+            ("Option", "E2EFDA", "375623", False),
+        ]:
+            ws.conditional_formatting.add(
+                g_range,
+                CellIsRule(
+                    operator="equal",
+                    formula=[f'"{level}"'],
+                    fill=solid_fill(bg),
+                    font=Font(name=FONT_NAME, color=fg, bold=bold),
+                ),
+            )
+
+        # I–O columns: reference tag highlight
+        ws.conditional_formatting.add(
+            tag_range,
+            CellIsRule(
+                operator="equal",
+                formula=['"○"'],
+                fill=solid_fill("D6E4F0"),
+            ),
+        )
+
+        # --- Auto filter ---
+        ws.auto_filter.ref = f"A{HEADER_ROW}:{last_col_letter}{data_end_row}"
+
+        # --- Sheet protection (no password) ---
+        ws.protection.sheet = True
+
+        # --- Print settings ---
+        ws.page_setup.paperSize = 8  # A3
+        ws.page_setup.orientation = "landscape"
+        ws.page_setup.fitToWidth = 1
+        ws.page_setup.fitToHeight = 0
+        ws.page_margins = PageMargins(
+            left=0.59, right=0.59, top=0.59, bottom=0.59,
+            header=0.3, footer=0.3,
+        )
+        ws.print_title_rows = "1:3"
+        ws.print_title_cols = "A:B"
+        ws.oddHeader.left.text = "生成AI利用ガイドライン チェックリスト"
+        ws.oddHeader.right.text = "&P"
+        ws.oddFooter.center.text = "Confidential"
+
+        return data_end_row
+
+
+def build_checklist_sheet(wb, items, answers=None, tally=None, xref=None,
+                          respondent=NO_RESPONDENT, profiler=NULL_PROFILER):
+    """Build the main checklist sheet from an iterable of ChecklistItem.
+
+    Items are consumed one at a time, so a generator such as iter_items()
+    can be passed directly. The arguments are those of ChecklistSheet;
+    the rows are written by openpyxl (use ChecklistSheet or
+    build_workbook() for the fast writer engine).
+
+    Returns data_end_row.
+    """
+    sheet = ChecklistSheet(
+        wb,
+        answers=answers,
+        tally=tally,
+        xref=xref,
+        respondent=respondent,
+        profiler=profiler,
+    )
+    for item in items:
+        sheet.add(item)
+    return sheet.finish()
+
+
+# ---------------------------------------------------------------------------
+# Excel building: Summary engines
+# ---------------------------------------------------------------------------
+#
+# A summary engine supplies the value of every count cell on the サマリー
+# sheet: a formula string, or a number for the static engine. The sheet
+# layout itself is shared by all engines (see build_summary_sheet).
+
+
+def rate(num, den):
+    return num / den if den else 0
+
+
+class CountifsSummary:
+    """COUNTIF/COUNTIFS formulas scanning the checklist columns directly."""
+
+    static = False
+
+    def __init__(self, data_end_row):
+        cl = "'チェックリスト'"
+        self.a_ref = f"{cl}!$A${DATA_START_ROW}:$A${data_end_row}"
+        self.g_ref = f"{cl}!$G${DATA_START_ROW}:$G${data_end_row}"
+        self.c_ref = f"{cl}!$C${DATA_START_ROW}:$C${data_end_row}"
+
+    def status(self, status):
+        if not status:
+            return f"=COUNTBLANK({self.a_ref})"
+        return f'=COUNTIF({self.a_ref},"{status}")'
+
+    def level(self, level, status=None):
+        if status is None:
+            return f'=COUNTIF({self.g_ref},"{level}")'
+        return f'=COUNTIFS({self.g_ref},"{level}",{self.a_ref},"{status}")'
+
+    def chapter(self, ch_num, status=None):
+        if status is None:
+            return f"=COUNTIF({self.c_ref},{ch_num})"
+        return f'=COUNTIFS({self.c_ref},{ch_num},{self.a_ref},"{status}")'
+
+    def required_rate(self, ch_num):
+        req_total = f'COUNTIFS({self.c_ref},{ch_num},{self.g_ref},"Required")'
+        req_done = (
+            f'COUNTIFS({self.c_ref},{ch_num},{self.g_ref},"Required",'
+            f'{self.a_ref},"対応済")'
+        )
+        return f"=IFERROR({req_done}/{req_total},0)"
+
+
+class StaticSummary:
+    """Precomputed numbers from the tally of prefilled answers."""
+
+    static = True
+
+    def __init__(self, tally):
+        self.tally = tally
+
+    def _count(self, ch_num=None, level=None, status=None):
+        return sum(
+            n
+            for (ch, lv, st), n in self.tally.items()
+            if (ch_num is None or ch == ch_num)
+            and (level is None or lv == level)
+            and (status is None or st == status)
+        )
+
+    def status(self, status):
+        return self._count(status=status)
+
+    def level(self, level, status=None):
+        return self._count(level=level, status=status)
+
+    def chapter(self, ch_num, status=None):
+        return self._count(ch_num=ch_num, status=status)
+
+    def required_rate(self, ch_num):
+        return rate(
+            self._count(ch_num, "Required", "対応済"),
+            self._count(ch_num, "Required"),
+        )
+
+
+def summary_engine(name, data_end_row, tally=None):
+    """Return the summary engine called `name` (see SUMMARY_ENGINES)."""
+    if name == "countifs":
+        return CountifsSummary(data_end_row)
+    if name == "static":
+        if tally is None:
+            raise ValueError("the static summary engine needs a tally")
+        return StaticSummary(tally)
+    raise ValueError(f"unknown summary engine: {name}")
+
+
+# ---------------------------------------------------------------------------
+# Excel building: Summary sheet
+# ---------------------------------------------------------------------------
+
+
+def build_summary_sheet(wb, chapters, data_end_row, engine="countifs",
+                        tally=None, profiler=NULL_PROFILER):
+    """Build the summary dashboard sheet.
+
+    Args:
+        engine: name of the summary engine (see SUMMARY_ENGINES);
+            "static" writes numbers computed from `tally`.
+        tally: Counter filled by build_checklist_sheet
+        profiler: Profiler timing the rows, formatting and engine steps
+    """
+    profiler.mark("rows")
+    ws = wb.create_sheet("サマリー")
+    engine = summary_engine(engine, data_end_row, tally)
+
+    total_items = data_end_row - DATA_START_ROW + 1
+
+    def derived(formula, value):
+        """Formula for in-sheet arithmetic, or its value when static."""
+        return value() if engine.static else formula
+
+    # Common styles
+    styles = StyleRegistry(wb)
+    data_font = Font(name=FONT_NAME, size=10)
+    bold_font = Font(name=FONT_NAME, size=10, bold=True)
+    ctr = Alignment(horizontal="center", vertical="center")
+    pct_fmt = "0.0%"
+
+    title_style = styles.add(
+        "summary-title",
+        font=Font(name=FONT_NAME, size=14, bold=True, color=WHITE),
+        fill=solid_fill(DARK_NAVY),
+        alignment=ctr,
+    )
+    hdr_style = styles.add(
+        "summary-header",
+        font=Font(name=FONT_NAME, size=10, bold=True, color=WHITE),
+        fill=solid_fill(DARK_BLUE_GRAY),
+        alignment=ctr,
+    )
+    label_style = styles.add("summary-label", font=data_font)
+    count_style = styles.add("summary-count", font=data_font, alignment=ctr)
+    pct_style = styles.add(
+        "summary-pct", font=data_font, alignment=ctr, number_format=pct_fmt
+    )
+
+    def title(text):
+        return styled_cell(ws, text, title_style)
+
+    def header(text):
+        return styled_cell(ws, text, hdr_style)
+
+    def label(text):
+        return styled_cell(ws, text, label_style)
+
+    def count(formula):
+        return styled_cell(ws, formula, count_style)
+
+    def pct(formula):
+        return styled_cell(ws, formula, pct_style)
+
+    # Column widths
+    for col_letter, w in [
+        ("A", 22), ("B", 10), ("C", 10), ("D", 10),
+        ("E", 10), ("F", 10), ("G", 10), ("H", 12), ("I", 12),
+    ]:
+        ws.column_dimensions[col_letter].width = w
+
+    # Print settings (sheet properties precede the rows)
+    ws.sheet_properties.pageSetUpPr = PageSetupProperties(fitToPage=True)
+
+    # -------------------------------------------------------------------
+    # Section 1: Overall Summary (rows 1–8)
+    # -------------------------------------------------------------------
+    ws.row_dimensions[1].height = 32
+    ws.append([title("チェック結果 全体サマリー")])
+    _merge(ws, "A1:C1")
+
+    ws.append([header(text) for text in ["ステータス", "件数", "割合"]])
+
+    statuses = [(status, status) for status in CHECK_STATUSES]
+    statuses.append(("未記入", ""))
+    for i, (text, status) in enumerate(statuses):
+        row = 3 + i
+        n = engine.status(status)
+        ws.append([
+            label(text),
+            count(n),
+            pct(derived(f"=B{row}/{total_items}", lambda: n / total_items)),
+        ])
+
+    ws.append([
+        styled_cell(ws, "合計", styles.add("summary-total", font=bold_font)),
+        styled_cell(
+            ws,
+            total_items,
+            styles.add("summary-total-count", font=bold_font, alignment=ctr),
+        ),
+    ])
+    ws.append([])  # row 9
+
+    # -------------------------------------------------------------------
+    # Section 2: Level Summary (rows 10–14)
+    # -------------------------------------------------------------------
+    ws.row_dimensions[10].height = 32
+    ws.append([title("準拠レベル別 チェック結果")])
+    _merge(ws, "A10:H10")
+
+    lv_headers = [
+        "レベル", "項目数", "対応済", "一部対応",
+        "未対応", "該当なし", "未記入", "対応率",
+    ]
+    ws.append([header(text) for text in lv_headers])
+
+    for i, level in enumerate(LEVELS):
+        row = 12 + i
+        # Item count and status counts
+        n = engine.level(level)
+        counts = [engine.level(level, status) for status in CHECK_STATUSES]
+        ws.append(
+            [label(level), count(n)]
+            + [count(c) for c in counts]
+            + [
+                # 未記入 = total - sum of statuses
+                count(derived(
+                    f"=B{row}-SUM(C{row}:F{row})", lambda: n - sum(counts)
+                )),
+                # 対応率
+                pct(derived(
+                    f"=IFERROR(C{row}/B{row},0)", lambda: rate(counts[0], n)
+                )),
+            ]
+        )
+    ws.append([])  # row 15
+
+    # -------------------------------------------------------------------
+    # Section 3: Chapter Summary (rows 16–24)
+    # -------------------------------------------------------------------
+    ws.row_dimensions[16].height = 32
+    ws.append([title("章別 チェック結果")])
+    _merge(ws, "A16:I16")
+
+    ch_headers = [
+        "章", "項目数", "対応済", "一部対応",
+        "未対応", "該当なし", "未記入", "対応率", "必須対応率",
+    ]
+    ws.append([header(text) for text in ch_headers])
+
+    row = 17
+    for ch_num in range(1, max(chapters, default=0) + 1):
+        row = 17 + ch_num  # ch1 → row 18, ch7 → row 24
+        if ch_num not in chapters:
+            ws.append([])
+            continue
+        # Item count and status counts
+        n = engine.chapter(ch_num)
+        counts = [engine.chapter(ch_num, status) for status in CHECK_STATUSES]
+        ws.append(
+            [label(f"{ch_num}. {chapters[ch_num]}"), count(n)]
+            + [count(c) for c in counts]
+            + [
+                # 未記入
+                count(derived(
+                    f"=B{row}-SUM(C{row}:F{row})", lambda: n - sum(counts)
+                )),
+                # 対応率
+                pct(derived(
+                    f"=IFERROR(C{row}/B{row},0)", lambda: rate(counts[0], n)
+                )),
+                # 必須対応率
+                pct(engine.required_rate(ch_num)),
+            ]
+        )
+
+    # -------------------------------------------------------------------
+    # Conditional formatting on percentage cells
+    # -------------------------------------------------------------------
+    profiler.mark("formatting")
+    green = solid_fill("C6EFCE")
+    yellow = solid_fill("FFEB9C")
+    red = solid_fill("FFC7CE")
+
+    pct_ranges = ["C3:C7", "H12:H14", f"H18:I{max(row, 18)}"]
+    for rng in pct_ranges:
+        ws.conditional_formatting.add(
+            rng,
+            CellIsRule(
+                operator="greaterThanOrEqual",
+                formula=["1"],
+                fill=green,
+                stopIfTrue=True,
+            ),
+        )
+        ws.conditional_formatting.add(
+            rng,
+            CellIsRule(
+                operator="greaterThanOrEqual",
+                formula=["0.8"],
+                fill=yellow,
+                stopIfTrue=True,
+            ),
+        )
+        ws.conditional_formatting.add(
+            rng,
+            CellIsRule(
+                operator="lessThan",
+                formula=["0.8"],
+                fill=red,
+                stopIfTrue=True,
+            ),
+        )
+
+    # -------------------------------------------------------------------
+    # Section 4: Guide text (row 26, or one blank row below the chapters)
+    # -------------------------------------------------------------------
+    profiler.mark("rows")
+    guide_start = max(26, row + 2)
+    for _ in range(row + 1, guide_start):
+        ws.append([])
+    ws.append([
+        styled_cell(
+            ws,
+            "チェック結果の入力方法",
+            styles.add(
+                "summary-guide-title",
+                font=Font(name=FONT_NAME, size=12, bold=True),
+            ),
+        )
+    ])
+
+    guide_lines = [
+        "",
+        "チェック結果の選択基準:",
+        "　対応済:　　ガイドラインに該当する内容が記載されている",
+        "　一部対応:　内容は含まれているが不十分、または表現が曖昧",
+        "　未対応:　　ガイドラインに該当する記載がない",
+        "　該当なし:　自組織の状況に照らして対応不要と判断した項目",
+        "",
+        "推奨する進め方:",
+        "　1. まず「Required」項目だけをフィルタで表示し、すべてチェックする",
+        "　2. 次に「Recommended」項目を確認する",
+        "　3. 最後に「Option」項目を組織の状況に応じて検討する",
+        "　4.「該当なし」とした項目は、備考欄にその理由を記入する",
+    ]
+    for text in guide_lines:
+        ws.append([label(text)])
+
+    # --- Sheet protection ---
+    profiler.mark("formatting")
+    ws.protection.sheet = True
+
+    # --- Print settings ---
+    ws.page_setup.paperSize = 9  # A4
+    ws.page_setup.orientation = "portrait"
+    ws.page_setup.fitToWidth = 1
+    ws.page_setup.fitToHeight = 1
+    ws.page_margins = PageMargins(
+        left=0.79, right=0.79, top=0.79, bottom=0.79,
+        header=0.3, footer=0.3,
+    )
+
+
+# ---------------------------------------------------------------------------
+# Excel building: Cross-reference sheet
+# ---------------------------------------------------------------------------
+
+XREF_SHEET = "クロスリファレンス"
+NO_CLAUSE = "（条項指定なし）"
+
+
+def build_cross_reference_sheet(wb, xref, profiler=NULL_PROFILER):
+    """Build the framework -> clause -> item numbers sheet from a CrossReference.
+
+    One row per cited clause, in REFERENCE_TAGS and clause order, plus one
+    NO_CLAUSE row per framework for the items tagged without a clause.
+    """
+    profiler.mark("rows")
+    ws = wb.create_sheet(XREF_SHEET)
+    styles = StyleRegistry(wb)
+    data_font = Font(name=FONT_NAME, size=10)
+
+    title_style = styles.add(
+        "xref-title",
+        font=Font(name=FONT_NAME, size=14, bold=True, color=WHITE),
+        fill=solid_fill(DARK_NAVY),
+        alignment=Alignment(horizontal="center", vertical="center"),
+    )
+    hdr_style = styles.add(
+        "xref-header",
+        font=Font(name=FONT_NAME, size=10, bold=True, color=WHITE),
+        fill=solid_fill(DARK_BLUE_GRAY),
+        alignment=Alignment(horizontal="center", vertical="center"),
+    )
+    label_style = styles.add("xref-label", font=data_font)
+    count_style = styles.add(
+        "xref-count", font=data_font,
+        alignment=Alignment(horizontal="center", vertical="top"),
+    )
+    items_style = styles.add(
+        "xref-items", font=data_font,
+        alignment=Alignment(vertical="top", wrap_text=True),
+    )
+
+    for col_letter, width in [("A", 14), ("B", 24), ("C", 8), ("D", 70)]:
+        ws.column_dimensions[col_letter].width = width
+    ws.freeze_panes = "A3"
+    ws.sheet_properties.pageSetUpPr = PageSetupProperties(fitToPage=True)
+
+    ws.row_dimensions[1].height = 32
+    ws.append([styled_cell(ws, "参照フレームワーク 条項別 対応項目", title_style)])
+    _merge(ws, "A1:D1")
+    ws.append([
+        styled_cell(ws, text, hdr_style)
+        for text in ["フレームワーク", "条項", "項目数", "項目番号"]
+    ])
+
+    row = 2
+    for tag, clause, numbers in xref.rows():
+        row += 1
+        ws.append([
+            styled_cell(ws, tag, label_style),
+            styled_cell(ws, NO_CLAUSE if clause is None else clause, label_style),
+            styled_cell(ws, len(numbers), count_style),
+            styled_cell(ws, ", ".join(numbers), items_style),
+        ])
+    profiler.count("xref_rows", row - 2)
+
+    profiler.mark("formatting")
+    ws.auto_filter.ref = f"A2:D{row}"
+    ws.protection.sheet = True
+
+    ws.page_setup.paperSize = 9  # A4
+    ws.page_setup.orientation = "portrait"
+    ws.page_setup.fitToWidth = 1
+    ws.page_setup.fitToHeight = 0
+    ws.page_margins = PageMargins(
+        left=0.79, right=0.79, top=0.79, bottom=0.79,
+        header=0.3, footer=0.3,
+    )
+    ws.print_title_rows = "1:2"
+
+
+# ---------------------------------------------------------------------------
+# Workbook assembly and batch generation
+# ---------------------------------------------------------------------------
+
+CONTENT_TYPES_PART = "[Content_Types].xml"
+CORE_PROPERTIES_PART = "docProps/core.xml"
+CHECKLIST_PART = "xl/worksheets/sheet1.xml"
+RE_DIMENSION = re.compile(rb'(<dimension ref="[A-Z]+\d+:[A-Z]+)\d+(" />)')
+RE_CORE_DATE = re.compile(
+    rb"(<dcterms:(?:created|modified)\b[^>]*>)[^<]*(</dcterms:)"
+)
+
+
+def build_workbook(items, chapters, streaming=False, summary="countifs",
+                   answers=None, respondent=NO_RESPONDENT, writer="openpyxl",
+                   profiler=NULL_PROFILER):
+    """Build every sheet; returns (workbook, number of items, direct rows).
+
+    `chapters` may still be empty when `items` is a generator from
+    iter_items(); it is filled while the checklist sheet consumes it.
+    The direct rows are None unless writer="fast"; pass them on to
+    save_workbook() or workbook_bytes().
+    """
+    tally = Counter()
+    xref = CrossReference()
+    wb = (DirectWorkbook if writer == "fast" else Workbook)(
+        write_only=streaming
+    )
+    with profiler.phase("checklist"):
+        sheet = ChecklistSheet(
+            wb,
+            answers=answers,
+            tally=tally,
+            xref=xref,
+            respondent=respondent,
+            writer=writer,
+            profiler=profiler,
+        )
+        for item in items:
+            sheet.add(item)
+        data_end_row = sheet.finish()
+    with profiler.phase("summary"):
+        build_summary_sheet(
+            wb, chapters, data_end_row, engine=summary, tally=tally,
+            profiler=profiler,
+        )
+    with profiler.phase("xref"):
+        build_cross_reference_sheet(wb, xref, profiler=profiler)
+    return wb, data_end_row - DATA_START_ROW + 1, sheet.direct_rows
+
+
+def _zip_entry(name, stamp):
+    """A ZipInfo for `name` dated `stamp`, independent of the local system."""
+    info = ZipInfo(name, date_time=stamp.timetuple()[:6])
+    info.compress_type = ZIP_DEFLATED
+    info.external_attr = 0o644 << 16
+    return info
+
+
+def _stamp_core_properties(data, stamp):
+    """Set the created/modified dates of docProps/core.xml to `stamp`."""
+    iso = stamp.strftime("%Y-%m-%dT%H:%M:%SZ").encode("ascii")
+    return RE_CORE_DATE.sub(rb"\g<1>" + iso + rb"\g<2>", data)
+
+
+def workbook_bytes(wb, reproducible=None, direct_rows=None):
+    """Serialise `wb`, splicing in the `direct_rows` of the fast writer engine.
+
+    A reproducible workbook (see is_reproducible(): by default only when
+    SOURCE_DATE_EPOCH is set) gives the same bytes for the same content:
+    openpyxl stamps every zip entry and docProps/core.xml with the current
+    time, so the parts are rewritten in a fixed order ([Content_Types].xml
+    first, then by name) with the entry times, and the created/modified
+    properties, set to reproducible_timestamp(). Other workbooks keep
+    openpyxl's current-time stamps.
+    """
+    if isinstance(wb, DirectWorkbook) != (direct_rows is not None):
+        raise ValueError("direct rows must be given for, and only for, "
+                         "a workbook built with the fast writer engine")
+    reproducible = is_reproducible(reproducible)
+    buffer = BytesIO()
+    Workbook.save(wb, buffer)
+    direct = direct_rows
+    if direct is None and not reproducible:
+        return buffer.getvalue()
+
+    stamp = output_timestamp(reproducible)
+    out = BytesIO()
+    with ZipFile(buffer) as src, ZipFile(out, "w", ZIP_DEFLATED) as dst:
+        infos = src.infolist()
+        if reproducible:
+            infos.sort(
+                key=lambda i: (i.filename != CONTENT_TYPES_PART, i.filename)
+            )
+        for info in infos:
+            name = info.filename
+            if reproducible:
+                entry = _zip_entry(name, stamp)
+            else:
+                # Never src's own ZipInfo: writing it to dst moves the
+                # header offset that src.read() still relies on.
+                entry = ZipInfo(name, date_time=info.date_time)
+                entry.compress_type = info.compress_type
+                entry.external_attr = info.external_attr
+
+            if direct is not None and name == CHECKLIST_PART:
+                with dst.open(entry, "w") as part:
+                    direct.write_part(src.read(name), part)
+            elif reproducible and name == CORE_PROPERTIES_PART:
+                dst.writestr(
+                    entry, _stamp_core_properties(src.read(name), stamp)
+                )
+            else:
+                with src.open(name) as part, dst.open(entry, "w") as copy:
+                    shutil.copyfileobj(part, copy)
+    return out.getvalue()
+
+
+def _file_digest(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            h.update(chunk)
+    return h.digest()
+
+
+def _content_digest(file):
+    """Hash a workbook's parts, ignoring their order and timestamps.
+
+    The zip entry times and the created/modified properties are left
+    out, so a rebuild of unchanged content hashes the same even when it
+    is not reproducible. Returns None for a file that is not a zip.
+    """
+    h = hashlib.sha256()
+    try:
+        with ZipFile(file) as zf:
+            for name in sorted(zf.namelist()):
+                data = zf.read(name)
+                if name == CORE_PROPERTIES_PART:
+                    data = RE_CORE_DATE.sub(rb"\g<1>\g<2>", data)
+                h.update(name.encode("utf-8") + b"\0")
+                h.update(hashlib.sha256(data).digest())
+    except (OSError, BadZipFile):
+        return None
+    return h.digest()
+
+
+def save_workbook(wb, path, reproducible=None, direct_rows=None):
+    """Save to a temporary file next to `path`, then rename it into place.
+
+    Readers never see a half-written workbook, and the previous one stays
+    intact if the save fails. A workbook whose content matches the
+    existing file is not written at all (its mtime is kept); returns
+    False in that case, True otherwise. Reproducible workbooks are
+    compared byte for byte, others with _content_digest().
+    """
+    path = Path(path)
+    reproducible = is_reproducible(reproducible)
+    data = workbook_bytes(wb, reproducible, direct_rows)
+    if path.is_file():
+        if reproducible:
+            same = _file_digest(path) == hashlib.sha256(data).digest()
+        else:
+            same = _content_digest(path) == _content_digest(BytesIO(data))
+        if same:
+            return False
+
+    tmp = path.with_suffix(".tmp")
+    try:
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    return True
+
+
+class WorkbookSink:
+    """The checklist workbook as an export sink (see checklist_export.py).
+
+    Rows are added as the items arrive; close() adds the summary and
+    cross-reference sheets and saves with save_workbook(), so the file is
+    the one build_workbook() would give. `chapters` is the dict that
+    iter_items() fills while the items are parsed.
+    """
+
+    def __init__(self, path, chapters, streaming=False, summary="countifs",
+                 writer="openpyxl", reproducible=None):
+        self.path = Path(path)
+        self.chapters = chapters
+        self.summary = summary
+        self.reproducible = reproducible
+        self.tally = Counter()
+        self.xref = CrossReference()
+        self.wb = (DirectWorkbook if writer == "fast" else Workbook)(
+            write_only=streaming
+        )
+        self.sheet = ChecklistSheet(
+            self.wb,
+            tally=self.tally,
+            xref=self.xref,
+            writer=writer,
+        )
+
+    def write(self, item):
+        self.sheet.add(item)
+
+    def close(self):
+        data_end_row = self.sheet.finish()
+        build_summary_sheet(
+            self.wb, self.chapters, data_end_row, engine=self.summary,
+            tally=self.tally,
+        )
+        build_cross_reference_sheet(self.wb, self.xref)
+        save_workbook(self.wb, self.path, self.reproducible,
+                      self.sheet.direct_rows)
+
+    def discard(self):
+        pass
+
+
+# Per-process state of batch workers, set once by _init_batch_worker so
+# that the parsed items are not pickled again for every job.
+_batch = {}
+
+
+def _init_batch_worker(items, chapters, streaming, summary, template,
+                       reproducible, writer):
+    _batch.update(
+        items=items,
+        chapters=chapters,
+        streaming=streaming,
+        summary=summary,
+        template=template,
+        reproducible=reproducible,
+        writer=writer,
+    )
+
+
+def _run_batch_job(job):
+    """Build and save one workbook; returns the number of unknown items."""
+    answers = load_answers(job.answers_file) if job.answers_file else {}
+    job.output.parent.mkdir(parents=True, exist_ok=True)
+    if _batch["template"] is not None:
+        return _batch["template"].personalize(
+            job.output, answers, job.respondent, _batch["reproducible"]
+        )
+
+    wb, _, direct_rows = build_workbook(
+        _batch["items"],
+        _batch["chapters"],
+        streaming=_batch["streaming"],
+        summary=_batch["summary"],
+        answers=answers,
+        respondent=job.respondent,
+        writer=_batch["writer"],
+    )
+    save_workbook(wb, job.output, _batch["reproducible"], direct_rows)
+    known = {item.number for item in _batch["items"]}
+    return sum(1 for number in answers if number not in known)
+
+
+def run_batch(jobs, items, chapters, streaming=False, summary="countifs",
+              workers=None, template=None, reproducible=None,
+              writer="openpyxl"):
+    """Generate every job's workbook over a process pool.
+
+    With a TemplateSnapshot, each workbook is a patched copy of the
+    template instead of a full build.
+
+    Returns the list of (job, error message) for failed jobs.
+    """
+    workers = workers or os.cpu_count() or 1
+    initargs = (items, chapters, streaming, summary, template, reproducible,
+                writer)
+    failed = []
+
+    def report(job, unknown):
+        if unknown:
+            print(
+                f"Warning: {job.output.name}: {unknown} answers for unknown "
+                "item numbers were ignored.",
+                file=sys.stderr,
+            )
+
+    if workers == 1:
+        _init_batch_worker(*initargs)
+        for job in jobs:
+            try:
+                report(job, _run_batch_job(job))
+            except (OSError, ValueError, IllegalCharacterError) as e:
+                failed.append((job, str(e)))
+        return failed
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_batch_worker,
+        initargs=initargs,
+    ) as pool:
+        futures = {pool.submit(_run_batch_job, job): job for job in jobs}
+        for future in as_completed(futures):
+            job = futures[future]
+            try:
+                report(job, future.result())
+            except (OSError, ValueError, IllegalCharacterError) as e:
+                failed.append((job, str(e)))
+    return failed
+
+
+# ---------------------------------------------------------------------------
+# Template snapshots
+# ---------------------------------------------------------------------------
+
+# Bump when the patching below changes, to discard cached templates.
+TEMPLATE_VERSION = 3
+
+
+RE_EMPTY_CELL = re.compile(rb'<c r="([A-Z]+)(\d+)"([^>]*?)\s*/>')
+RE_INPUT_CELL = re.compile(rb'<c r="A2"([^>]*)>.*?</c>', re.S)
+
+
+def _inline_cell(ref, attrs, text):
+    """Serialise a string cell the way openpyxl writes it.
+
+    Raises IllegalCharacterError like an openpyxl cell would.
+    """
+    text = _checked_text(text)
+    escaped = (
+        text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+    )
+    space = ""
+    stripped = text.strip()
+    if stripped and text != stripped:
+        space = ' xml:space="preserve"'
+    return (
+        f'<c r="{ref}"{attrs}><is><t{space}>{escaped}</t></is></c>'
+    ).encode("utf-8")
+
+
+class TemplateSnapshot:
+    """A blank workbook whose personalised copies are produced by patching.
+
+    The checklist worksheet XML is split once into constant chunks and
+    the cells a copy can differ in: the row 2 input cell and the empty
+    answer cells (A, P, Q) of every item row. personalize() fills those
+    slots and writes every other zip member unchanged, so no styles,
+    validations or formulas are rebuilt per copy.
+    """
+
+    def __init__(self, data, items):
+        with ZipFile(BytesIO(data)) as zf:
+            self.infos = zf.infolist()
+            self.parts = {info.filename: zf.read(info) for info in self.infos}
+        self.rows = {
+            item.number: DATA_START_ROW + i for i, item in enumerate(items)
+        }
+
+        sheet = self.parts[CHECKLIST_PART]
+        self.chunks = []
+        self.slots = {}  # (column, row) -> (chunk index, attributes)
+        pos = 0
+
+        def slot(key, start, end, attrs):
+            nonlocal pos
+            self.chunks.append(sheet[pos:start])
+            self.slots[key] = (len(self.chunks), attrs.decode("utf-8"))
+            self.chunks.append(sheet[start:end])
+            pos = end
+
+        m = RE_INPUT_CELL.search(sheet)
+        slot(("A", 2), m.start(), m.end(), m.group(1))
+        for m in RE_EMPTY_CELL.finditer(sheet, pos):
+            column, row = m.group(1).decode(), int(m.group(2))
+            if column in ANSWER_COLUMNS and row >= DATA_START_ROW:
+                slot((column, row), m.start(), m.end(), m.group(3))
+        self.chunks.append(sheet[pos:])
+
+    def personalize(self, output, answers=None, respondent=NO_RESPONDENT,
+                    reproducible=None):
+        """Write a copy with row 2 and the answers filled in.
+
+        The copy is written to a temporary file next to `output` and
+        renamed into place, as in save_workbook(). Its entries and
+        created/modified properties are dated output_timestamp(); a
+        reproducible copy has the bytes of a full build. Returns the
+        number of answers whose item number is not in the template (they
+        are ignored). Raises IllegalCharacterError for text openpyxl would
+        reject, before anything is written.
+        """
+        chunks = list(self.chunks)
+
+        def fill(column, row, text):
+            index, attrs = self.slots[(column, row)]
+            chunks[index] = _inline_cell(f"{column}{row}", attrs, text)
+
+        fill("A", 2, respondent.input_text())
+        unknown = 0
+        for number, answer in (answers or {}).items():
+            row = self.rows.get(number)
+            if row is None:
+                unknown += 1
+                continue
+            for column, text in zip(
+                ANSWER_COLUMNS, (answer.status, answer.note, answer.memo)
+            ):
+                if text:
+                    fill(column, row, text)
+
+        sheet = b"".join(chunks)
+        stamp = output_timestamp(reproducible)
+        output = Path(output)
+        tmp = output.with_suffix(".tmp")
+        try:
+            with ZipFile(tmp, "w", ZIP_DEFLATED) as zf:
+                for info in self.infos:
+                    name = info.filename
+                    if name == CHECKLIST_PART:
+                        data = sheet
+                    elif name == CORE_PROPERTIES_PART:
+                        data = _stamp_core_properties(self.parts[name], stamp)
+                    else:
+                        data = self.parts[name]
+                    zf.writestr(_zip_entry(name, stamp), data)
+            os.replace(tmp, output)
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+        return unknown
+
+
+def load_template(items, chapters, summary="countifs", cache=None,
+                  writer="openpyxl"):
+    """Build the blank template, or reuse the one cached for these items.
+
+    The template is keyed by the parsed items themselves, so any change
+    to the chapters (or to the generator) produces a new one. The writer
+    engine is not part of the key: both write identical bytes.
+    """
+    if summary == "static":
+        raise ValueError("templates need a formula summary engine, not static")
+
+    key = hashlib.sha256(
+        repr(
+            (TEMPLATE_VERSION, _parser_signature(), summary,
+             openpyxl.__version__, items)
+        ).encode("utf-8")
+    ).hexdigest()
+    path = cache.directory / f"template-{key}.xlsx" if cache else None
+
+    if path is not None and path.exists() and not cache.rebuild:
+        data = path.read_bytes()
+    else:
+        wb, _, direct_rows = build_workbook(items, chapters, summary=summary,
+                                            writer=writer)
+        data = workbook_bytes(wb, True, direct_rows)
+        if path is not None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(".tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+    return TemplateSnapshot(data, items)
@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+生成AI利用ガイドライン チェックリスト — 複数形式への一括エクスポート
+
+章ファイルを1回だけパースし、チェック項目を JSONL・CSV・ODS（と Excel）の各シンクへ
+1件ずつ流す。各シンクは項目を受け取るたびに書き出すため、全項目をメモリに保持しない。
+スレッドプールで各シンクを並行に動かす場合も、シンクごとのキューの長さを制限する。
+標準ライブラリだけで動作する（Excel のシンクは tools/checklist_excel.py の WorkbookSink）。
+
+仕様書: tools/docs/excel-spec.md
+"""
+
+import csv
+import json
+import os
+import queue
+import sys
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from xml.sax.saxutils import escape
+from zipfile import ZIP_DEFLATED, ZIP_STORED, ZipFile, ZipInfo
+
+from checklist import REFERENCE_TAGS, item_record, output_timestamp
+
+# Columns of the tabular formats (CSV, ODS): checklist columns B–O and
+# the reference clauses
+EXPORT_FIELDS = (
+    "項目番号", "章", "章タイトル", "節", "節タイトル", "準拠レベル", "チェック項目",
+    *REFERENCE_TAGS, "参照条項",
+)
+
+# Items handed to a sink thread at a time, and batches queued per sink
+EXPORT_BATCH = 64
+EXPORT_QUEUE_SIZE = 16
+
+
+def item_row(item):
+    """Return the EXPORT_FIELDS values of a ChecklistItem."""
+    return [
+        item.number,
+        item.chapter_num,
+        item.chapter_title,
+        item.section_num,
+        item.section_title,
+        item.level,
+        item.text,
+        *("○" if item.has_tag(tag) else "" for tag in REFERENCE_TAGS),
+        "; ".join(f"{tag}: {clause}" for tag, clause in item.clauses),
+    ]
+
+
+# ---------------------------------------------------------------------------
+# Sinks
+# ---------------------------------------------------------------------------
+#
+# A sink receives the items through write(item), one at a time and in
+# order, then close() (the output is complete) or discard() (the export
+# failed). File sinks write to a temporary file next to the output and
+# rename it into place on close(), like save_workbook().
+
+
+class FileSink(ABC):
+    """Base class of the sinks writing one file through a temporary file."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.tmp = self.path.with_name(self.path.name + ".tmp")
+
+    @abstractmethod
+    def write(self, item):
+        """Write one ChecklistItem."""
+
+    @abstractmethod
+    def _close_file(self):
+        """Finish and close the temporary file."""
+
+    def close(self):
+        self._close_file()
+        os.replace(self.tmp, self.path)
+
+    def discard(self):
+        try:
+            self._close_file()
+        finally:
+            self.tmp.unlink(missing_ok=True)
+
+
+class JsonlSink(FileSink):
+    """One item_record() JSON object per line."""
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.file = self.tmp.open("w", encoding="utf-8", newline="\n")
+
+    def write(self, item):
+        self.file.write(json.dumps(item_record(item), ensure_ascii=False))
+        self.file.write("\n")
+
+    def _close_file(self):
+        self.file.close()
+
+
+class CsvSink(FileSink):
+    """EXPORT_FIELDS columns, UTF-8 with BOM so that Excel detects it."""
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.file = self.tmp.open("w", encoding="utf-8-sig", newline="")
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(EXPORT_FIELDS)
+
+    def write(self, item):
+        self.writer.writerow(item_row(item))
+
+    def _close_file(self):
+        self.file.close()
+
+
+ODS_MIMETYPE = "application/vnd.oasis.opendocument.spreadsheet"
+ODS_MANIFEST = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<manifest:manifest xmlns:manifest="urn:oasis:names:tc:opendocument:'
+    'xmlns:manifest:1.0" manifest:version="1.2">'
+    '<manifest:file-entry manifest:full-path="/" manifest:version="1.2" '
+    f'manifest:media-type="{ODS_MIMETYPE}"/>'
+    '<manifest:file-entry manifest:full-path="content.xml" '
+    'manifest:media-type="text/xml"/>'
+    "</manifest:manifest>"
+)
+ODS_CONTENT_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    "<office:document-content"
+    ' xmlns:office="urn:oasis:names:tc:opendocument:xmlns:office:1.0"'
+    ' xmlns:table="urn:oasis:names:tc:opendocument:xmlns:table:1.0"'
+    ' xmlns:text="urn:oasis:names:tc:opendocument:xmlns:text:1.0"'
+    ' office:version="1.2">'
+    "<office:body><office:spreadsheet>"
+    '<table:table table:name="チェックリスト">'
+)
+ODS_CONTENT_TAIL = (
+    "</table:table></office:spreadsheet></office:body>"
+    "</office:document-content>"
+)
+
+
+def _ods_cell(value):
+    if value is None or value == "":
+        return "<table:table-cell/>"
+    if isinstance(value, int):
+        return (
+            '<table:table-cell office:value-type="float" '
+            f'office:value="{value}"><text:p>{value}</text:p>'
+            "</table:table-cell>"
+        )
+    return (
+        '<table:table-cell office:value-type="string">'
+        f"<text:p>{escape(value)}</text:p></table:table-cell>"
+    )
+
+
+def _ods_row(values):
+    cells = "".join(_ods_cell(value) for value in values)
+    return f"<table:table-row>{cells}</table:table-row>".encode("utf-8")
+
+
+class OdsSink(FileSink):
+    """An OpenDocument spreadsheet with the EXPORT_FIELDS columns.
+
+    content.xml is streamed into the zip row by row. The mimetype entry
+    comes first and uncompressed, as ODF requires. Entries are dated
+    output_timestamp(), so with SOURCE_DATE_EPOCH set the same items give
+    the same bytes.
+    """
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.zip = ZipFile(self.tmp, "w", ZIP_DEFLATED)
+        date_time = output_timestamp().timetuple()[:6]
+
+        def entry(name, compress_type=ZIP_DEFLATED):
+            info = ZipInfo(name, date_time=date_time)
+            info.compress_type = compress_type
+            info.external_attr = 0o644 << 16
+            return info
+
+        self.zip.writestr(entry("mimetype", ZIP_STORED), ODS_MIMETYPE)
+        self.zip.writestr(entry("META-INF/manifest.xml"), ODS_MANIFEST)
+        self.content = self.zip.open(entry("content.xml"), "w")
+        self.content.write(ODS_CONTENT_HEAD.encode("utf-8"))
+        self.content.write(_ods_row(EXPORT_FIELDS))
+
+    def write(self, item):
+        self.content.write(_ods_row(item_row(item)))
+
+    def _close_file(self):
+        if not self.content.closed:
+            self.content.write(ODS_CONTENT_TAIL.encode("utf-8"))
+            self.content.close()
+        self.zip.close()
+
+
+EXPORT_FORMATS = {"jsonl": JsonlSink, "csv": CsvSink, "ods": OdsSink}
+
+
+# ---------------------------------------------------------------------------
+# Pipeline
+# ---------------------------------------------------------------------------
+
+_DONE = object()
+_ABORT = object()
+
+
+def _drain(sink, batches):
+    """Feed a sink from its queue until _DONE (then close it) or _ABORT.
+
+    After an error the queue is still emptied, so that the producer never
+    blocks on a sink that stopped reading.
+    """
+    error = None
+    while True:
+        batch = batches.get()
+        if batch is _DONE or batch is _ABORT:
+            break
+        if error is None:
+            try:
+                for item in batch:
+                    sink.write(item)
+            except Exception as exc:
+                error = exc
+    if error is not None:
+        raise error
+    if batch is _DONE:
+        sink.close()
+
+
+def _export_threaded(items, sinks):
+    queues = [queue.Queue(EXPORT_QUEUE_SIZE) for _ in sinks]
+    count = 0
+    with ThreadPoolExecutor(len(sinks)) as pool:
+        futures = [
+            pool.submit(_drain, sink, batches)
+            for sink, batches in zip(sinks, queues)
+        ]
+        end = _ABORT
+        try:
+            batch = []
+            for item in items:
+                batch.append(item)
+                count += 1
+                if len(batch) == EXPORT_BATCH:
+                    for batches in queues:
+                        batches.put(batch)
+                    batch = []
+            if batch:
+                for batches in queues:
+                    batches.put(batch)
+            end = _DONE
+        finally:
+            for batches in queues:
+                batches.put(end)
+        for future in futures:
+            future.result()
+    return count
+
+
+def export_items(items, sinks, threads=False):
+    """Stream items from one parse to every sink; returns the item count.
+
+    With threads=True each sink runs (and is closed) in its own thread of
+    a pool and receives the items in batches of EXPORT_BATCH through a
+    queue of at most EXPORT_QUEUE_SIZE batches, so memory stays bounded
+    when a sink is slower than the parser. Otherwise each item is handed
+    to every sink in turn. On an error the sinks that have not completed
+    are discarded and the error is re-raised; a sink that cannot be
+    discarded is reported on stderr.
+    """
+    if not sinks:
+        return sum(1 for _item in items)
+    try:
+        if threads:
+            return _export_threaded(items, sinks)
+        count = 0
+        for item in items:
+            for sink in sinks:
+                sink.write(item)
+            count += 1
+        for sink in sinks:
+            sink.close()
+        return count
+    except BaseException:
+        for sink in sinks:
+            try:
+                sink.discard()
+            except Exception as exc:
+                print(f"Warning: {sink.path}: could not discard the "
+                      f"partial output: {exc}", file=sys.stderr)
+        raise
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+生成AI利用ガイドライン チェックリスト — 項目の重複・類似の検出
+
+チェック項目・説明・定義例の文字 n-gram（シングル）から MinHash の署名を作り、
+LSH（署名を帯に分けたバケット）で類似の候補となる項目の組を求める。
+全項目の総当たり（項目数の2乗）ではなく、項目数にほぼ比例する時間で候補を絞り、
+候補の組だけシングルの Jaccard 係数を計算して報告する。
+署名は項目ごとに本文のハッシュと合わせてキャッシュし、再実行では変更された項目だけを
+ハッシュし直す。標準ライブラリだけで動作する。
+
+仕様書: tools/docs/excel-spec.md
+"""
+
+import hashlib
+import json
+import os
+import random
+from dataclasses import dataclass
+from pathlib import Path
+
+from checklist import CACHE_DIR
+from checklist_search import normalize
+
+OVERLAP_CACHE = CACHE_DIR / "overlap.json"
+
+SHINGLE_SIZE = 3          # characters per shingle
+NUM_PERM = 120            # MinHash values per signature
+DEFAULT_THRESHOLD = 0.5   # reported Jaccard similarity
+MIN_RECALL = 0.99         # chance that a pair at the threshold is a candidate
+
+# Hash functions h(x) = (a * x + b) mod MERSENNE over 61-bit shingle
+# hashes; fixed by the seed so that cached signatures stay valid.
+MERSENNE = (1 << 61) - 1
+_rng = random.Random(20260401)
+PERMUTATIONS = tuple(
+    (_rng.randrange(1, MERSENNE), _rng.randrange(MERSENNE))
+    for _ in range(NUM_PERM)
+)
+del _rng
+
+# Bump when shingling or hashing changes, so cached signatures die with it.
+SIGNATURE_VERSION = 1
+
+
+def item_text(item, bodies=True):
+    """Return the text compared for an item (with 説明 and 定義例)."""
+    if not bodies:
+        return item.text
+    return " ".join(filter(None, (item.text, item.description, item.example)))
+
+
+def shingles(text, size=SHINGLE_SIZE):
+    """Return the set of character n-grams of text.
+
+    Text is folded as for the search index (NFKC, lower case) and
+    reduced to letters and digits, so punctuation and spacing do not
+    tell items apart. A text shorter than `size` is one shingle.
+    """
+    folded = "".join(ch for ch in normalize(text) if ch.isalnum())
+    if len(folded) <= size:
+        return {folded} if folded else set()
+    return {folded[i:i + size] for i in range(len(folded) - size + 1)}
+
+
+def minhash(shingle_set):
+    """Return the NUM_PERM MinHash values of a shingle set."""
+    hashes = [
+        int.from_bytes(
+            hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(),
+            "little",
+        ) % MERSENNE
+        for s in shingle_set
+    ]
+    if not hashes:
+        return [MERSENNE] * NUM_PERM
+    return [min([(a * x + b) % MERSENNE for x in hashes])
+            for a, b in PERMUTATIONS]
+
+
+def jaccard(first, second):
+    if not first and not second:
+        return 1.0
+    return len(first & second) / len(first | second)
+
+
+# ---------------------------------------------------------------------------
+# Signature cache
+# ---------------------------------------------------------------------------
+
+
+class SignatureCache:
+    """MinHash signatures per item, keyed by the hash of its shingles.
+
+    A signature is reused while the item's compared text folds to the
+    same shingles; an edited item is hashed again. With a path the
+    signatures are kept in one JSON file between runs (see save()).
+    """
+
+    def __init__(self, path=None, rebuild=False):
+        self.path = None if path is None else Path(path)
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}   # item number -> (key, signature)
+        if self.path is not None and not rebuild:
+            try:
+                entry = json.loads(self.path.read_text("utf-8"))
+            except (OSError, ValueError):
+                entry = None
+            if entry is not None and entry.get("version") == self._version():
+                self._entries = {
+                    number: (key, signature)
+                    for number, (key, signature) in entry["items"].items()
+                }
+
+    @staticmethod
+    def _version():
+        return f"{SIGNATURE_VERSION}:{SHINGLE_SIZE}:{NUM_PERM}"
+
+    @staticmethod
+    def key(shingle_set):
+        h = hashlib.sha256()
+        for shingle in sorted(shingle_set):
+            h.update(shingle.encode("utf-8"))
+            h.update(b"\0")
+        return h.hexdigest()
+
+    def signature(self, number, shingle_set):
+        """Return the signature of an item, hashing it only if changed."""
+        key = self.key(shingle_set)
+        cached = self._entries.get(number)
+        if cached is not None and cached[0] == key:
+            self.hits += 1
+            return cached[1]
+        self.misses += 1
+        signature = minhash(shingle_set)
+        self._entries[number] = (key, signature)
+        return signature
+
+    def save(self, numbers=None):
+        """Write the cache (atomically), keeping only `numbers` if given."""
+        if self.path is None:
+            return
+        entries = self._entries
+        if numbers is not None:
+            entries = {n: entries[n] for n in numbers if n in entries}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(
+            json.dumps({"version": self._version(), "items": entries}),
+            "utf-8",
+        )
+        os.replace(tmp, self.path)
+
+    def report(self):
+        total = self.hits + self.misses
+        return f"Signature cache: {self.hits}/{total} reused"
+
+
+# ---------------------------------------------------------------------------
+# Detection
+# ---------------------------------------------------------------------------
+
+
+@dataclass(frozen=True, slots=True)
+class Overlap:
+    """A candidate pair of similar items."""
+
+    first: object         # ChecklistItem
+    second: object        # ChecklistItem
+    similarity: float     # Jaccard similarity of the shingle sets
+    estimate: float       # share of equal MinHash values
+
+
+def candidate_probability(similarity, bands):
+    """Return the chance that a pair of this similarity is an LSH candidate.
+
+    With r = NUM_PERM // bands values per band it is 1 - (1 - s^r)^bands,
+    an S-curve rising around (1 / bands)^(1 / r).
+    """
+    rows = NUM_PERM // bands
+    return 1 - (1 - similarity ** rows) ** bands
+
+
+def lsh_bands(threshold, recall=MIN_RECALL):
+    """Return the number of LSH bands to use for a similarity threshold.
+
+    The widest bands (fewest candidates to compare) that still make a
+    pair at `threshold` a candidate with probability `recall` are
+    chosen: 40 bands of 3 values at 0.5, 60 of 2 at 0.3, 120 of 1 at
+    0.2. Below about 0.04 no banding reaches `recall` and NUM_PERM
+    bands of one value are returned.
+    """
+    for bands in range(1, NUM_PERM + 1):
+        if NUM_PERM % bands == 0 and (
+            candidate_probability(threshold, bands) >= recall
+        ):
+            return bands
+    return NUM_PERM
+
+
+def lsh_candidates(signatures, bands):
+    """Return the index pairs sharing a bucket in any band.
+
+    Each signature is cut into `bands` slices; items whose slices are
+    equal in some band land in the same bucket (see
+    candidate_probability()).
+    """
+    rows = NUM_PERM // bands
+    pairs = set()
+    for band in range(bands):
+        start = band * rows
+        buckets = {}
+        for i, signature in enumerate(signatures):
+            buckets.setdefault(
+                tuple(signature[start:start + rows]), []
+            ).append(i)
+        for members in buckets.values():
+            for n, i in enumerate(members):
+                pairs.update((i, j) for j in members[n + 1:])
+    return pairs
+
+
+def find_overlaps(items, cache=None, threshold=DEFAULT_THRESHOLD,
+                  bodies=True, bands=None):
+    """Return the item pairs at or above `threshold`, most similar first.
+
+    Only the LSH candidates are compared exactly, so the work grows with
+    the number of items and of similar pairs rather than all pairs.
+    `bands` defaults to lsh_bands(threshold).
+    """
+    if cache is None:
+        cache = SignatureCache()
+    if bands is None:
+        bands = lsh_bands(threshold)
+    items = list(items)
+    sets = [shingles(item_text(item, bodies)) for item in items]
+    signatures = [cache.signature(item.number, shingle_set)
+                  for item, shingle_set in zip(items, sets)]
+    found = []
+    for i, j in lsh_candidates(signatures, bands):
+        similarity = jaccard(sets[i], sets[j])
+        if similarity >= threshold:
+            equal = sum(x == y for x, y in zip(signatures[i], signatures[j]))
+            found.append(Overlap(items[i], items[j], similarity,
+                                 equal / NUM_PERM))
+    found.sort(key=lambda o: (-o.similarity, o.first.number,
+                              o.second.number))
+    return found
+
+
+def overlap_record(overlap):
+    """Return a JSON-serializable dict for an Overlap."""
+    return {
+        "first": overlap.first.number,
+        "second": overlap.second.number,
+        "similarity": round(overlap.similarity, 4),
+        "estimate": round(overlap.estimate, 4),
+        "first_text": overlap.first.text,
+        "second_text": overlap.second.text,
+    }
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+生成AI利用ガイドライン チェックリスト — 定義例からのガイドライン草案
+
+選択したチェック項目（準拠レベル・章・参照タグで絞り込み）の定義例を、章・節の
+見出しの下に番号付きの条文として並べ、「[対応: 1.1.A]」の注記を付けた
+ガイドラインの草案（Markdown と HTML）を組み立てる。
+節ごとに、その節の項目（番号・準拠レベル・定義例）のハッシュと描画結果を
+キャッシュし、項目が変わった節だけを描画し直す。pandoc は使わず、
+標準ライブラリだけで動作する。
+
+docs/guideline-sample/guideline-sample.md は手書きのサンプルであり、
+この草案で置き換えるものではない。
+
+仕様書: tools/docs/excel-spec.md
+"""
+
+import hashlib
+import json
+import os
+from html import escape
+from itertools import groupby
+from pathlib import Path
+
+from checklist import CACHE_DIR, REPO_ROOT
+
+SAMPLE_DIR = REPO_ROOT / "docs" / "guideline-sample"
+SAMPLE_FILE = SAMPLE_DIR / "guideline-draft.md"
+SAMPLE_TITLE = "生成AI利用ガイドライン（草案）"
+SAMPLE_CACHE = CACHE_DIR / "sample.json"
+
+# Characters a provision may end with as written
+SENTENCE_ENDS = "。．.！？!?）)」"
+
+# Bump when the fragment markup changes, so cached fragments die with it.
+SAMPLE_VERSION = 1
+
+SAMPLE_STYLE = (
+    "body{max-width:48em;margin:2em auto;padding:0 1em;line-height:1.7;"
+    "font-family:sans-serif}"
+    ".ref{color:#44546A;font-size:.85em;white-space:nowrap}"
+)
+
+
+def provision(example):
+    """Return a 定義例 as provision text, without enclosing 「」.
+
+    The brackets are only removed when the opening one closes at the
+    end, so 「A」と「B」 is kept as written. A full stop is added unless
+    the text already ends a sentence.
+    """
+    if (example.startswith("「")
+            and _closing_bracket(example) == len(example) - 1):
+        example = example[1:-1]
+    if example and example[-1] not in SENTENCE_ENDS:
+        example += "。"
+    return example
+
+
+def _closing_bracket(text):
+    """Return the position of the 」 closing text[0], or -1."""
+    depth = 0
+    for pos, ch in enumerate(text):
+        if ch == "「":
+            depth += 1
+        elif ch == "」":
+            depth -= 1
+            if depth == 0:
+                return pos
+    return -1
+
+
+def _section_key(item):
+    if item.section:
+        return item.section.num
+    return str(item.chapter_num)
+
+
+def _sections(items):
+    """Group the items with a 定義例 by section, in order.
+
+    Yields (key, chapter, section, items); the items of a section are
+    contiguous in the parse order.
+    """
+    selected = (item for item in items if item.example)
+    for key, group in groupby(selected, key=_section_key):
+        group = list(group)
+        yield key, group[0].chapter, group[0].section, group
+
+
+def _digest(key, section, items):
+    content = [
+        SAMPLE_VERSION, key,
+        section.title if section else "",
+        [[item.number, item.level, item.example] for item in items],
+    ]
+    return hashlib.sha256(
+        json.dumps(content, ensure_ascii=False).encode("utf-8")
+    ).hexdigest()
+
+
+def _chapter_heading(chapter):
+    return f"第{chapter.num}章　{chapter.title}" if chapter else "その他"
+
+
+def _section_heading(key, section):
+    return f"{section.num} {section.title}" if section else key
+
+
+def render_section(key, section, items):
+    """Return the (Markdown, HTML) fragments of one section."""
+    heading = _section_heading(key, section)
+    md = [f"### {heading}", ""]
+    html = [f'<section id="sec-{escape(key)}">',
+            f"<h3>{escape(heading)}</h3>", "<ol>"]
+    for n, item in enumerate(items, 1):
+        text = provision(item.example)
+        md.append(f"{n}. {text} [対応: {item.number}]")
+        html.append(
+            f"<li>{escape(text)} "
+            f'<span class="ref">[対応: {escape(item.number)}]</span></li>'
+        )
+    md.append("")
+    html += ["</ol>", "</section>"]
+    return "\n".join(md), "\n".join(html) + "\n"
+
+
+class SampleRenderer:
+    """Render the draft guideline, re-rendering changed sections only.
+
+    Fragments are kept per section with the digest of the section's
+    items; render() reuses a fragment whose digest still matches and
+    counts the sections rendered and reused. With a cache path the
+    fragments survive between runs (see load() and save()).
+    """
+
+    def __init__(self, path=None, rebuild=False):
+        self.path = None if path is None else Path(path)
+        self._fragments = {}   # section key -> (digest, markdown, html)
+        self.rendered = 0
+        self.reused = 0
+        if self.path is not None and not rebuild:
+            self.load()
+
+    def load(self):
+        try:
+            entry = json.loads(self.path.read_text("utf-8"))
+        except (OSError, ValueError):
+            return
+        if entry.get("version") == SAMPLE_VERSION:
+            self._fragments = {
+                key: tuple(fragment)
+                for key, fragment in entry["fragments"].items()
+            }
+
+    def save(self):
+        """Write the fragments to the cache file (atomically)."""
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(
+            json.dumps({"version": SAMPLE_VERSION,
+                        "fragments": self._fragments}, ensure_ascii=False),
+            "utf-8",
+        )
+        os.replace(tmp, self.path)
+
+    def _fragment(self, key, section, items):
+        digest = _digest(key, section, items)
+        cached = self._fragments.get(key)
+        if cached is not None and cached[0] == digest:
+            self.reused += 1
+            return cached[1], cached[2]
+        self.rendered += 1
+        md, html = render_section(key, section, items)
+        self._fragments[key] = (digest, md, html)
+        return md, html
+
+    def render(self, items, scope="", title=SAMPLE_TITLE):
+        """Return the (Markdown, HTML) documents of the selected items.
+
+        `scope` describes the selection in the lead paragraph. The
+        chapter headings and the table of contents are assembled around
+        the section fragments on every call; they cost no more than
+        joining the strings.
+        """
+        self.rendered = self.reused = 0
+        lead = "チェックリストの定義例から組み立てた草案。"
+        if scope:
+            lead += f"対象: {scope}"
+        md = [f"# {title}", "", lead, ""]
+        body = []
+        toc = []
+        chapter = object()   # no chapter heading written yet
+        for key, item_chapter, section, section_items in _sections(items):
+            if item_chapter != chapter:
+                chapter = item_chapter
+                heading = _chapter_heading(chapter)
+                anchor = f"ch-{chapter.num if chapter else 0}"
+                md += [f"## {heading}", ""]
+                if toc:
+                    toc.append("</ul></li>")
+                toc.append(
+                    f'<li><a href="#{anchor}">{escape(heading)}</a><ul>'
+                )
+                body.append(f'<h2 id="{anchor}">{escape(heading)}</h2>\n')
+            fragment_md, fragment_html = self._fragment(key, section,
+                                                        section_items)
+            md.append(fragment_md)
+            body.append(fragment_html)
+            toc.append(
+                f'<li><a href="#sec-{escape(key)}">'
+                f"{escape(_section_heading(key, section))}</a></li>"
+            )
+        if toc:
+            toc.append("</ul></li>")
+        html = "".join([
+            '<!DOCTYPE html>\n<html lang="ja">\n<head>\n'
+            '<meta charset="utf-8">\n'
+            f"<title>{escape(title)}</title>\n"
+            f"<style>{SAMPLE_STYLE}</style>\n</head>\n<body>\n",
+            f"<h1>{escape(title)}</h1>\n<p>{escape(lead)}</p>\n",
+            f'<nav id="TOC">\n<ul>\n{"".join(toc)}\n</ul>\n</nav>\n',
+            *body,
+            "</body>\n</html>\n",
+        ])
+        return "\n".join(md).rstrip("\n") + "\n", html
+
+
+def write_if_changed(path, text):
+    """Write text unless the file already holds it; returns True if written."""
+    path = Path(path)
+    data = text.encode("utf-8")
+    try:
+        if path.read_bytes() == data:
+            return False
+    except OSError:
+        pass
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+    return True
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+生成AI利用ガイドライン チェックリスト — 項目検索インデックス
+
+mdBook の出力に載せる、チェック項目の文字バイグラム転置インデックスを作る。
+項目番号・準拠レベル・チェック項目・参照タグ（条項を含む）・説明・定義例を
+NFKC 正規化・小文字化した UTF-16 の2文字ごとに索引し、バイナリ（.bin）と
+項目の一覧（.json）として書き出す。ブラウザでは theme/checklist-search.js が
+バイナリを型付き配列として読み、二分探索と転置リストの積集合で検索する。
+インデックスは章ファイルごとに保持し、変更された章の分だけ作り直す。
+標準ライブラリだけで動作する。
+
+仕様書: tools/docs/excel-spec.md
+"""
+
+import json
+import os
+import struct
+import sys
+import unicodedata
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+
+from checklist import BOOK_DIR, REFERENCE_TAGS
+
+SEARCH_INDEX = "checklist-search.bin"
+SEARCH_DOCS = "checklist-search.json"
+
+SEARCH_MAGIC = b"CKS1"
+
+# Posting entries are (document << FIELD_BITS) | field mask, in a uint16.
+FIELD_META = 1    # item number, level, reference tags and clauses
+FIELD_TEXT = 2    # チェック項目
+FIELD_BODY = 4    # 説明, 定義例
+FIELD_BITS = 3
+FIELD_MASK = (1 << FIELD_BITS) - 1
+MAX_DOCUMENTS = 1 << (16 - FIELD_BITS)
+
+# Score of a query bigram found in a field, highest field wins
+FIELD_WEIGHTS = ((FIELD_TEXT, 3), (FIELD_META, 2), (FIELD_BODY, 1))
+
+
+def normalize(text):
+    """Fold text as the lookup script does (NFKC, lower case)."""
+    return unicodedata.normalize("NFKC", text).lower()
+
+
+def bigram_keys(text):
+    """Return the set of UTF-16 bigrams of normalised text as uint32 keys.
+
+    UTF-16 code units match String.charCodeAt() in the browser. Bigrams
+    with white space are skipped.
+    """
+    units = array("H", normalize(text).encode("utf-16-le"))
+    keys = set()
+    for first, second in zip(units, units[1:]):
+        if first > 0x20 and second > 0x20:
+            keys.add(first << 16 | second)
+    return keys
+
+
+def heading_anchor(text):
+    """Return the id mdBook gives a heading (see its normalize_id)."""
+    return "".join(
+        ch.lower() if ch.isalnum() or ch in "_-" else "-"
+        for ch in text.strip()
+        if ch.isalnum() or ch in "_-" or ch.isspace()
+    )
+
+
+def document(item, page):
+    """Return the JSON record and field texts of one item."""
+    record = [
+        item.number,
+        item.level,
+        item.text,
+        page,
+        heading_anchor(f"{item.section_num} {item.section_title}")
+        if item.section else "",
+    ]
+    meta = " ".join([
+        item.number,
+        item.level,
+        *(tag for tag in REFERENCE_TAGS if item.has_tag(tag)),
+        *(clause for _tag, clause in item.clauses),
+    ])
+    fields = (
+        (FIELD_META, meta),
+        (FIELD_TEXT, item.text),
+        (FIELD_BODY, f"{item.description} {item.example}"),
+    )
+    return record, fields
+
+
+class SearchIndex:
+    """Bigram postings of the checklist items, kept per chapter file.
+
+    update() replaces the documents of one chapter file; write() merges
+    the files' postings (in `paths` order) into the binary asset. Only
+    the changed chapters are tokenised again.
+    """
+
+    def __init__(self, paths):
+        self.paths = [Path(p) for p in paths]
+        self._files = {}   # path -> (records, {key: [(doc, mask)]})
+
+    def update(self, path, items):
+        """Index the items of one chapter file (replacing its old ones)."""
+        page = Path(path).with_suffix(".html").name
+        records = []
+        postings = {}
+        for doc, item in enumerate(items):
+            record, fields = document(item, page)
+            records.append(record)
+            masks = {}
+            for field, text in fields:
+                for key in bigram_keys(text):
+                    masks[key] = masks.get(key, 0) | field
+            for key, mask in masks.items():
+                postings.setdefault(key, []).append((doc, mask))
+        self._files[Path(path)] = (records, postings)
+
+    def remove(self, path):
+        self._files.pop(Path(path), None)
+
+    def build(self):
+        """Return (document records, binary index bytes)."""
+        records = []
+        merged = {}
+        for path in self.paths:
+            file_records, postings = self._files.get(path, ((), {}))
+            base = len(records)
+            records.extend(file_records)
+            for key, entries in postings.items():
+                merged.setdefault(key, []).extend(
+                    (base + doc) << FIELD_BITS | mask for doc, mask in entries
+                )
+        if len(records) > MAX_DOCUMENTS:
+            raise ValueError(f"{len(records)} items, at most {MAX_DOCUMENTS}")
+
+        keys = array("I", sorted(merged))
+        offsets = array("I", [0])
+        entries = array("H")
+        for key in keys:
+            entries.extend(merged[key])
+            offsets.append(len(entries))
+        if sys.byteorder == "big":   # the asset is little-endian
+            for part in (keys, offsets, entries):
+                part.byteswap()
+        data = b"".join([
+            SEARCH_MAGIC,
+            struct.pack("<II", len(keys), len(entries)),
+            keys.tobytes(),
+            offsets.tobytes(),
+            entries.tobytes(),
+        ])
+        return records, data
+
+    def write(self, directory=BOOK_DIR):
+        """Write SEARCH_INDEX and SEARCH_DOCS; returns their paths."""
+        records, data = self.build()
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        docs = json.dumps(
+            {"index": SEARCH_INDEX, "fields": ["number", "level", "text",
+                                               "page", "anchor"],
+             "docs": records},
+            ensure_ascii=False, separators=(",", ":"),
+        ).encode("utf-8")
+        written = []
+        for name, content in ((SEARCH_INDEX, data), (SEARCH_DOCS, docs)):
+            path = directory / name
+            tmp = path.with_name(path.name + ".tmp")
+            tmp.write_bytes(content)
+            os.replace(tmp, path)
+            written.append(path)
+        return written
+
+
+class SearchReader:
+    """Look up a binary index as theme/checklist-search.js does.
+
+    Used by the benchmark and for checking the asset; the browser script
+    implements the same algorithm.
+    """
+
+    def __init__(self, data):
+        if data[:4] != SEARCH_MAGIC:
+            raise ValueError("not a checklist search index")
+        nkeys, nentries = struct.unpack_from("<II", data, 4)
+        start = 12
+
+        def read(typecode, count):
+            nonlocal start
+            part = array(typecode)
+            part.frombytes(data[start:start + count * part.itemsize])
+            if sys.byteorder == "big":
+                part.byteswap()
+            start += count * part.itemsize
+            return part
+
+        self.keys = read("I", nkeys)
+        self.offsets = read("I", nkeys + 1)
+        self.entries = read("H", nentries)
+
+    def _matches(self, low, high):
+        """Return {document: weight} for the keys in [low, high)."""
+        found = {}
+        first = bisect_left(self.keys, low)
+        last = bisect_left(self.keys, high, first)
+        for entry in self.entries[self.offsets[first]:self.offsets[last]]:
+            doc = entry >> FIELD_BITS
+            found[doc] = max(found.get(doc, 0), _weight(entry & FIELD_MASK))
+        return found
+
+    def search(self, query, limit=20):
+        """Return the numbers of the documents matching every query bigram.
+
+        Documents are ranked by the summed FIELD_WEIGHTS of the best field
+        each bigram is found in, then by document order. A one-character
+        term matches the bigrams starting with that character.
+        """
+        ranges = set()
+        for term in normalize(query).split():
+            units = array("H", term.encode("utf-16-le"))
+            if len(units) == 1:
+                ranges.add((units[0] << 16, units[0] + 1 << 16))
+            ranges.update((key, key + 1) for key in bigram_keys(term))
+        if not ranges:
+            return []
+        scores = None
+        for low, high in sorted(ranges):
+            found = self._matches(low, high)
+            if scores is not None:
+                found = {doc: score + found[doc]
+                         for doc, score in scores.items() if doc in found}
+            scores = found
+            if not scores:
+                return []
+        return sorted(scores, key=lambda doc: (-scores[doc], doc))[:limit]
+
+
+def _weight(mask):
+    for field, weight in FIELD_WEIGHTS:
+        if mask & field:
+            return weight
+    return 0
@@ -0,0 +1,525 @@
+#!/usr/bin/env python3
+"""
+生成AI利用ガイドライン チェックリスト — 回答集約スクリプト
+
+各部署から返送された記入済みチェックリスト（genai-governance-checklist.xlsx の写し）を
+読み込み、項目番号ごとにチェック結果を集計した1つのワークブックを出力する。
+各ファイルはワークシートの XML をストリーミングで読み、
+A列（チェック結果）・B列（項目番号）・P列（備考）・Q列（対応状況メモ）のセルのみを取り出す。
+複数ファイルはプロセスプールで並列に読み込む。
+
+Usage:
+    python tools/collect_excel.py PATH [PATH ...] [-o OUTPUT] [--json FILE]
+                                  [-j N]
+
+    PATH にはワークブック（.xlsx）またはそれを含むディレクトリを指定する。
+
+Output:
+    collected-checklist.xlsx（-o で変更可）
+
+仕様書: tools/docs/excel-spec.md
+"""
+
+import argparse
+import json
+import os
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from xml.etree import ElementTree
+from xml.parsers import expat
+from zipfile import BadZipFile, ZipFile
+
+from openpyxl import Workbook
+from openpyxl.styles import Font
+
+from checklist import (
+    CHECK_STATUSES,
+    DATA_START_ROW,
+    FONT_NAME,
+    HEADER_ROW,
+    Answer,
+    ParseCache,
+    Respondent,
+    iter_items,
+)
+from checklist_excel import StyleRegistry, append_table, rate, styled_cell
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+
+DEFAULT_OUTPUT = Path("collected-checklist.xlsx")
+
+CHECKLIST_SHEET = "チェックリスト"
+
+# チェック結果, 項目番号, 備考, 対応状況メモ (row 2 column A: 組織名)
+READ_COLUMNS = frozenset({"A", "B", "P", "Q"})
+
+SHARED_STRINGS_PART = "xl/sharedStrings.xml"
+
+# Bytes of uncompressed XML handed to expat per Parse() call
+PARSE_CHUNK = 1 << 16
+
+# Errors of reading a workbook that are reported per file
+READ_ERRORS = (OSError, KeyError, ValueError, BadZipFile, expat.ExpatError)
+SHEET_MAIN_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+
+# Status columns of the aggregate sheet; "" is 未記入
+STATUS_KEYS = CHECK_STATUSES + [""]
+
+
+# ---------------------------------------------------------------------------
+# Reading returned workbooks
+# ---------------------------------------------------------------------------
+
+
+@dataclass(frozen=True, slots=True)
+class Response:
+    """The answers read from one returned workbook."""
+
+    name: str
+    organization: str
+    answers: dict        # item number -> Answer
+    invalid: int = 0     # rows whose チェック結果 is not a known status
+    error: str = ""
+    person: str = ""     # 記入者
+    date: str = ""       # 記入日 as written
+
+
+def _text(value):
+    return "" if value is None else str(value).strip()
+
+
+def _local(name):
+    """Strip the namespace from an expat "namespace}tag" name."""
+    return name.rpartition("}")[2]
+
+
+def _worksheet_part(archive, sheet_name):
+    """Return the zip member name of the named worksheet, or None."""
+    workbook = ElementTree.fromstring(archive.read("xl/workbook.xml"))
+    rel_id = None
+    for sheet in workbook.iter(f"{{{SHEET_MAIN_NS}}}sheet"):
+        if sheet.get("name") == sheet_name:
+            rel_id = sheet.get(f"{{{REL_NS}}}id")
+            break
+    if rel_id is None:
+        return None
+
+    rels = ElementTree.fromstring(archive.read("xl/_rels/workbook.xml.rels"))
+    for rel in rels:
+        if rel.get("Id") == rel_id:
+            target = rel.get("Target")
+            if target.startswith("/"):
+                return target[1:]
+            return f"xl/{target}"
+    return None
+
+
+def _parse_stream(parser, stream):
+    """Feed `stream` (a binary file object) to an expat parser in chunks.
+
+    The uncompressed XML is never held in memory as a whole; a large
+    checklist sheet inflates to many times its zipped size.
+    """
+    for chunk in iter(lambda: stream.read(PARSE_CHUNK), b""):
+        parser.Parse(chunk, False)
+    parser.Parse(b"", True)
+
+
+def read_cells(stream, columns):
+    """Collect the values of the given columns from worksheet XML.
+
+    `stream` is a binary file object such as ZipFile.open() returns.
+
+    Only the cells in `columns` (letters) are decoded; every other
+    element is skipped by the expat handlers without building a tree.
+    Returns a dict mapping (row, column) -> (type, text), where type is
+    the cell's t attribute (None for numbers).
+    """
+    cells = {}
+    current = None   # [row, column, type, parts] of a wanted cell
+    skip = 0         # depth inside <rPh> (phonetic runs are not content)
+    parser = expat.ParserCreate(namespace_separator="}")
+    parser.buffer_text = True
+
+    def start(name, attrs):
+        nonlocal current, skip
+        tag = _local(name)
+        if tag == "c":
+            ref = attrs.get("r", "")
+            column = ref.rstrip("0123456789")
+            if column in columns:
+                current = [int(ref[len(column):]), column, attrs.get("t"), []]
+            else:
+                current = None
+        elif current is not None:
+            if tag == "rPh":
+                skip += 1
+            elif tag in ("v", "t") and not skip:
+                parser.CharacterDataHandler = current[3].append
+
+    def end(name):
+        nonlocal current, skip
+        tag = _local(name)
+        if tag in ("v", "t"):
+            parser.CharacterDataHandler = None
+        elif tag == "rPh":
+            skip -= 1
+        elif tag == "c" and current is not None:
+            row, column, cell_type, parts = current
+            cells[(row, column)] = (cell_type, "".join(parts))
+            current = None
+
+    parser.StartElementHandler = start
+    parser.EndElementHandler = end
+    _parse_stream(parser, stream)
+    return cells
+
+
+def read_shared_strings(stream, wanted):
+    """Return {index: text} for the shared strings whose index is wanted.
+
+    `stream` is a binary file object, as for read_cells().
+    """
+    strings = {}
+    index = -1
+    parts = None
+    skip = 0
+    parser = expat.ParserCreate(namespace_separator="}")
+    parser.buffer_text = True
+
+    def start(name, attrs):
+        nonlocal index, parts, skip
+        tag = _local(name)
+        if tag == "si":
+            index += 1
+            parts = [] if index in wanted else None
+        elif tag == "rPh":
+            skip += 1
+        elif tag == "t" and parts is not None and not skip:
+            parser.CharacterDataHandler = parts.append
+
+    def end(name):
+        nonlocal parts, skip
+        tag = _local(name)
+        if tag == "t":
+            parser.CharacterDataHandler = None
+        elif tag == "rPh":
+            skip -= 1
+        elif tag == "si" and parts is not None:
+            strings[index] = "".join(parts)
+            parts = None
+
+    parser.StartElementHandler = start
+    parser.EndElementHandler = end
+    _parse_stream(parser, stream)
+    return strings
+
+
+def read_checklist(path, columns):
+    """Return {(row, column): text} for the given columns of the checklist.
+
+    Shared strings are resolved only for the cells that were read. Raises
+    one of READ_ERRORS for unreadable files.
+    """
+    with ZipFile(path) as archive:
+        part = _worksheet_part(archive, CHECKLIST_SHEET)
+        if part is None:
+            raise ValueError(f"no sheet '{CHECKLIST_SHEET}'")
+        with archive.open(part) as stream:
+            cells = read_cells(stream, columns)
+        wanted = {
+            int(text) for cell_type, text in cells.values()
+            if cell_type == "s"
+        }
+        shared = {}
+        if wanted:
+            with archive.open(SHARED_STRINGS_PART) as stream:
+                shared = read_shared_strings(stream, wanted)
+
+    values = {}
+    for key, (cell_type, text) in cells.items():
+        if cell_type == "s":
+            text = shared.get(int(text), "")
+        values[key] = text.strip()
+    return values
+
+
+def read_response(path):
+    """Read the answers of one returned checklist workbook.
+
+    Only columns A, B, P and Q of the checklist sheet are decoded.
+    Unreadable files are reported through Response.error instead of
+    raising, so that one broken file does not abort a whole collection
+    run.
+    """
+    path = Path(path)
+    try:
+        cells = read_checklist(path, READ_COLUMNS)
+    except READ_ERRORS as e:
+        return Response(path.name, "", {}, error=str(e))
+
+    def value(row, column):
+        return cells.get((row, column), "")
+
+    respondent = Respondent.from_input_text(value(HEADER_ROW - 1, "A"))
+    answers = {}
+    invalid = 0
+    rows = sorted({row for row, _column in cells if row >= DATA_START_ROW})
+    for row in rows:
+        number = value(row, "B")
+        if not number:
+            continue
+        status = value(row, "A")
+        if status and status not in CHECK_STATUSES:
+            invalid += 1
+            status = ""
+        answers[number] = Answer(status, value(row, "P"), value(row, "Q"))
+
+    return Response(path.name, respondent.organization, answers, invalid,
+                    person=respondent.person, date=respondent.date)
+
+
+def find_workbooks(paths):
+    """Expand directories into the .xlsx files they contain (sorted)."""
+    found = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            found.extend(
+                p for p in sorted(path.rglob("*.xlsx"))
+                if not p.name.startswith("~$")  # Excel lock files
+            )
+        else:
+            found.append(path)
+    return found
+
+
+def read_responses(paths, jobs=None):
+    """Read every workbook, fanning out over a process pool.
+
+    Results are returned in the order of `paths`.
+    """
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or len(paths) < 2:
+        return [read_response(path) for path in paths]
+
+    # Large chunks keep the per-task IPC overhead small relative to the
+    # few milliseconds each workbook takes to read.
+    chunksize = max(1, len(paths) // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(read_response, paths, chunksize=chunksize))
+
+
+# ---------------------------------------------------------------------------
+# Aggregation
+# ---------------------------------------------------------------------------
+
+
+def aggregate(responses):
+    """Count the statuses of every item over all readable responses.
+
+    Returns a dict mapping item number -> Counter of status ("" for
+    未記入).
+    """
+    counts = {}
+    for response in responses:
+        for number, answer in response.answers.items():
+            counts.setdefault(number, Counter())[answer.status] += 1
+    return counts
+
+
+def result_set(items, responses, counts):
+    """Return the aggregated results as a JSON-serialisable dict."""
+    return {
+        "files": [
+            {
+                "file": r.name,
+                "organization": r.organization,
+                "person": r.person,
+                "date": r.date,
+                "answered": sum(1 for a in r.answers.values() if a.status),
+                "items": len(r.answers),
+                "invalid": r.invalid,
+                "error": r.error,
+            }
+            for r in responses
+        ],
+        "items": [
+            {
+                "number": number,
+                "level": item.level if item else None,
+                "counts": {
+                    status or "未記入": counts.get(number, Counter())[status]
+                    for status in STATUS_KEYS
+                },
+            }
+            for number, item in items.items()
+        ],
+    }
+
+
+# ---------------------------------------------------------------------------
+# Excel output
+# ---------------------------------------------------------------------------
+
+
+def build_collected_workbook(items, responses, counts):
+    """Build the consolidated workbook (write-only, one row at a time).
+
+    Sheets:
+        集計結果: status counts per item
+        コメント一覧: answers with a 備考 or 対応状況メモ, one row per file
+            and item
+        ファイル一覧: per-file answer counts and read errors
+    """
+    wb = Workbook(write_only=True)
+    styles = StyleRegistry(wb)
+    readable = sum(1 for r in responses if not r.error)
+
+    ws = wb.create_sheet("集計結果")
+    pct_style = styles.add(
+        "collect-pct", font=Font(name=FONT_NAME, size=10),
+        number_format="0.0%",
+    )
+
+    def item_rows():
+        for number, item in items.items():
+            c = counts.get(number, Counter())
+            yield [
+                number,
+                item.chapter_num if item else None,
+                item.level if item else None,
+                item.text if item else None,
+                *(c[status] for status in STATUS_KEYS),
+                styled_cell(ws, rate(c["対応済"], readable), pct_style),
+            ]
+
+    append_table(
+        ws,
+        styles,
+        ["項目番号", "章", "準拠レベル", "チェック項目",
+         *CHECK_STATUSES, "未記入", "対応率"],
+        [8, 5, 14, 60, 8, 8, 8, 8, 8, 8],
+        item_rows(),
+    )
+
+    def comment_rows():
+        for r in responses:
+            for number, a in r.answers.items():
+                if a.note or a.memo:
+                    yield [r.name, r.organization, number,
+                           a.status, a.note, a.memo]
+
+    append_table(
+        wb.create_sheet("コメント一覧"),
+        styles,
+        ["ファイル", "組織", "項目番号", "チェック結果", "備考", "対応状況メモ"],
+        [30, 30, 8, 12, 30, 40],
+        comment_rows(),
+    )
+
+    append_table(
+        wb.create_sheet("ファイル一覧"),
+        styles,
+        ["ファイル", "組織", "記入者", "記入日",
+         "回答済", "項目数", "不正値", "エラー"],
+        [30, 30, 16, 12, 8, 8, 8, 40],
+        (
+            [
+                r.name,
+                r.organization,
+                r.person,
+                r.date,
+                sum(1 for a in r.answers.values() if a.status),
+                len(r.answers),
+                r.invalid,
+                r.error or None,
+            ]
+            for r in responses
+        ),
+    )
+    return wb
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Collect filled-in checklist workbooks into one report."
+    )
+    parser.add_argument(
+        "paths",
+        nargs="+",
+        metavar="PATH",
+        help="returned workbook (.xlsx) or a directory containing them",
+    )
+    parser.add_argument(
+        "-o", "--output",
+        type=Path,
+        default=DEFAULT_OUTPUT,
+        help=f"consolidated workbook to write (default: {DEFAULT_OUTPUT})",
+    )
+    parser.add_argument(
+        "--json",
+        type=Path,
+        metavar="FILE",
+        help="also write the aggregated result set as JSON",
+    )
+    parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        default=None,
+        help="worker processes (default: number of CPUs)",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    paths = find_workbooks(args.paths)
+    if not paths:
+        print("Error: No workbooks found.", file=sys.stderr)
+        sys.exit(1)
+
+    responses = read_responses(paths, args.jobs)
+    counts = aggregate(responses)
+
+    # Canonical item order from the source chapters; numbers found only
+    # in returned files (e.g. from an older checklist) follow at the end.
+    items = {item.number: item for item in iter_items(ParseCache())}
+    for number in counts:
+        items.setdefault(number, None)
+
+    failed = [r for r in responses if r.error]
+    print(f"Read {len(responses) - len(failed)} of {len(paths)} workbooks.")
+    for r in failed:
+        print(f"  {r.name}: {r.error}", file=sys.stderr)
+    unknown = sum(1 for item in items.values() if item is None)
+    if unknown:
+        print(f"Warning: {unknown} item numbers are not in src/ch*.md.",
+              file=sys.stderr)
+
+    wb = build_collected_workbook(items, responses, counts)
+    wb.save(args.output)
+    print(f"Generated: {args.output}")
+
+    if args.json:
+        args.json.write_text(
+            json.dumps(result_set(items, responses, counts),
+                       ensure_ascii=False, indent=2) + "\n",
+            encoding="utf-8",
+        )
+        print(f"Generated: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
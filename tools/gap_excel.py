@@ -0,0 +1,572 @@
+#!/usr/bin/env python3
+"""
+生成AI利用ガイドライン チェックリスト — ギャップ分析と改善の優先順位
+
+多数の組織の回答を NumPy の配列（組織 × 項目のチェック結果、項目 × 参照フレームワークの
+タグ）に読み込み、組織ごとの改善の優先順位、参照フレームワークごとの対応率、
+組織間の百分位を、組織ごとのループではなく配列演算でまとめて求める。
+優先順位は Required の未対応・一部対応の項目を先頭に、項目が対応する参照フレームワークの
+数で重み付けする。結果は Excel と JSON に出力する。
+NumPy が必要（pip install -r tools/requirements-optional.txt）。
+
+Usage:
+    python tools/gap_excel.py [PATH ...] [--db FILE] [--as-of YYYY-MM-DD]
+                              [--top N] [--json FILE] [-o OUTPUT] [-j N]
+
+    PATH を指定すると記入済みチェックリスト（.xlsx またはそれを含むディレクトリ）を読み、
+    省略すると履歴ストア（tools/history_excel.py）の組織ごとの最新の回答を読む。
+
+仕様書: tools/docs/excel-spec.md
+"""
+
+import argparse
+import json
+import sqlite3
+import sys
+import time
+import warnings
+from dataclasses import dataclass
+from pathlib import Path
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from checklist import (
+    CHECK_STATUSES,
+    LEVELS,
+    REFERENCE_TAGS,
+    TAG_BITS,
+    ParseCache,
+    iter_items,
+)
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+
+# Codes of the status matrix: CHECK_STATUSES, then 未記入
+STATUSES = (*CHECK_STATUSES, "")
+STATUS_CODES = {status: code for code, status in enumerate(STATUSES)}
+BLANK = STATUS_CODES[""]
+
+# Remaining gap of an answer; the priority score of an item is its gap
+# times (1 + the number of reference frameworks it is tagged with).
+GAP = {"対応済": 0.0, "一部対応": 0.5, "未対応": 1.0, "該当なし": 0.0, "": 0.0}
+
+# Rate columns: 対応率, 必須対応率 and 対応率 per framework (7.3)
+RATE_COLUMNS = ("overall", "required", *REFERENCE_TAGS)
+RATE_HEADERS = (
+    "対応率", "必須対応率", *(f"{tag} 対応率" for tag in REFERENCE_TAGS)
+)
+
+PERCENTILES = (25, 50, 75, 90)
+DEFAULT_TOP = 10
+
+
+def _require_numpy():
+    if np is None:
+        print("Error: the gap analysis needs NumPy; install it with\n"
+              "  pip install -r tools/requirements-optional.txt",
+              file=sys.stderr)
+        sys.exit(1)
+
+
+# ---------------------------------------------------------------------------
+# Answer matrix
+# ---------------------------------------------------------------------------
+
+
+@dataclass(frozen=True, slots=True)
+class AnswerMatrix:
+    """Answers of many organizations as one array.
+
+    status[o, i] is the STATUSES code of organization o's answer to
+    items[i]; items an organization did not answer are 未記入.
+    """
+
+    items: tuple
+    organizations: tuple[str, ...]
+    dates: tuple[str, ...]
+    status: "np.ndarray"
+
+    @classmethod
+    def from_assessments(cls, assessments, items):
+        """Build from history_excel.Assessment objects (one row each)."""
+        index = {item.number: i for i, item in enumerate(items)}
+        organizations = []
+        dates = []
+        cells = []
+        for row, a in enumerate(assessments):
+            organizations.append(a.respondent.organization or a.name)
+            dates.append(a.respondent.date)
+            cells.extend(
+                (row, index[number], STATUS_CODES[status])
+                for number, _chapter, _level, status, *_ in a.rows
+                if number in index
+            )
+        return cls._build(items, organizations, dates, cells)
+
+    @classmethod
+    def from_store(cls, path, items, as_of=None):
+        """Build from the latest assessment of each organization.
+
+        Assessments after `as_of` (YYYY-MM-DD) are ignored. The answers
+        are joined to the item and organization rows in SQLite, so the
+        rows arrive as integer triples.
+        """
+        from history_excel import HistoryStore
+
+        with HistoryStore(path) as store:
+            db = store.db
+            db.execute("CREATE TEMP TABLE gap_items "
+                       "(number TEXT PRIMARY KEY, idx INTEGER NOT NULL)")
+            db.executemany("INSERT INTO gap_items VALUES (?, ?)",
+                           ((item.number, i) for i, item in enumerate(items)))
+            latest = db.execute(
+                "SELECT id, organization, assessed_on FROM ("
+                " SELECT id, organization, assessed_on, ROW_NUMBER() OVER ("
+                "  PARTITION BY organization"
+                "  ORDER BY assessed_on DESC, id DESC) AS n"
+                " FROM assessments WHERE assessed_on <= ?"
+                ") WHERE n = 1 ORDER BY organization",
+                (as_of or "9999-12-31",),
+            ).fetchall()
+            db.execute("CREATE TEMP TABLE gap_rows "
+                       "(id INTEGER PRIMARY KEY, row INTEGER NOT NULL)")
+            db.executemany("INSERT INTO gap_rows VALUES (?, ?)",
+                           ((id_, row) for row, (id_, *_) in
+                            enumerate(latest)))
+            codes = " ".join(f"WHEN '{status}' THEN {code}"
+                             for status, code in STATUS_CODES.items())
+            cells = db.execute(
+                f"SELECT r.row, g.idx, CASE n.status {codes} "
+                f"ELSE {BLANK} END FROM gap_rows r "
+                f"JOIN answers n ON n.assessment_id = r.id "
+                f"JOIN gap_items g ON g.number = n.number"
+            ).fetchall()
+        return cls._build(items, [org for _id, org, _date in latest],
+                          [day for _id, _org, day in latest], cells)
+
+    @classmethod
+    def _build(cls, items, organizations, dates, cells):
+        status = np.full((len(organizations), len(items)), BLANK, np.uint8)
+        if cells:
+            rows, columns, codes = np.array(cells, dtype=np.intp).T
+            status[rows, columns] = codes
+        return cls(tuple(items), tuple(organizations), tuple(dates), status)
+
+
+def tag_matrix(items):
+    """Return the items × REFERENCE_TAGS matrix of tags (bool)."""
+    masks = np.array([item.tag_mask for item in items], dtype=np.int64)
+    bits = np.array([TAG_BITS[tag] for tag in REFERENCE_TAGS], dtype=np.int64)
+    return (masks[:, None] & bits) != 0
+
+
+def level_ranks(items):
+    """Return LEVELS positions of the items (unknown levels last)."""
+    ranks = {level: rank for rank, level in enumerate(LEVELS)}
+    return np.array([ranks.get(item.level, len(LEVELS)) for item in items])
+
+
+def percentile_ranks(values):
+    """Return the percentile rank (0–100) of each value in its column.
+
+    The rank counts the values below plus half the equal ones; NaN
+    values are left out and stay NaN. Each column is ranked by one sort
+    and two binary searches over all organizations at once.
+    """
+    ranks = np.full(values.shape, np.nan)
+    for k in range(values.shape[1]):
+        column = values[:, k]
+        valid = ~np.isnan(column)
+        ordered = np.sort(column[valid])
+        if ordered.size:
+            below = np.searchsorted(ordered, column[valid], "left")
+            upto = np.searchsorted(ordered, column[valid], "right")
+            ranks[valid, k] = (below + upto) * (50.0 / ordered.size)
+    return ranks
+
+
+# ---------------------------------------------------------------------------
+# Analysis
+# ---------------------------------------------------------------------------
+
+
+@dataclass(frozen=True, slots=True)
+class GapAnalysis:
+    """Results of analyze(), as arrays over organizations and items.
+
+    rates and percentiles have the RATE_COLUMNS; priorities holds each
+    organization's top item indices (-1 past its last gap); counts is
+    items × STATUSES.
+    """
+
+    matrix: AnswerMatrix
+    tags: "np.ndarray"          # items × frameworks (bool)
+    weights: "np.ndarray"       # items: 1 + number of frameworks
+    scores: "np.ndarray"        # organizations × items
+    rates: "np.ndarray"         # organizations × RATE_COLUMNS
+    percentiles: "np.ndarray"   # organizations × RATE_COLUMNS
+    priorities: "np.ndarray"    # organizations × top
+    counts: "np.ndarray"        # items × STATUSES
+    item_order: "np.ndarray"    # items by portfolio priority
+
+    @property
+    def gap_scores(self):
+        return self.scores.sum(axis=1)
+
+    @property
+    def mean_scores(self):
+        """Mean score of every item over the organizations."""
+        if not len(self.scores):
+            return np.zeros(self.scores.shape[1])
+        return self.scores.mean(axis=0)
+
+    def distribution(self):
+        """Return RATE_COLUMNS × PERCENTILES of the rates over organizations."""
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)   # all-NaN
+            return np.nanpercentile(self.rates, PERCENTILES, axis=0).T
+
+
+def _priority_order(scores, ranks, weights, top):
+    """Sort item indices: lower level rank first, then higher score.
+
+    Items without a gap are never listed (index -1).
+    """
+    key = np.where(scores > 0, ranks * (weights.max() + 1.0) - scores, np.inf)
+    order = np.argsort(key, axis=-1, kind="stable")[..., :top]
+    return np.where(np.take_along_axis(key, order, axis=-1) < np.inf,
+                    order, -1)
+
+
+def analyze(matrix, top=DEFAULT_TOP):
+    """Compute scores, rates, percentiles and priorities of a matrix."""
+    items = matrix.items
+    status = matrix.status
+    tags = tag_matrix(items)
+    weights = 1.0 + tags.sum(axis=1)
+    ranks = level_ranks(items)
+
+    gap = np.array([GAP[name] for name in STATUSES])
+    scores = gap[status] * weights
+
+    # 対応率 = 対応済 ÷ 項目数, per framework over its tagged items
+    done = (status == STATUS_CODES["対応済"]).astype(np.float64)
+    columns = np.column_stack([
+        np.ones(len(items)),
+        ranks == LEVELS.index("Required"),
+        tags,
+    ]).astype(np.float64)
+    totals = columns.sum(axis=0)
+    rates = np.divide(done @ columns, totals,
+                      out=np.full((len(status), len(totals)), np.nan),
+                      where=totals > 0)
+
+    counts = np.stack(
+        [(status == code).sum(axis=0) for code in range(len(STATUSES))],
+        axis=1,
+    )
+    return GapAnalysis(
+        matrix=matrix,
+        tags=tags,
+        weights=weights,
+        scores=scores,
+        rates=rates,
+        percentiles=percentile_ranks(rates),
+        priorities=_priority_order(scores, ranks, weights, top),
+        counts=counts,
+        item_order=_priority_order(
+            scores.mean(axis=0) if len(status) else np.zeros(len(items)),
+            ranks, weights, len(items),
+        ),
+    )
+
+
+# ---------------------------------------------------------------------------
+# Output
+# ---------------------------------------------------------------------------
+
+
+def _round(values, digits=4):
+    """Return a list of rounded floats, NaN as None."""
+    return [None if value != value else round(value, digits)
+            for value in values.tolist()]
+
+
+def _item_tags(analysis, i):
+    return [tag for tag, on in zip(REFERENCE_TAGS, analysis.tags[i]) if on]
+
+
+def gap_records(analysis):
+    """Return the JSON-serializable results."""
+    matrix = analysis.matrix
+    items = matrix.items
+    gap_scores = _round(analysis.gap_scores)
+    organizations = []
+    for o, organization in enumerate(matrix.organizations):
+        rates = _round(analysis.rates[o])
+        percentiles = _round(analysis.percentiles[o], 1)
+        priorities = [i for i in analysis.priorities[o].tolist() if i >= 0]
+        organizations.append({
+            "organization": organization,
+            "date": matrix.dates[o],
+            "gap_score": gap_scores[o],
+            "rates": dict(zip(RATE_COLUMNS, rates)),
+            "percentiles": dict(zip(RATE_COLUMNS, percentiles)),
+            "priorities": [
+                {
+                    "number": items[i].number,
+                    "level": items[i].level,
+                    "status": STATUSES[matrix.status[o, i]],
+                    "score": round(float(analysis.scores[o, i]), 4),
+                }
+                for i in priorities
+            ],
+        })
+    distribution = analysis.distribution()
+    mean_scores = _round(analysis.mean_scores)
+    return {
+        "organizations": organizations,
+        "distribution": [
+            {
+                "rate": column,
+                **{f"p{p}": value for p, value in
+                   zip(PERCENTILES, _round(distribution[k]))},
+            }
+            for k, column in enumerate(RATE_COLUMNS)
+        ],
+        "items": [
+            {
+                "number": items[i].number,
+                "level": items[i].level,
+                "frameworks": _item_tags(analysis, i),
+                "weight": int(analysis.weights[i]),
+                "counts": {status or "未記入": count for status, count in
+                           zip(STATUSES, analysis.counts[i].tolist())},
+                "mean_score": mean_scores[i],
+            }
+            for i in analysis.item_order.tolist() if i >= 0
+        ],
+    }
+
+
+def build_gap_workbook(analysis):
+    """Build a workbook of the analysis (write-only).
+
+    Sheets:
+        ギャップ分析: one row per organization with its rates, percentile
+            of 対応率, gap score and top priority items
+        優先項目: the items with a gap anywhere, by portfolio priority
+        分布: percentiles of every rate over the organizations
+    """
+    from openpyxl import Workbook
+    from openpyxl.styles import Font
+
+    from checklist import FONT_NAME
+    from checklist_excel import StyleRegistry, append_table, styled_cell
+
+    wb = Workbook(write_only=True)
+    styles = StyleRegistry(wb)
+    pct_style = styles.add(
+        "gap-pct", font=Font(name=FONT_NAME, size=10), number_format="0.0%",
+    )
+    matrix = analysis.matrix
+    items = matrix.items
+
+    def pct(ws, value):
+        return styled_cell(ws, None if value != value else value, pct_style)
+
+    ws = wb.create_sheet("ギャップ分析")
+    gap_scores = analysis.gap_scores.tolist()
+    append_table(
+        ws,
+        styles,
+        ["組織", "記入日", *RATE_HEADERS, "対応率の百分位", "ギャップスコア",
+         "優先項目"],
+        [18, 12] + [10] * len(RATE_HEADERS) + [10, 10, 40],
+        (
+            [
+                organization,
+                matrix.dates[o],
+                *(pct(ws, value) for value in analysis.rates[o].tolist()),
+                round(analysis.percentiles[o, 0], 1)
+                if analysis.percentiles[o, 0] == analysis.percentiles[o, 0]
+                else None,
+                round(gap_scores[o], 2),
+                "、".join(items[i].number
+                         for i in analysis.priorities[o].tolist() if i >= 0),
+            ]
+            for o, organization in enumerate(matrix.organizations)
+        ),
+    )
+
+    ws = wb.create_sheet("優先項目")
+    mean_scores = analysis.mean_scores.tolist()
+    append_table(
+        ws,
+        styles,
+        ["項目番号", "準拠レベル", "参照フレームワーク", "重み",
+         *(status or "未記入" for status in STATUSES), "平均スコア"],
+        [10, 12, 30, 6] + [8] * len(STATUSES) + [10],
+        (
+            [
+                items[i].number,
+                items[i].level,
+                " ".join(_item_tags(analysis, i)),
+                int(analysis.weights[i]),
+                *analysis.counts[i].tolist(),
+                round(mean_scores[i], 4),
+            ]
+            for i in analysis.item_order.tolist() if i >= 0
+        ),
+    )
+
+    ws = wb.create_sheet("分布")
+    distribution = analysis.distribution()
+    append_table(
+        ws,
+        styles,
+        ["対応率", *(f"p{p}" for p in PERCENTILES)],
+        [16] + [10] * len(PERCENTILES),
+        (
+            [header, *(pct(ws, value) for value in distribution[k].tolist())]
+            for k, header in enumerate(RATE_HEADERS)
+        ),
+    )
+    return wb
+
+
+def print_summary(analysis, limit=10):
+    """Print the rate distribution and the portfolio's top items."""
+    print("対応率の分布: " + "  ".join(f"p{p}" for p in PERCENTILES))
+    for header, values in zip(RATE_HEADERS,
+                              analysis.distribution().tolist()):
+        print(f"  {header}: " + "  ".join(
+            "-" if value != value else f"{value:.1%}" for value in values
+        ))
+    items = analysis.matrix.items
+    order = [i for i in analysis.item_order.tolist() if i >= 0][:limit]
+    if order:
+        print("優先項目（全組織）:")
+    for i in order:
+        open_, partial = (analysis.counts[i, STATUS_CODES[status]]
+                          for status in ("未対応", "一部対応"))
+        print(f"  {items[i].number:<8} {items[i].level:<12} "
+              f"未対応 {open_}  一部対応 {partial}  "
+              f"{' '.join(_item_tags(analysis, i))}")
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+
+def parse_args(argv=None):
+    from history_excel import DEFAULT_DB
+
+    parser = argparse.ArgumentParser(
+        description="Rank remediation work over many organizations' answers.",
+        epilog="Needs NumPy: pip install -r tools/requirements-optional.txt",
+    )
+    parser.add_argument(
+        "paths",
+        nargs="*",
+        metavar="PATH",
+        help="returned workbook (.xlsx) or a directory containing them "
+        "(default: read the history database)",
+    )
+    parser.add_argument(
+        "--db",
+        type=Path,
+        default=DEFAULT_DB,
+        help=f"history database (default: {DEFAULT_DB})",
+    )
+    parser.add_argument(
+        "--as-of",
+        metavar="YYYY-MM-DD",
+        help="with --db: the latest assessment on or before this date",
+    )
+    parser.add_argument(
+        "--top",
+        type=int,
+        default=DEFAULT_TOP,
+        help="priority items per organization (default: %(default)s)",
+    )
+    parser.add_argument("--json", metavar="FILE",
+                        help="write the results as JSON ('-' for stdout)")
+    parser.add_argument("-o", "--output", type=Path, metavar="OUTPUT",
+                        help="write the gap analysis workbook (.xlsx)")
+    parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        default=None,
+        help="worker processes reading workbooks (default: number of CPUs)",
+    )
+    args = parser.parse_args(argv)
+    if args.as_of and args.paths:
+        parser.error("--as-of applies to the history database only")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    _require_numpy()
+    quiet = args.json == "-"
+    log = sys.stderr if quiet else sys.stdout
+    items = list(iter_items(ParseCache()))
+
+    start = time.perf_counter()
+    if args.paths:
+        from collect_excel import find_workbooks
+        from history_excel import read_assessments
+
+        paths = find_workbooks(args.paths)
+        assessments = read_assessments(paths, args.jobs)
+        for a in assessments:
+            if a.error:
+                print(f"  {a.name}: {a.error}", file=sys.stderr)
+        matrix = AnswerMatrix.from_assessments(
+            [a for a in assessments if not a.error], items
+        )
+    elif not args.db.exists():
+        print(f"Error: {args.db} not found (give workbooks or run "
+              "history_excel.py ingest first).", file=sys.stderr)
+        sys.exit(1)
+    else:
+        try:
+            matrix = AnswerMatrix.from_store(args.db, items, args.as_of)
+        except (sqlite3.DatabaseError, ValueError) as e:
+            print(f"Error: {args.db}: {e}", file=sys.stderr)
+            sys.exit(1)
+    loaded = time.perf_counter()
+    if not matrix.organizations:
+        print("Error: no answers to analyse.", file=sys.stderr)
+        sys.exit(1)
+
+    analysis = analyze(matrix, args.top)
+    analysed = time.perf_counter()
+    print(f"Analysed {len(matrix.organizations)} organizations x "
+          f"{len(items)} items: loaded in {(loaded - start) * 1000:.0f}ms, "
+          f"analysis {(analysed - loaded) * 1000:.1f}ms", file=log)
+
+    if not (args.json or args.output):
+        print_summary(analysis)
+    if args.json:
+        text = json.dumps(gap_records(analysis), ensure_ascii=False,
+                          indent=2) + "\n"
+        if args.json == "-":
+            sys.stdout.write(text)
+        else:
+            Path(args.json).write_text(text, encoding="utf-8")
+            print(f"Generated: {args.json}", file=log)
+    if args.output:
+        build_gap_workbook(analysis).save(args.output)
+        print(f"Generated: {args.output}", file=log)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,645 +4,594 @@
 
 src/ch01-governance.md – src/ch07-document-quality.md をパースし、
 セルフチェック用 Excel ワークシートを生成する。
+サブコマンドごとに必要なモジュールだけを読み込むため、Excel を扱わない
+parse / validate では openpyxl を import しない。
 
 Usage:
-    python tools/generate_excel.py
+    python tools/generate_excel.py [excel] [--no-cache | --rebuild] [--streaming]
+                                   [--summary {countifs,static}]
+                                   [--engine {openpyxl,fast}]
+                                   [-o OUTPUT] [--watch [--interval SECONDS]]
+                                   [--profile FILE [--profile-memory]]
+                                   [--cprofile FILE]
+    python tools/generate_excel.py parse [--json FILE]
+    python tools/generate_excel.py validate [--strict]
+    python tools/generate_excel.py xref [--json FILE] [TAG [CLAUSE]]
+    python tools/generate_excel.py search [-o DIR] [--watch] [--query TEXT]
+    python tools/generate_excel.py sample [--level LEVEL] [--chapter N] [--tag TAG]
+                                   [-o FILE] [--html FILE] [--watch]
+    python tools/generate_excel.py overlap [--threshold J] [--text-only] [--json FILE]
+    python tools/generate_excel.py export [--jsonl FILE] [--csv FILE] [--ods FILE]
+                                   [--xlsx FILE] [--threads]
+    python tools/generate_excel.py batch MANIFEST [--output-dir DIR] [-j N]
+                                   [--template]
+    python tools/generate_excel.py collect PATH [PATH ...] [-o OUTPUT]
+    python tools/generate_excel.py migrate PATH [PATH ...] -o DIR [--report FILE]
+    python tools/generate_excel.py serve [--host HOST] [--port PORT] [-j N]
+    python tools/generate_excel.py history {ingest PATH [PATH ...] | trend} [--db FILE]
+    python tools/generate_excel.py gap [PATH ...] [--db FILE] [--json FILE] [-o OUTPUT]
+
+Subcommands:
+    excel     チェックリストの Excel を生成する（サブコマンド省略時の既定）
+    parse     章ファイルをパースして項目数を表示する（--json で項目を JSON 出力）
+    validate  項目番号の重複・欠番、章・節との対応、未知の参照タグなどをパースと同じ走査で検査し、
+              「ファイル:行」形式で報告する（エラーがあれば終了コード1、--strict では警告でも1）
+    xref      参照フレームワークの条項 → 項目番号の索引を表示・JSON 出力する
+              （TAG [CLAUSE] を指定するとその条項を引用する項目番号を表示）
+    search    mdBook の出力に載せる項目検索インデックス（文字バイグラム）を書き出す
+              （--query で検索結果を表示、--watch で変更された章だけを索引し直す）
+    sample    選択した項目の定義例からガイドラインの草案（Markdown / HTML）を組み立てる
+              （項目が変わった節だけを描画し直す。--watch で変更のたびに書き直す）
+    overlap   文言の重複・類似したチェック項目の組を MinHash と LSH で検出する
+              （署名は項目ごとにキャッシュし、変更された項目だけをハッシュし直す）
+    export    1回のパースから JSONL・CSV・ODS・Excel へ同時に出力する
+    batch     マニフェスト（CSV / JSON）の組織ごとに記入欄・回答を埋めたブックを生成する
+    collect   記入済みチェックリストを集約する（tools/collect_excel.py と同じ）
+    migrate   記入済みチェックリストの回答を新版に移し替える（tools/migrate_excel.py と同じ）
+    serve     絞り込み・記入欄付きのブックを HTTP で配信する（tools/serve_excel.py と同じ）
+    history   記入済みチェックリストを SQLite に蓄積し、対応率の推移を出力する
+              （tools/history_excel.py と同じ）
+    gap       多数の組織の回答から改善の優先順位・参照フレームワークごとの対応率・
+              組織間の百分位を求める（tools/gap_excel.py と同じ、NumPy が必要:
+              tools/requirements-optional.txt）
 
 Output:
     excel/genai-governance-checklist.xlsx
+    （batch: マニフェストの各行につき1ファイル）
+
+Options:
+    --no-cache  パースキャッシュを使わずに全章をパースする
+    --rebuild   キャッシュを破棄して全章を再パースし、キャッシュを作り直す
+    --streaming 書き込み専用ワークシートで1行ずつ出力する（大規模チェックリスト向け）
+    --summary   サマリーの集計方式（countifs / static）
+    --engine    チェック項目の行の書き込み方式（openpyxl / fast）。fast はセルオブジェクトを
+                作らずに行を SpreadsheetML に直接書き出す（出力は openpyxl と同一）
+    --reproducible
+                zip エントリ・文書プロパティの時刻を固定し、同じ内容を常に同じバイト列で
+                出力する（既定では SOURCE_DATE_EPOCH が設定されているときだけ。
+                どちらでも内容が同じならファイルを書き換えない）
+    --watch     src/ の章ファイルを監視し、変更のたびに変更された章だけを再パースして
+                ワークブックを書き直す（一時ファイルに保存してから置き換える）
+    --threads   export で各形式の書き出しをスレッドプールで並行に行う
+    --jobs      batch のワーカープロセス数（既定: CPU 数）
+    --template  batch で白紙のブックを1度だけ生成してキャッシュし、各組織分は
+                ワークシート XML の該当セルだけを書き換えて出力する
+    --profile   フェーズごとの処理時間（実時間・CPU 時間）と件数を JSON で出力する
+                （--profile-memory で tracemalloc のピークメモリも記録、
+                --cprofile で cProfile の統計をファイルに出力）
 
 仕様書: tools/docs/excel-spec.md
 """
 
-import re
+import argparse
+import json
+import os
 import sys
+import time
 from pathlib import Path
 
-from openpyxl import Workbook
-from openpyxl.formatting.rule import CellIsRule
-from openpyxl.styles import (
-    Alignment,
-    Border,
-    Font,
-    PatternFill,
-    Protection,
-    Side,
+from checklist import (
+    BOOK_DIR,
+    LEVELS,
+    NULL_PROFILER,
+    OUTPUT_FILE,
+    REFERENCE_TAGS,
+    SRC_DIR,
+    SUMMARY_ENGINES,
+    WRITER_ENGINES,
+    ChapterWatcher,
+    CrossReference,
+    ParseCache,
+    Profiler,
+    item_record,
+    iter_items,
+    lint_chapters,
+    load_manifest,
+    parse_chapters,
+    select_items,
 )
-from openpyxl.utils import get_column_letter
-from openpyxl.worksheet.datavalidation import DataValidation
-from openpyxl.worksheet.page import PageMargins
-from openpyxl.worksheet.properties import PageSetupProperties
 
-# ---------------------------------------------------------------------------
-# Configuration
-# ---------------------------------------------------------------------------
+SUBCOMMANDS = ("excel", "parse", "validate", "xref", "search", "sample",
+               "overlap", "export", "batch", "collect", "migrate", "serve",
+               "history", "gap")
 
-REPO_ROOT = Path(__file__).resolve().parent.parent
-SRC_DIR = REPO_ROOT / "src"
-OUTPUT_DIR = REPO_ROOT / "excel"
-OUTPUT_FILE = OUTPUT_DIR / "genai-governance-checklist.xlsx"
-
-CHAPTER_FILES = [
-    "ch01-governance.md",
-    "ch02-risk-mapping.md",
-    "ch03-input-data.md",
-    "ch04-output-management.md",
-    "ch05-trustworthiness.md",
-    "ch06-incident-response.md",
-    "ch07-document-quality.md",
-]
-
-REFERENCE_TAGS = ["NIST", "NIST-GAI", "METI", "JDLA", "IPA", "FUJITSU", "EU-AIA"]
-
-CHAPTER_COLORS = {
-    1: "E2EFDA",  # 薄緑
-    2: "DEEBF7",  # 薄青
-    3: "FFF2CC",  # 薄黄
-    4: "F2DCDB",  # 薄紅
-    5: "E2D9F3",  # 薄紫
-    6: "FCE4D6",  # 薄橙
-    7: "D6DCE4",  # 薄灰
-}
+# Subcommands whose arguments are handed over to a stand-alone script
+FORWARDED = ("collect", "migrate", "serve", "history", "gap")
 
-CHECK_STATUSES = ["対応済", "一部対応", "未対応", "該当なし"]
-
-FONT_NAME = "メイリオ"
-
-# Colors
-DARK_NAVY = "1F3864"
-DARK_BLUE_GRAY = "44546A"
-LIGHT_GRAY = "D9E2F3"
-WHITE = "FFFFFF"
-
-HEADER_ROW = 3
-DATA_START_ROW = 4
-
-# Column definitions: (header_name, width_in_chars)
-COLUMNS = [
-    ("チェック結果", 12),     # A
-    ("項目番号", 8),           # B
-    ("章", 5),                 # C
-    ("章タイトル", 28),        # D
-    ("節", 6),                 # E
-    ("節タイトル", 24),        # F
-    ("準拠レベル", 14),        # G
-    ("チェック項目", 60),      # H
-    ("NIST", 6),               # I
-    ("NIST-GAI", 9),           # J
-    ("METI", 6),               # K
-    ("JDLA", 6),               # L
-    ("IPA", 5),                # M
-    ("FUJITSU", 9),            # N
-    ("EU-AIA", 8),             # O
-    ("備考", 30),              # P
-    ("対応状況メモ", 40),      # Q
-]
-
-# ---------------------------------------------------------------------------
-# Regex patterns
-# ---------------------------------------------------------------------------
-
-RE_CHAPTER = re.compile(r"^# (\d+)\.\s+(.+)$")
-RE_SECTION = re.compile(r"^## (\d+\.\d+)\s+(.+)$")
-RE_ITEM = re.compile(
-    r"^- (\d+\.\d+\.[A-Z])\.\s+\[(Required|Recommended|Option)\]\s+(.+)$"
-)
-RE_TAG = re.compile(
-    r"\[(NIST(?:-GAI)?|METI|JDLA|IPA|FUJITSU|EU-AIA)(?::[^\]]+)?\]"
-)
 
 # ---------------------------------------------------------------------------
-# Parsing
+# Subcommands
 # ---------------------------------------------------------------------------
 
 
-def parse_chapters():
-    """Parse all chapter markdown files.
+def _print_parsed(num_items, chapters, cache, file=None):
+    print(f"Parsed {num_items} checklist items from {len(chapters)} chapters.",
+          file=file)
+    if cache is not None:
+        print(cache.report(), file=file)
 
-    Returns:
-        items: list of dicts with checklist item data
-        chapters: dict mapping chapter_num -> chapter_title
-    """
-    items = []
-    chapters = {}
 
-    for filename in CHAPTER_FILES:
-        filepath = SRC_DIR / filename
-        if not filepath.exists():
-            print(f"Warning: {filepath} not found, skipping.", file=sys.stderr)
-            continue
-
-        ch_num = None
-        ch_title = None
-        sec_num = None
-        sec_title = None
-
-        for line in filepath.read_text(encoding="utf-8").splitlines():
-            m = RE_CHAPTER.match(line)
-            if m:
-                ch_num = int(m.group(1))
-                ch_title = m.group(2).strip()
-                chapters[ch_num] = ch_title
-                continue
-
-            m = RE_SECTION.match(line)
-            if m:
-                sec_num = m.group(1)
-                sec_title = m.group(2).strip()
-                continue
-
-            m = RE_ITEM.match(line)
-            if m:
-                number = m.group(1)
-                level = m.group(2)
-                raw_text = m.group(3).strip()
-
-                tags = set(RE_TAG.findall(raw_text))
-                clean_text = RE_TAG.sub("", raw_text).strip()
-
-                items.append(
-                    {
-                        "number": number,
-                        "chapter_num": ch_num,
-                        "chapter_title": ch_title,
-                        "section_num": sec_num,
-                        "section_title": sec_title,
-                        "level": level,
-                        "text": clean_text,
-                        "tags": tags,
-                    }
-                )
-
-    return items, chapters
+def cmd_parse(args, cache):
+    items, chapters = parse_chapters(cache)
+    # Keep stdout clean when the JSON goes there.
+    _print_parsed(len(items), chapters, cache,
+                  file=sys.stderr if args.json == "-" else None)
+    if not args.json:
+        return
 
+    text = json.dumps([item_record(item) for item in items],
+                      ensure_ascii=False, indent=2) + "\n"
+    if args.json == "-":
+        sys.stdout.write(text)
+    else:
+        Path(args.json).write_text(text, encoding="utf-8")
+        print(f"Generated: {args.json}")
 
-# ---------------------------------------------------------------------------
-# Excel building: Checklist sheet
-# ---------------------------------------------------------------------------
 
+def cmd_validate(args, cache):
+    items, chapters, diagnostics = lint_chapters(cache)
+    _print_parsed(len(items), chapters, cache)
 
-def build_checklist_sheet(wb, items):
-    """Build the main checklist sheet. Returns data_end_row."""
-    ws = wb.active
-    ws.title = "チェックリスト"
-
-    num_items = len(items)
-    data_end_row = DATA_START_ROW + num_items - 1
-    last_col = len(COLUMNS)
-    last_col_letter = get_column_letter(last_col)
-
-    # --- Column widths ---
-    for i, (_name, width) in enumerate(COLUMNS, 1):
-        ws.column_dimensions[get_column_letter(i)].width = width
-
-    # --- Title row (row 1) ---
-    ws.merge_cells(f"A1:{last_col_letter}1")
-    cell = ws.cell(
-        row=1, column=1, value="生成AI利用ガイドライン チェックリスト"
-    )
-    cell.font = Font(name=FONT_NAME, size=16, bold=True, color=WHITE)
-    cell.fill = PatternFill(
-        start_color=DARK_NAVY, end_color=DARK_NAVY, fill_type="solid"
-    )
-    cell.alignment = Alignment(horizontal="center", vertical="center")
-    ws.row_dimensions[1].height = 36
-
-    # --- Input row (row 2) ---
-    ws.merge_cells(f"A2:{last_col_letter}2")
-    cell = ws.cell(
-        row=2,
-        column=1,
-        value="組織名: ＿＿＿＿＿　記入者: ＿＿＿＿＿　記入日: ＿＿＿＿年＿＿月＿＿日",
-    )
-    cell.font = Font(name=FONT_NAME, size=10)
-    cell.fill = PatternFill(
-        start_color=LIGHT_GRAY, end_color=LIGHT_GRAY, fill_type="solid"
-    )
-    cell.alignment = Alignment(vertical="center")
-    ws.row_dimensions[2].height = 28
-
-    # --- Header row (row 3) ---
-    header_font = Font(name=FONT_NAME, size=11, bold=True, color=WHITE)
-    header_fill = PatternFill(
-        start_color=DARK_NAVY, end_color=DARK_NAVY, fill_type="solid"
-    )
-    header_align = Alignment(
-        horizontal="center", vertical="center", wrap_text=True
-    )
-    white_border = Border(
-        left=Side(style="thin", color=WHITE),
-        right=Side(style="thin", color=WHITE),
-        top=Side(style="thin", color=WHITE),
-        bottom=Side(style="thin", color=WHITE),
-    )
-
-    for i, (name, _) in enumerate(COLUMNS, 1):
-        cell = ws.cell(row=HEADER_ROW, column=i, value=name)
-        cell.font = header_font
-        cell.fill = header_fill
-        cell.alignment = header_align
-        cell.border = white_border
-    ws.row_dimensions[HEADER_ROW].height = 40
-
-    # --- Data rows ---
-    data_font = Font(name=FONT_NAME, size=10)
-    wrap_top = Alignment(vertical="top", wrap_text=True)
-    center = Alignment(horizontal="center", vertical="center")
-
-    for idx, item in enumerate(items):
-        row = DATA_START_ROW + idx
-        ch_num = item["chapter_num"]
-        ch_fill = PatternFill(
-            start_color=CHAPTER_COLORS.get(ch_num, "FFFFFF"),
-            end_color=CHAPTER_COLORS.get(ch_num, "FFFFFF"),
-            fill_type="solid",
+    for diagnostic in diagnostics:
+        print(diagnostic, file=sys.stderr)
+    errors = sum(d.severity == "error" for d in diagnostics)
+    warnings = len(diagnostics) - errors
+    if not items:
+        print("Error: no items found; check source files", file=sys.stderr)
+        errors += 1
+    if diagnostics:
+        print(f"{errors} error(s), {warnings} warning(s)", file=sys.stderr)
+    if errors or (warnings and args.strict):
+        sys.exit(1)
+    print("OK")
+
+
+def cmd_xref(args, cache):
+    items, chapters = parse_chapters(cache)
+    xref = CrossReference(items)
+    quiet = args.json == "-" or args.tag
+    _print_parsed(len(items), chapters, cache,
+                  file=sys.stderr if quiet else None)
+
+    if args.tag:
+        if args.tag not in REFERENCE_TAGS:
+            print(f"Error: unknown reference tag {args.tag} "
+                  f"(one of {', '.join(REFERENCE_TAGS)})", file=sys.stderr)
+            sys.exit(2)
+        for number in xref.items_for(args.tag, args.clause):
+            print(number)
+    elif not args.json:
+        for tag in REFERENCE_TAGS:
+            print(f"{tag:<10} {len(xref.tagged[tag]):>4} items, "
+                  f"{len(xref.clauses[tag]):>3} clauses")
+
+    if not args.json:
+        return
+    text = json.dumps(xref.to_json(), ensure_ascii=False, indent=2) + "\n"
+    if args.json == "-":
+        sys.stdout.write(text)
+    else:
+        Path(args.json).write_text(text, encoding="utf-8")
+        print(f"Generated: {args.json}", file=sys.stderr if quiet else None)
+
+
+def cmd_search(args, cache):
+    from checklist_search import SearchIndex, SearchReader
+
+    start = time.perf_counter()
+    watcher = ChapterWatcher(cache=cache)
+    index = SearchIndex(watcher.paths)
+
+    def reindex(paths):
+        for path in paths:
+            index.update(path, watcher.file_items(path))
+
+    reindex(watcher.paths)
+    if args.query is not None:
+        records, data = index.build()
+        reader = SearchReader(data)
+        for doc in reader.search(args.query, limit=args.limit):
+            number, level, text, *_ = records[doc]
+            print(f"{number:<8} {level:<12} {text}")
+        return
+
+    def write(label):
+        bin_path, docs_path = index.write(args.output)
+        print(
+            f"{label}: {bin_path.stat().st_size / 1024:.1f} KB index, "
+            f"{docs_path.stat().st_size / 1024:.1f} KB items "
+            f"in {(time.perf_counter() - start) * 1000:.0f}ms -> {args.output}"
         )
 
-        row_data = [
-            "",                         # A: チェック結果
-            item["number"],             # B: 項目番号
-            ch_num,                     # C: 章
-            item["chapter_title"],      # D: 章タイトル
-            item["section_num"],        # E: 節
-            item["section_title"],      # F: 節タイトル
-            item["level"],              # G: 準拠レベル
-            item["text"],               # H: チェック項目
+    write("Search index")
+    if not args.watch:
+        return
+    print(f"Watching {SRC_DIR} (Ctrl+C to stop)")
+    try:
+        while True:
+            changed = watcher.wait(interval=args.interval)
+            start = time.perf_counter()
+            watcher.refresh(changed)
+            reindex(changed)
+            write(time.strftime("%H:%M:%S ")
+                  + ", ".join(p.name for p in changed))
+    except KeyboardInterrupt:
+        print("Stopped.")
+
+
+def cmd_sample(args, cache):
+    from checklist_sample import (
+        SAMPLE_CACHE,
+        SAMPLE_FILE,
+        SampleRenderer,
+        write_if_changed,
+    )
+
+    start = time.perf_counter()
+    watcher = ChapterWatcher(cache=cache)
+    renderer = SampleRenderer(
+        None if cache is None else SAMPLE_CACHE,
+        rebuild=cache is not None and cache.rebuild,
+    )
+    levels = tuple(level for level in LEVELS if level in (args.level or ()))
+    chapters = tuple(sorted(set(args.chapter or ())))
+    tags = tuple(tag for tag in REFERENCE_TAGS if tag in (args.tag or ()))
+    scope = " / ".join(filter(None, [
+        ", ".join(levels),
+        ", ".join(f"第{num}章" for num in chapters),
+        ", ".join(tags),
+    ]))
+    md_path = args.output or SAMPLE_FILE
+    html_path = args.html or md_path.with_suffix(".html")
+
+    def write(label):
+        items, _chapters = watcher.parsed()
+        selected = select_items(items, levels, chapters, tags)
+        markdown, html = renderer.render(selected, scope)
+        renderer.save()
+        written = [
+            path for path, text in ((md_path, markdown), (html_path, html))
+            if write_if_changed(path, text)
         ]
-        # Reference tags (I–O)
-        for tag in REFERENCE_TAGS:
-            row_data.append("○" if tag in item["tags"] else "")
-        # User columns (P–Q)
-        row_data.append("")  # P: 備考
-        row_data.append("")  # Q: 対応状況メモ
-
-        for col_idx, value in enumerate(row_data, 1):
-            cell = ws.cell(row=row, column=col_idx, value=value)
-            cell.font = data_font
-
-            # Chapter background for B–O (columns 2–15)
-            if 2 <= col_idx <= 15:
-                cell.fill = ch_fill
-
-            # Text wrapping for H, P, Q
-            if col_idx in (8, 16, 17):
-                cell.alignment = wrap_top
-
-            # Center alignment for reference tag columns I–O (9–15)
-            if 9 <= col_idx <= 15:
-                cell.alignment = center
-
-    # --- Data validation: A column dropdown ---
-    dv = DataValidation(
-        type="list",
-        formula1='"対応済,一部対応,未対応,該当なし"',
-        allow_blank=True,
-    )
-    dv.error = "対応済・一部対応・未対応・該当なしから選択してください"
-    dv.errorTitle = "入力エラー"
-    dv.showErrorMessage = True
-    ws.add_data_validation(dv)
-    dv.add(f"A{DATA_START_ROW}:A{data_end_row}")
-
-    # --- Conditional formatting ---
-    a_range = f"A{DATA_START_ROW}:A{data_end_row}"
-    g_range = f"G{DATA_START_ROW}:G{data_end_row}"
-    tag_range = f"I{DATA_START_ROW}:O{data_end_row}"
-
-    # A column: check result
-    for status, bg, fg, italic in [
-        ("対応済", "C6EFCE", "006100", False),
-        ("一部対応", "FFEB9C", "9C6500", False),
-        ("未対応", "FFC7CE", "9C0006", False),
-        ("該当なし", "D9D9D9", "808080", True),
-    ]:
-        ws.conditional_formatting.add(
-            a_range,
-            CellIsRule(
-                operator="equal",
-                formula=[f'"{status}"'],
-                fill=PatternFill(
-                    start_color=bg, end_color=bg, fill_type="solid"
-                ),
-                font=Font(name=FONT_NAME, color=fg, italic=italic),
-            ),
+        print(
+            f"{label}: {len(selected)} items, "
+            f"{renderer.rendered} sections rendered, {renderer.reused} reused "
+            f"in {(time.perf_counter() - start) * 1000:.1f}ms -> "
+            + (", ".join(str(path) for path in written) or "unchanged")
         )
 
-    # G column: enforcement level
-    for level, bg, fg, bold in [
-        ("Required", "F4B084", "843C0C", True),
-        ("Recommended", "BDD7EE", "1F4E79", False),
-        ("Option", "E2EFDA", "375623", False),
-    ]:
-        ws.conditional_formatting.add(
-            g_range,
-            CellIsRule(
-                operator="equal",
-                formula=[f'"{level}"'],
-                fill=PatternFill(
-                    start_color=bg, end_color=bg, fill_type="solid"
-                ),
-                font=Font(name=FONT_NAME, color=fg, bold=bold),
-            ),
-        )
+    write("Sample")
+    if not args.watch:
+        return
+    print(f"Watching {SRC_DIR} (Ctrl+C to stop)")
+    try:
+        while True:
+            changed = watcher.wait(interval=args.interval)
+            start = time.perf_counter()
+            watcher.refresh(changed)
+            write(time.strftime("%H:%M:%S ")
+                  + ", ".join(p.name for p in changed))
+    except KeyboardInterrupt:
+        print("Stopped.")
+
+
+def cmd_overlap(args, cache):
+    from checklist_overlap import (
+        MIN_RECALL,
+        OVERLAP_CACHE,
+        SignatureCache,
+        candidate_probability,
+        find_overlaps,
+        lsh_bands,
+        overlap_record,
+    )
 
-    # I–O columns: reference tag highlight
-    ws.conditional_formatting.add(
-        tag_range,
-        CellIsRule(
-            operator="equal",
-            formula=['"○"'],
-            fill=PatternFill(
-                start_color="D6E4F0", end_color="D6E4F0", fill_type="solid"
-            ),
-        ),
-    )
-
-    # --- Auto filter ---
-    ws.auto_filter.ref = f"A{HEADER_ROW}:{last_col_letter}{data_end_row}"
-
-    # --- Freeze panes ---
-    ws.freeze_panes = "B4"
-
-    # --- Sheet protection (no password) ---
-    ws.protection.sheet = True
-    # Unlock editable columns: A (1), P (16), Q (17)
-    for r in range(DATA_START_ROW, data_end_row + 1):
-        for c in (1, 16, 17):
-            ws.cell(row=r, column=c).protection = Protection(locked=False)
-    # Unlock input row
-    ws.cell(row=2, column=1).protection = Protection(locked=False)
-
-    # --- Print settings ---
-    ws.sheet_properties.pageSetUpPr = PageSetupProperties(fitToPage=True)
-    ws.page_setup.paperSize = 8  # A3
-    ws.page_setup.orientation = "landscape"
-    ws.page_setup.fitToWidth = 1
-    ws.page_setup.fitToHeight = 0
-    ws.page_margins = PageMargins(
-        left=0.59, right=0.59, top=0.59, bottom=0.59,
-        header=0.3, footer=0.3,
-    )
-    ws.print_title_rows = "1:3"
-    ws.print_title_cols = "A:B"
-    ws.oddHeader.left.text = "生成AI利用ガイドライン チェックリスト"
-    ws.oddHeader.right.text = "&P"
-    ws.oddFooter.center.text = "Confidential"
-
-    return data_end_row
+    items, chapters = parse_chapters(cache)
+    quiet = args.json == "-"
+    log = sys.stderr if quiet else None
+    _print_parsed(len(items), chapters, cache, file=log)
+    bands = lsh_bands(args.threshold)
+    recall = candidate_probability(args.threshold, bands)
+    if recall < MIN_RECALL:
+        print(f"Warning: at --threshold {args.threshold} only {recall:.0%} "
+              "of the pairs at the threshold are found; MinHash cannot "
+              "reliably find pairs this dissimilar.", file=sys.stderr)
+
+    start = time.perf_counter()
+    signatures = SignatureCache(
+        None if cache is None else OVERLAP_CACHE,
+        rebuild=cache is not None and cache.rebuild,
+    )
+    overlaps = find_overlaps(items, signatures, threshold=args.threshold,
+                             bodies=not args.text_only, bands=bands)
+    signatures.save(item.number for item in items)
+    elapsed = time.perf_counter() - start
+
+    if args.json:
+        text = json.dumps([overlap_record(o) for o in overlaps],
+                          ensure_ascii=False, indent=2) + "\n"
+        if quiet:
+            sys.stdout.write(text)
+        else:
+            Path(args.json).write_text(text, encoding="utf-8")
+            print(f"Generated: {args.json}")
+    else:
+        for o in overlaps:
+            print(f"{o.first.number:<8} {o.second.number:<8} "
+                  f"{o.similarity:.2f} (MinHash {o.estimate:.2f})")
+            print(f"  {o.first.text}")
+            print(f"  {o.second.text}")
+    print(signatures.report(), file=log)
+    print(f"{len(overlaps)} pairs at or above {args.threshold} "
+          f"in {elapsed * 1000:.0f}ms", file=log)
+
+
+def cmd_export(args, cache):
+    from checklist_export import EXPORT_FORMATS, export_items
 
+    chapters = {}
+    sinks = [
+        EXPORT_FORMATS[fmt](path)
+        for fmt in EXPORT_FORMATS
+        if (path := getattr(args, fmt)) is not None
+    ]
+    if args.xlsx is not None:
+        # Only this sink needs openpyxl.
+        from checklist_excel import WorkbookSink
+
+        sinks.append(WorkbookSink(
+            args.xlsx, chapters, streaming=args.streaming,
+            summary=args.summary, writer=args.writer,
+            reproducible=args.reproducible,
+        ))
+    if not sinks:
+        print("Error: no output; give --jsonl, --csv, --ods and/or --xlsx",
+              file=sys.stderr)
+        sys.exit(2)
+
+    start = time.perf_counter()
+    num_items = export_items(
+        iter_items(cache, chapters), sinks, threads=args.threads
+    )
+    elapsed = time.perf_counter() - start
+    _print_parsed(num_items, chapters, cache)
+    for sink in sinks:
+        print(f"Generated: {sink.path}")
+    print(f"Exported {len(sinks)} formats in {elapsed:.2f}s"
+          f"{' (threads)' if args.threads else ''}")
 
-# ---------------------------------------------------------------------------
-# Excel building: Summary sheet
-# ---------------------------------------------------------------------------
 
+def cmd_excel(args, cache):
+    from checklist_excel import build_workbook, save_workbook
 
-def build_summary_sheet(wb, chapters, data_end_row):
-    """Build the summary dashboard sheet."""
-    ws = wb.create_sheet("サマリー")
+    if args.watch:
+        watch_excel(args, cache)
+        return
 
-    # Sheet reference for formulas
-    cl = "'チェックリスト'"
-    a_ref = f"{cl}!$A${DATA_START_ROW}:$A${data_end_row}"
-    g_ref = f"{cl}!$G${DATA_START_ROW}:$G${data_end_row}"
-    c_ref = f"{cl}!$C${DATA_START_ROW}:$C${data_end_row}"
+    profiler = NULL_PROFILER
+    if args.profile:
+        profiler = Profiler(memory=args.profile_memory)
+    profile = None
+    if args.cprofile:
+        import cProfile
 
-    total_items = data_end_row - DATA_START_ROW + 1
+        profile = cProfile.Profile()
+        profile.enable()
 
-    # Common styles
-    title_font = Font(name=FONT_NAME, size=14, bold=True, color=WHITE)
-    title_fill = PatternFill(
-        start_color=DARK_NAVY, end_color=DARK_NAVY, fill_type="solid"
-    )
-    hdr_font = Font(name=FONT_NAME, size=10, bold=True, color=WHITE)
-    hdr_fill = PatternFill(
-        start_color=DARK_BLUE_GRAY, end_color=DARK_BLUE_GRAY, fill_type="solid"
+    chapters = {}
+    items = iter_items(cache, chapters)
+    if profiler.enabled:
+        # Parse up front so that parsing is not counted as checklist
+        # building (items are otherwise consumed lazily).
+        with profiler.phase("parse"):
+            items = list(items)
+    wb, num_items, direct_rows = build_workbook(
+        items,
+        chapters,
+        streaming=args.streaming,
+        summary=args.summary,
+        writer=args.writer,
+        profiler=profiler,
     )
-    data_font = Font(name=FONT_NAME, size=10)
-    bold_font = Font(name=FONT_NAME, size=10, bold=True)
-    ctr = Alignment(horizontal="center", vertical="center")
-    pct_fmt = "0.0%"
+    _print_parsed(num_items, chapters, cache)
 
-    # Column widths
-    for col_letter, w in [
-        ("A", 22), ("B", 10), ("C", 10), ("D", 10),
-        ("E", 10), ("F", 10), ("G", 10), ("H", 12), ("I", 12),
-    ]:
-        ws.column_dimensions[col_letter].width = w
-
-    # -------------------------------------------------------------------
-    # Section 1: Overall Summary (rows 1–8)
-    # -------------------------------------------------------------------
-    ws.merge_cells("A1:C1")
-    cell = ws.cell(row=1, column=1, value="チェック結果 全体サマリー")
-    cell.font = title_font
-    cell.fill = title_fill
-    cell.alignment = ctr
-    ws.row_dimensions[1].height = 32
-
-    for col, text in enumerate(["ステータス", "件数", "割合"], 1):
-        cell = ws.cell(row=2, column=col, value=text)
-        cell.font = hdr_font
-        cell.fill = hdr_fill
-        cell.alignment = ctr
-
-    statuses_with_formula = [
-        ("対応済", f'=COUNTIF({a_ref},"対応済")'),
-        ("一部対応", f'=COUNTIF({a_ref},"一部対応")'),
-        ("未対応", f'=COUNTIF({a_ref},"未対応")'),
-        ("該当なし", f'=COUNTIF({a_ref},"該当なし")'),
-        ("未記入", f"=COUNTBLANK({a_ref})"),
-    ]
-    for i, (label, formula) in enumerate(statuses_with_formula):
-        row = 3 + i
-        ws.cell(row=row, column=1, value=label).font = data_font
-        ws.cell(row=row, column=2).value = formula
-        ws.cell(row=row, column=2).font = data_font
-        ws.cell(row=row, column=2).alignment = ctr
-        ws.cell(row=row, column=3).value = f"=B{row}/{total_items}"
-        ws.cell(row=row, column=3).font = data_font
-        ws.cell(row=row, column=3).number_format = pct_fmt
-        ws.cell(row=row, column=3).alignment = ctr
-
-    ws.cell(row=8, column=1, value="合計").font = bold_font
-    ws.cell(row=8, column=2, value=total_items).font = bold_font
-    ws.cell(row=8, column=2).alignment = ctr
-
-    # -------------------------------------------------------------------
-    # Section 2: Level Summary (rows 10–14)
-    # -------------------------------------------------------------------
-    ws.merge_cells("A10:H10")
-    cell = ws.cell(row=10, column=1, value="準拠レベル別 チェック結果")
-    cell.font = title_font
-    cell.fill = title_fill
-    cell.alignment = ctr
-    ws.row_dimensions[10].height = 32
-
-    lv_headers = [
-        "レベル", "項目数", "対応済", "一部対応",
-        "未対応", "該当なし", "未記入", "対応率",
-    ]
-    for col, text in enumerate(lv_headers, 1):
-        cell = ws.cell(row=11, column=col, value=text)
-        cell.font = hdr_font
-        cell.fill = hdr_fill
-        cell.alignment = ctr
-
-    for i, level in enumerate(["Required", "Recommended", "Option"]):
-        row = 12 + i
-        ws.cell(row=row, column=1, value=level).font = data_font
-        # Item count
-        ws.cell(row=row, column=2).value = f'=COUNTIF({g_ref},"{level}")'
-        ws.cell(row=row, column=2).font = data_font
-        ws.cell(row=row, column=2).alignment = ctr
-        # Status counts
-        for j, status in enumerate(CHECK_STATUSES):
-            ws.cell(row=row, column=3 + j).value = (
-                f'=COUNTIFS({g_ref},"{level}",{a_ref},"{status}")'
-            )
-            ws.cell(row=row, column=3 + j).font = data_font
-            ws.cell(row=row, column=3 + j).alignment = ctr
-        # 未記入 = total - sum of statuses
-        ws.cell(row=row, column=7).value = f"=B{row}-SUM(C{row}:F{row})"
-        ws.cell(row=row, column=7).font = data_font
-        ws.cell(row=row, column=7).alignment = ctr
-        # 対応率
-        ws.cell(row=row, column=8).value = f"=IFERROR(C{row}/B{row},0)"
-        ws.cell(row=row, column=8).font = data_font
-        ws.cell(row=row, column=8).number_format = pct_fmt
-        ws.cell(row=row, column=8).alignment = ctr
-
-    # -------------------------------------------------------------------
-    # Section 3: Chapter Summary (rows 16–24)
-    # -------------------------------------------------------------------
-    ws.merge_cells("A16:I16")
-    cell = ws.cell(row=16, column=1, value="章別 チェック結果")
-    cell.font = title_font
-    cell.fill = title_fill
-    cell.alignment = ctr
-    ws.row_dimensions[16].height = 32
-
-    ch_headers = [
-        "章", "項目数", "対応済", "一部対応",
-        "未対応", "該当なし", "未記入", "対応率", "必須対応率",
-    ]
-    for col, text in enumerate(ch_headers, 1):
-        cell = ws.cell(row=17, column=col, value=text)
-        cell.font = hdr_font
-        cell.fill = hdr_fill
-        cell.alignment = ctr
-
-    for ch_num in sorted(chapters.keys()):
-        row = 17 + ch_num  # ch1 → row 18, ch7 → row 24
-        ch_label = f"{ch_num}. {chapters[ch_num]}"
-        ws.cell(row=row, column=1, value=ch_label).font = data_font
-        # Item count
-        ws.cell(row=row, column=2).value = f"=COUNTIF({c_ref},{ch_num})"
-        ws.cell(row=row, column=2).font = data_font
-        ws.cell(row=row, column=2).alignment = ctr
-        # Status counts
-        for j, status in enumerate(CHECK_STATUSES):
-            ws.cell(row=row, column=3 + j).value = (
-                f'=COUNTIFS({c_ref},{ch_num},{a_ref},"{status}")'
-            )
-            ws.cell(row=row, column=3 + j).font = data_font
-            ws.cell(row=row, column=3 + j).alignment = ctr
-        # 未記入
-        ws.cell(row=row, column=7).value = f"=B{row}-SUM(C{row}:F{row})"
-        ws.cell(row=row, column=7).font = data_font
-        ws.cell(row=row, column=7).alignment = ctr
-        # 対応率
-        ws.cell(row=row, column=8).value = f"=IFERROR(C{row}/B{row},0)"
-        ws.cell(row=row, column=8).font = data_font
-        ws.cell(row=row, column=8).number_format = pct_fmt
-        ws.cell(row=row, column=8).alignment = ctr
-        # 必須対応率
-        req_total = f'COUNTIFS({c_ref},{ch_num},{g_ref},"Required")'
-        req_done = (
-            f'COUNTIFS({c_ref},{ch_num},{g_ref},"Required",'
-            f'{a_ref},"対応済")'
-        )
-        ws.cell(row=row, column=9).value = f"=IFERROR({req_done}/{req_total},0)"
-        ws.cell(row=row, column=9).font = data_font
-        ws.cell(row=row, column=9).number_format = pct_fmt
-        ws.cell(row=row, column=9).alignment = ctr
-
-    # -------------------------------------------------------------------
-    # Conditional formatting on percentage cells
-    # -------------------------------------------------------------------
-    green = PatternFill(start_color="C6EFCE", end_color="C6EFCE", fill_type="solid")
-    yellow = PatternFill(start_color="FFEB9C", end_color="FFEB9C", fill_type="solid")
-    red = PatternFill(start_color="FFC7CE", end_color="FFC7CE", fill_type="solid")
-
-    pct_ranges = ["C3:C7", "H12:H14", "H18:I24"]
-    for rng in pct_ranges:
-        ws.conditional_formatting.add(
-            rng,
-            CellIsRule(
-                operator="greaterThanOrEqual",
-                formula=["1"],
-                fill=green,
-                stopIfTrue=True,
-            ),
-        )
-        ws.conditional_formatting.add(
-            rng,
-            CellIsRule(
-                operator="greaterThanOrEqual",
-                formula=["0.8"],
-                fill=yellow,
-                stopIfTrue=True,
-            ),
+    if not num_items:
+        print("Error: No items found. Check source files.", file=sys.stderr)
+        sys.exit(1)
+
+    output = args.output
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with profiler.phase("save"):
+        written = save_workbook(wb, output, args.reproducible, direct_rows)
+    print(f"{'Generated' if written else 'Unchanged'}: {output}")
+
+    if profile is not None:
+        profile.disable()
+        profile.dump_stats(args.cprofile)
+        print(f"cProfile stats: {args.cprofile}")
+
+    if args.profile:
+        profiler.count("items", num_items)
+        profiler.count("chapters", len(chapters))
+        profiler.count("named_styles", len(wb.named_styles))
+        profiler.count("output_bytes", output.stat().st_size)
+        report = profiler.report()
+        report["options"] = {
+            "streaming": args.streaming,
+            "summary": args.summary,
+            "engine": args.writer,
+            "cache": cache is not None,
+        }
+        text = json.dumps(report, indent=2) + "\n"
+        if args.profile == "-":
+            sys.stdout.write(text)
+        else:
+            Path(args.profile).write_text(text, encoding="utf-8")
+            print(f"Profile: {args.profile}")
+
+
+def watch_excel(args, cache):
+    """Regenerate the workbook whenever a chapter file changes."""
+    from checklist_excel import build_workbook, save_workbook
+
+    def rebuild(label, start):
+        items, chapters = watcher.parsed()
+        if not items:
+            print(f"{label}: no items found; workbook not written",
+                  file=sys.stderr)
+            return
+        wb, num_items, direct_rows = build_workbook(
+            items, chapters, streaming=args.streaming, summary=args.summary,
+            writer=args.writer,
         )
-        ws.conditional_formatting.add(
-            rng,
-            CellIsRule(
-                operator="lessThan",
-                formula=["0.8"],
-                fill=red,
-                stopIfTrue=True,
-            ),
+        written = save_workbook(wb, args.output, args.reproducible,
+                                direct_rows)
+        print(
+            f"{label}: {num_items} items from {len(chapters)} chapters "
+            f"in {time.perf_counter() - start:.2f}s -> {args.output}"
+            + ("" if written else " (unchanged)")
         )
 
-    # -------------------------------------------------------------------
-    # Section 4: Guide text (rows 26+)
-    # -------------------------------------------------------------------
-    guide_start = 26
-    ws.cell(row=guide_start, column=1, value="チェック結果の入力方法").font = (
-        Font(name=FONT_NAME, size=12, bold=True)
-    )
-
-    guide_lines = [
-        "",
-        "チェック結果の選択基準:",
-        "　対応済:　　ガイドラインに該当する内容が記載されている",
-        "　一部対応:　内容は含まれているが不十分、または表現が曖昧",
-        "　未対応:　　ガイドラインに該当する記載がない",
-        "　該当なし:　自組織の状況に照らして対応不要と判断した項目",
-        "",
-        "推奨する進め方:",
-        "　1. まず「Required」項目だけをフィルタで表示し、すべてチェックする",
-        "　2. 次に「Recommended」項目を確認する",
-        "　3. 最後に「Option」項目を組織の状況に応じて検討する",
-        "　4.「該当なし」とした項目は、備考欄にその理由を記入する",
-    ]
-    for i, text in enumerate(guide_lines):
-        ws.cell(
-            row=guide_start + 1 + i, column=1, value=text
-        ).font = data_font
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    start = time.perf_counter()
+    watcher = ChapterWatcher(cache=cache)
+    rebuild("Initial build", start)
+    print(f"Watching {SRC_DIR} (Ctrl+C to stop)")
+
+    try:
+        while True:
+            changed = watcher.wait(interval=args.interval)
+            start = time.perf_counter()
+            watcher.refresh(changed)
+            label = time.strftime("%H:%M:%S ") + ", ".join(
+                p.name for p in changed
+            )
+            try:
+                rebuild(label, start)
+            except (OSError, ValueError) as e:
+                # E.g. the workbook is open (locked) in Excel on Windows.
+                print(f"{label}: Error: {e}", file=sys.stderr)
+    except KeyboardInterrupt:
+        print("Stopped.")
 
-    # --- Sheet protection ---
-    ws.protection.sheet = True
 
-    # --- Print settings ---
-    ws.page_setup.paperSize = 9  # A4
-    ws.page_setup.orientation = "portrait"
-    ws.sheet_properties.pageSetUpPr = PageSetupProperties(fitToPage=True)
-    ws.page_setup.fitToWidth = 1
-    ws.page_setup.fitToHeight = 1
-    ws.page_margins = PageMargins(
-        left=0.79, right=0.79, top=0.79, bottom=0.79,
-        header=0.3, footer=0.3,
+def cmd_batch(args, cache):
+    from checklist_excel import load_template, run_batch
+
+    chapters = {}
+    items = list(iter_items(cache, chapters))
+    _print_parsed(len(items), chapters, cache)
+    if not items:
+        print("Error: No items found. Check source files.", file=sys.stderr)
+        sys.exit(1)
+
+    output_dir = args.output_dir or args.manifest.parent
+    try:
+        jobs = load_manifest(args.manifest, output_dir)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    template = None
+    if args.template:
+        start = time.perf_counter()
+        template = load_template(items, chapters, args.summary, cache,
+                                 args.writer)
+        print(f"Template ready in {time.perf_counter() - start:.2f}s")
+
+    workers = args.jobs or os.cpu_count() or 1
+    start = time.perf_counter()
+    failed = run_batch(
+        jobs,
+        items,
+        chapters,
+        streaming=args.streaming,
+        summary=args.summary,
+        workers=workers,
+        template=template,
+        reproducible=args.reproducible,
+        writer=args.writer,
     )
+    elapsed = time.perf_counter() - start
+
+    done = len(jobs) - len(failed)
+    print(
+        f"Generated {done} workbooks in {output_dir} in {elapsed:.2f}s "
+        f"({done / elapsed if elapsed else 0:.1f} workbooks/s, "
+        f"{workers} workers)"
+    )
+    for job, error in failed:
+        print(f"Error: {job.output.name}: {error}", file=sys.stderr)
+    if failed:
+        sys.exit(1)
+
+
+def cmd_collect(args, cache):
+    import collect_excel
+
+    collect_excel.main(args.forward_args)
+
+
+def cmd_migrate(args, cache):
+    import migrate_excel
+
+    migrate_excel.main(args.forward_args)
+
+
+def cmd_serve(args, cache):
+    import serve_excel
+
+    serve_excel.main(args.forward_args)
+
+
+def cmd_history(args, cache):
+    import history_excel
+
+    history_excel.main(args.forward_args)
+
+
+def cmd_gap(args, cache):
+    import gap_excel
+
+    gap_excel.main(args.forward_args)
+
+
+COMMANDS = {
+    "excel": cmd_excel,
+    "parse": cmd_parse,
+    "validate": cmd_validate,
+    "xref": cmd_xref,
+    "search": cmd_search,
+    "sample": cmd_sample,
+    "overlap": cmd_overlap,
+    "export": cmd_export,
+    "batch": cmd_batch,
+    "collect": cmd_collect,
+    "migrate": cmd_migrate,
+    "serve": cmd_serve,
+    "history": cmd_history,
+    "gap": cmd_gap,
+}
 
 
 # ---------------------------------------------------------------------------
@@ -650,22 +599,362 @@ def build_summary_sheet(wb, chapters, data_end_row):
 # ---------------------------------------------------------------------------
 
 
-def main():
-    items, chapters = parse_chapters()
-    print(f"Parsed {len(items)} checklist items from {len(chapters)} chapters.")
+def _default_command(argv):
+    """Prefix argv with the implied subcommand (excel, or batch for --batch)."""
+    if argv and argv[0] in (*SUBCOMMANDS, "-h", "--help"):
+        return argv
+    if "--batch" in argv:
+        # The pre-subcommand spelling: --batch MANIFEST [options]
+        argv = list(argv)
+        argv.remove("--batch")
+        return ["batch", *argv]
+    return ["excel", *argv]
+
+
+def parse_args(argv=None):
+    argv = _default_command(sys.argv[1:] if argv is None else argv)
+    if argv[0] in FORWARDED:
+        # Parsed by the stand-alone script, including its --help.
+        return argparse.Namespace(command=argv[0], forward_args=argv[1:])
+
+    cache_options = argparse.ArgumentParser(add_help=False)
+    group = cache_options.add_mutually_exclusive_group()
+    group.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="parse every chapter without reading or writing the parse cache",
+    )
+    group.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="ignore cached entries, re-parse every chapter and rewrite the cache",
+    )
 
-    if not items:
-        print("Error: No items found. Check source files.", file=sys.stderr)
-        sys.exit(1)
+    build_options = argparse.ArgumentParser(add_help=False)
+    build_options.add_argument(
+        "--streaming",
+        action="store_true",
+        help="write rows through write-only worksheets to bound memory use",
+    )
+    build_options.add_argument(
+        "--summary",
+        choices=SUMMARY_ENGINES,
+        default="countifs",
+        help="summary engine: COUNTIFS over the checklist (countifs, "
+        "default) or precomputed numbers (static)",
+    )
+    build_options.add_argument(
+        "--engine",
+        dest="writer",
+        choices=WRITER_ENGINES,
+        default="openpyxl",
+        help="writer of the checklist rows: openpyxl cells (default) or "
+        "rows serialized straight to SpreadsheetML (fast); both write "
+        "identical workbooks",
+    )
+    build_options.add_argument(
+        "--reproducible",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help="write byte-identical workbooks for identical content (fixed "
+        "timestamps from SOURCE_DATE_EPOCH or 1980-01-01, fixed part "
+        "order); default: only when SOURCE_DATE_EPOCH is set. Workbooks "
+        "whose content is unchanged are never rewritten",
+    )
 
-    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    parser = argparse.ArgumentParser(
+        description="Generate the self-check Excel workbook from src/ch*.md."
+    )
+    commands = parser.add_subparsers(dest="command", metavar="COMMAND")
 
-    wb = Workbook()
-    data_end_row = build_checklist_sheet(wb, items)
-    build_summary_sheet(wb, chapters, data_end_row)
+    excel = commands.add_parser(
+        "excel",
+        parents=[cache_options, build_options],
+        help="generate the checklist workbook (default)",
+    )
+    excel.add_argument(
+        "-o", "--output",
+        type=Path,
+        default=OUTPUT_FILE,
+        help="workbook to write (default: excel/genai-governance-checklist.xlsx)",
+    )
+    excel.add_argument(
+        "--watch",
+        action="store_true",
+        help="keep running and regenerate the workbook whenever a chapter "
+        "file changes (only changed chapters are re-parsed)",
+    )
+    excel.add_argument(
+        "--interval",
+        type=float,
+        default=0.2,
+        metavar="SECONDS",
+        help="with --watch: polling interval (default: %(default)s)",
+    )
+    excel.add_argument(
+        "--profile",
+        metavar="FILE",
+        help="write per-phase wall/CPU timings and counts as JSON "
+        "('-' for stdout)",
+    )
+    excel.add_argument(
+        "--profile-memory",
+        action="store_true",
+        help="with --profile: also record tracemalloc peaks (slower)",
+    )
+    excel.add_argument(
+        "--cprofile",
+        metavar="FILE",
+        help="dump cProfile statistics of the run (pstats format)",
+    )
+
+    parse = commands.add_parser(
+        "parse",
+        parents=[cache_options],
+        help="parse the chapter files and report the item count",
+    )
+    parse.add_argument(
+        "--json",
+        metavar="FILE",
+        help="write the parsed items as JSON ('-' for stdout)",
+    )
+
+    validate = commands.add_parser(
+        "validate",
+        parents=[cache_options],
+        help="check the chapter files' structure and report problems "
+        "as FILE:LINE diagnostics",
+    )
+    validate.add_argument(
+        "--strict",
+        action="store_true",
+        help="exit with status 1 on warnings (e.g. unknown reference tags) "
+        "as well as errors",
+    )
+
+    xref = commands.add_parser(
+        "xref",
+        parents=[cache_options],
+        help="index the items by reference framework and clause",
+    )
+    xref.add_argument(
+        "tag",
+        nargs="?",
+        metavar="TAG",
+        help="print the items tagged TAG (e.g. NIST), one per line",
+    )
+    xref.add_argument(
+        "clause",
+        nargs="?",
+        metavar="CLAUSE",
+        help="with TAG: only the items citing this clause (e.g. 'GOVERN 2.1')",
+    )
+    xref.add_argument(
+        "--json",
+        metavar="FILE",
+        help="write the framework -> clause -> items index as JSON "
+        "('-' for stdout)",
+    )
+
+    search = commands.add_parser(
+        "search",
+        parents=[cache_options],
+        help="write the item search index for the mdBook output",
+    )
+    search.add_argument(
+        "-o", "--output",
+        type=Path,
+        default=BOOK_DIR,
+        metavar="DIR",
+        help="directory to write the index into (default: book, the mdBook "
+        "output; run after mdbook build)",
+    )
+    search.add_argument(
+        "--query",
+        metavar="TEXT",
+        help="print the items matching TEXT instead of writing the index",
+    )
+    search.add_argument(
+        "--limit",
+        type=int,
+        default=20,
+        help="with --query: number of items to print (default: %(default)s)",
+    )
+    search.add_argument(
+        "--watch",
+        action="store_true",
+        help="keep running and re-index the changed chapters",
+    )
+    search.add_argument(
+        "--interval",
+        type=float,
+        default=0.2,
+        metavar="SECONDS",
+        help="with --watch: polling interval (default: %(default)s)",
+    )
+
+    sample = commands.add_parser(
+        "sample",
+        parents=[cache_options],
+        help="assemble a draft guideline from the items' 定義例",
+    )
+    sample.add_argument(
+        "--level",
+        action="append",
+        choices=LEVELS,
+        help="only items of this level (repeatable; default: all)",
+    )
+    sample.add_argument(
+        "--chapter",
+        action="append",
+        type=int,
+        metavar="N",
+        help="only items of chapter N (repeatable; default: all)",
+    )
+    sample.add_argument(
+        "--tag",
+        action="append",
+        choices=REFERENCE_TAGS,
+        help="only items with this reference tag (repeatable)",
+    )
+    sample.add_argument(
+        "-o", "--output",
+        type=Path,
+        metavar="FILE",
+        help="Markdown file to write "
+        "(default: docs/guideline-sample/guideline-draft.md)",
+    )
+    sample.add_argument(
+        "--html",
+        type=Path,
+        metavar="FILE",
+        help="HTML file to write (default: the Markdown file's name "
+        "with .html)",
+    )
+    sample.add_argument(
+        "--watch",
+        action="store_true",
+        help="keep running and re-render the sections whose items changed",
+    )
+    sample.add_argument(
+        "--interval",
+        type=float,
+        default=0.2,
+        metavar="SECONDS",
+        help="with --watch: polling interval (default: %(default)s)",
+    )
+
+    overlap = commands.add_parser(
+        "overlap",
+        parents=[cache_options],
+        help="report pairs of items with overlapping wording",
+    )
+    overlap.add_argument(
+        "--threshold",
+        type=float,
+        default=0.5,
+        metavar="J",
+        help="lowest Jaccard similarity of the character shingles to "
+        "report (default: %(default)s)",
+    )
+    overlap.add_argument(
+        "--text-only",
+        action="store_true",
+        help="compare the チェック項目 texts only, without 説明 and 定義例",
+    )
+    overlap.add_argument(
+        "--json",
+        metavar="FILE",
+        help="write the pairs as JSON ('-' for stdout)",
+    )
+
+    export = commands.add_parser(
+        "export",
+        parents=[cache_options, build_options],
+        help="parse once and write the items to several formats at once",
+    )
+    for fmt, text in [
+        ("jsonl", "one JSON object per item"),
+        ("csv", "UTF-8 (BOM) CSV"),
+        ("ods", "OpenDocument spreadsheet"),
+        ("xlsx", "the checklist workbook (the build options apply)"),
+    ]:
+        export.add_argument(
+            f"--{fmt}", type=Path, metavar="FILE", help=f"write {text}"
+        )
+    export.add_argument(
+        "--threads",
+        action="store_true",
+        help="run every writer in its own thread, fed through bounded queues",
+    )
+
+    batch = commands.add_parser(
+        "batch",
+        parents=[cache_options, build_options],
+        help="generate one prefilled workbook per manifest row",
+    )
+    batch.add_argument(
+        "manifest",
+        type=Path,
+        metavar="MANIFEST",
+        help="CSV/JSON manifest of organizations and answer files",
+    )
+    batch.add_argument(
+        "--output-dir",
+        type=Path,
+        help="directory for the workbooks (default: the manifest's)",
+    )
+    batch.add_argument(
+        "--template",
+        action="store_true",
+        help="patch copies of a cached blank workbook instead of rebuilding "
+        "each one (not with --summary static)",
+    )
+    batch.add_argument(
+        "-j", "--jobs",
+        type=int,
+        default=None,
+        help="worker processes (default: number of CPUs)",
+    )
+
+    # Listed for --help only; see FORWARDED.
+    commands.add_parser(
+        "collect", help="consolidate returned workbooks (see collect --help)"
+    )
+    commands.add_parser(
+        "migrate",
+        help="carry answers over to the current release (see migrate --help)",
+    )
+    commands.add_parser(
+        "serve", help="serve filtered workbooks over HTTP (see serve --help)"
+    )
+    commands.add_parser(
+        "history",
+        help="store returned workbooks and report trends (see history --help)",
+    )
+    commands.add_parser(
+        "gap",
+        help="rank remediation work over many organizations' answers; "
+        "needs NumPy from tools/requirements-optional.txt (see gap --help)",
+    )
 
-    wb.save(OUTPUT_FILE)
-    print(f"Generated: {OUTPUT_FILE}")
+    args = parser.parse_args(argv)
+    if args.command == "excel" and args.profile_memory and not args.profile:
+        excel.error("--profile-memory requires --profile")
+    if args.command == "excel" and args.watch and (args.profile
+                                                   or args.cprofile):
+        excel.error("--watch cannot be combined with profiling")
+    if args.command == "batch" and args.template and args.summary == "static":
+        batch.error("--template needs the countifs summary")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    cache = None
+    if args.command not in FORWARDED and not args.no_cache:
+        cache = ParseCache(rebuild=args.rebuild)
+    COMMANDS[args.command](args, cache)
 
 
 if __name__ == "__main__":
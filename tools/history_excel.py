@@ -0,0 +1,681 @@
+#!/usr/bin/env python3
+"""
+生成AI利用ガイドライン チェックリスト — 自己点検の履歴ストア
+
+返送された記入済みチェックリストの回答を SQLite のデータベースに蓄積し、
+組織・記入日・章・準拠レベルごとの対応率と必須対応率の推移を出力する。
+回答は（組織, 記入日, チェックリストの版, 項目番号）をキーに一括で登録し、
+登録のたびに集計表（回答ごと・四半期ごと）を差分で更新するため、
+推移の出力は回答の件数によらず集計表だけを読む。
+
+Usage:
+    python tools/history_excel.py ingest PATH [PATH ...] [--db FILE]
+                                  [--version VERSION] [--date YYYY-MM-DD] [-j N]
+    python tools/history_excel.py trend [--db FILE] [--by {chapter,level,total}]
+                                  [--quarterly | --organization ORG ...]
+                                  [--csv FILE] [--json FILE] [-o OUTPUT]
+
+    ingest  ワークブック（.xlsx）またはそれを含むディレクトリの回答を登録する。
+            組織名・記入日は2行目の記入欄から読む（同じ組織・記入日・版の回答は置き換える）
+    trend   推移の表を表示する（--csv / --json / -o で CSV・JSON・Excel に出力）
+
+Output:
+    checklist-history.sqlite3（--db で変更可）
+
+仕様書: tools/docs/excel-spec.md
+"""
+
+import argparse
+import csv
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+
+from checklist import (
+    CHECK_STATUSES,
+    DATA_START_ROW,
+    HEADER_ROW,
+    LEVELS,
+    REPO_ROOT,
+    Respondent,
+)
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+
+DEFAULT_DB = Path("checklist-history.sqlite3")
+
+# Bumped when the tables change; older databases are refused.
+SCHEMA_VERSION = 1
+
+# チェック結果, 項目番号, 章, 準拠レベル, 備考, 対応状況メモ (row 2 column A: 記入欄)
+READ_COLUMNS = frozenset({"A", "B", "C", "G", "P", "Q"})
+
+# Count columns of the rollup tables, in CHECK_STATUSES order then 未記入
+STATUS_COLUMNS = {
+    "対応済": "done",
+    "一部対応": "partial",
+    "未対応": "open",
+    "該当なし": "na",
+    "": "blank",
+}
+COUNT_COLUMNS = ("total", *STATUS_COLUMNS.values())
+
+TREND_GROUPS = ("chapter", "level", "total")
+
+RE_RELEASE = re.compile(r"^## \[(\d[^\]]*)\]", re.MULTILINE)
+RE_ANY_DATE = re.compile(r"(\d{4})\D+(\d{1,2})\D+(\d{1,2})")
+
+SCHEMA = f"""
+CREATE TABLE assessments (
+    id INTEGER PRIMARY KEY,
+    organization TEXT NOT NULL,
+    assessed_on TEXT NOT NULL,      -- YYYY-MM-DD
+    version TEXT NOT NULL,
+    quarter TEXT NOT NULL,          -- YYYYQn of assessed_on
+    source TEXT NOT NULL DEFAULT '',
+    UNIQUE (organization, assessed_on, version)
+);
+CREATE INDEX assessments_quarter ON assessments (quarter);
+
+CREATE TABLE answers (
+    assessment_id INTEGER NOT NULL REFERENCES assessments (id),
+    number TEXT NOT NULL,
+    chapter INTEGER NOT NULL,       -- 0 if unknown
+    level TEXT NOT NULL,            -- '' if unknown
+    status TEXT NOT NULL,           -- '' for 未記入
+    note TEXT,
+    memo TEXT,
+    PRIMARY KEY (assessment_id, number)
+) WITHOUT ROWID;
+CREATE INDEX answers_chapter ON answers (chapter);
+CREATE INDEX answers_level ON answers (level);
+CREATE INDEX answers_status ON answers (status);
+
+-- Status counts per assessment, chapter and level
+CREATE TABLE rollup (
+    assessment_id INTEGER NOT NULL REFERENCES assessments (id),
+    chapter INTEGER NOT NULL,
+    level TEXT NOT NULL,
+    {", ".join(f"{column} INTEGER NOT NULL" for column in COUNT_COLUMNS)},
+    PRIMARY KEY (assessment_id, chapter, level)
+) WITHOUT ROWID;
+
+-- The same counts summed over all assessments of a quarter
+CREATE TABLE rollup_quarter (
+    quarter TEXT NOT NULL,
+    chapter INTEGER NOT NULL,
+    level TEXT NOT NULL,
+    {", ".join(f"{column} INTEGER NOT NULL" for column in COUNT_COLUMNS)},
+    PRIMARY KEY (quarter, chapter, level)
+) WITHOUT ROWID;
+"""
+
+
+def checklist_version():
+    """Return the latest released version in CHANGELOG.md ("" if none)."""
+    try:
+        text = (REPO_ROOT / "CHANGELOG.md").read_text(encoding="utf-8")
+    except OSError:
+        return ""
+    m = RE_RELEASE.search(text)
+    return m.group(1) if m else ""
+
+
+def iso_date(text):
+    """Return text such as 2026年4月1日 or 2026/4/1 as YYYY-MM-DD, or None."""
+    m = RE_ANY_DATE.search(text or "")
+    if m is None:
+        return None
+    try:
+        return date(*map(int, m.groups())).isoformat()
+    except ValueError:
+        return None
+
+
+def quarter(assessed_on):
+    """Return the YYYYQn quarter of a YYYY-MM-DD date."""
+    return f"{assessed_on[:4]}Q{(int(assessed_on[5:7]) - 1) // 3 + 1}"
+
+
+# ---------------------------------------------------------------------------
+# Store
+# ---------------------------------------------------------------------------
+
+
+@dataclass(frozen=True, slots=True)
+class Record:
+    """One assessment to store."""
+
+    organization: str
+    assessed_on: str      # YYYY-MM-DD
+    version: str
+    rows: tuple           # (number, chapter, level, status, note, memo)
+    source: str = ""
+
+
+class HistoryStore:
+    """Answers of repeated self-assessments in an SQLite database.
+
+    add() replaces an assessment with the same (organization, date,
+    version) key and updates the rollup tables by that assessment only:
+    its rollup rows are computed from its answers, and its counts are
+    added to (or, when replaced, first subtracted from) its quarter.
+    The trend queries read nothing but the rollup tables.
+    """
+
+    def __init__(self, path=DEFAULT_DB):
+        self.path = Path(path)
+        self.db = sqlite3.connect(self.path)
+        self.db.execute("PRAGMA journal_mode = WAL")
+        self.db.execute("PRAGMA synchronous = NORMAL")
+        version = self.db.execute("PRAGMA user_version").fetchone()[0]
+        if version == 0:
+            with self.db:
+                self.db.executescript(SCHEMA)
+                self.db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        elif version != SCHEMA_VERSION:
+            self.db.close()
+            raise ValueError(
+                f"schema version {version}, expected {SCHEMA_VERSION}"
+            )
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _add_to_quarter(self, assessment_id, period, sign):
+        counts = ", ".join(f"? * {column}" for column in COUNT_COLUMNS)
+        updates = ", ".join(
+            f"{column} = {column} + excluded.{column}"
+            for column in COUNT_COLUMNS
+        )
+        self.db.execute(
+            f"INSERT INTO rollup_quarter "
+            f"SELECT ?, chapter, level, {counts} FROM rollup "
+            f"WHERE assessment_id = ? "
+            f"ON CONFLICT (quarter, chapter, level) DO UPDATE SET {updates}",
+            (period, *[sign] * len(COUNT_COLUMNS), assessment_id),
+        )
+
+    def _add(self, record):
+        period = quarter(record.assessed_on)
+        row = self.db.execute(
+            "SELECT id FROM assessments "
+            "WHERE organization = ? AND assessed_on = ? AND version = ?",
+            (record.organization, record.assessed_on, record.version),
+        ).fetchone()
+        if row is None:
+            assessment_id = self.db.execute(
+                "INSERT INTO assessments "
+                "(organization, assessed_on, version, quarter, source) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (record.organization, record.assessed_on, record.version,
+                 period, record.source),
+            ).lastrowid
+        else:
+            assessment_id = row[0]
+            self._add_to_quarter(assessment_id, period, -1)
+            self.db.execute("DELETE FROM rollup WHERE assessment_id = ?",
+                            (assessment_id,))
+            self.db.execute("DELETE FROM answers WHERE assessment_id = ?",
+                            (assessment_id,))
+            self.db.execute("UPDATE assessments SET source = ? WHERE id = ?",
+                            (record.source, assessment_id))
+
+        self.db.executemany(
+            "INSERT OR REPLACE INTO answers VALUES (?, ?, ?, ?, ?, ?, ?)",
+            ((assessment_id, *answer) for answer in record.rows),
+        )
+        counts = ", ".join(
+            f"SUM(status = '{status}')" for status in STATUS_COLUMNS
+        )
+        self.db.execute(
+            f"INSERT INTO rollup SELECT assessment_id, chapter, level, "
+            f"COUNT(*), {counts} FROM answers WHERE assessment_id = ? "
+            f"GROUP BY chapter, level",
+            (assessment_id,),
+        )
+        self._add_to_quarter(assessment_id, period, 1)
+        return assessment_id
+
+    def add(self, records):
+        """Store Records in one transaction; returns the answer count."""
+        answers = 0
+        with self.db:
+            for record in records:
+                self._add(record)
+                answers += len(record.rows)
+        return answers
+
+    def counts(self):
+        """Return (assessments, answers, organizations) in the store."""
+        return self.db.execute(
+            "SELECT COUNT(*), (SELECT COUNT(*) FROM answers), "
+            "COUNT(DISTINCT organization) FROM assessments"
+        ).fetchone()
+
+    def trend(self, by="chapter", organizations=(), quarterly=False):
+        """Return the trend rows as dicts (see TREND_FIELDS).
+
+        One row per assessment (or per quarter) and chapter, level or
+        none (`by="total"`), in date order.
+        """
+        if by not in TREND_GROUPS:
+            raise ValueError(f"unknown grouping: {by}")
+        group = {"chapter": "r.chapter", "level": "r.level", "total": "''"}[by]
+        order = {
+            "chapter": "r.chapter",
+            "level": "CASE r.level "
+                     + " ".join(f"WHEN '{lv}' THEN {i}"
+                                for i, lv in enumerate(LEVELS))
+                     + f" ELSE {len(LEVELS)} END",
+            "total": "1",
+        }[by]
+        sums = ", ".join(f"SUM(r.{column})" for column in COUNT_COLUMNS)
+        required = (
+            "SUM(CASE WHEN r.level = 'Required' THEN r.total ELSE 0 END), "
+            "SUM(CASE WHEN r.level = 'Required' THEN r.done ELSE 0 END)"
+        )
+        if quarterly:
+            key = ("r.quarter, (SELECT COUNT(*) FROM assessments a "
+                   "WHERE a.quarter = r.quarter)")
+            sql = (
+                f"SELECT {key}, {group}, {sums}, {required} "
+                f"FROM rollup_quarter r GROUP BY r.quarter, {group} "
+                f"HAVING SUM(r.total) > 0 ORDER BY r.quarter, {order}"
+            )
+            params = ()
+        else:
+            key = "a.organization, a.assessed_on, a.version"
+            where = ""
+            if organizations:
+                where = ("WHERE a.organization IN ("
+                         + ", ".join("?" * len(organizations)) + ")")
+            sql = (
+                f"SELECT {key}, {group}, {sums}, {required} "
+                f"FROM rollup r JOIN assessments a ON a.id = r.assessment_id "
+                f"{where} GROUP BY a.id, {group} "
+                f"ORDER BY a.assessed_on, a.organization, a.version, {order}"
+            )
+            params = tuple(organizations)
+
+        keys = ("quarter", "assessments") if quarterly else (
+            "organization", "date", "version")
+        rows = []
+        for values in self.db.execute(sql, params):
+            record = dict(zip(keys, values))
+            if by != "total":
+                record[by] = values[len(keys)]
+            counts = values[len(keys) + 1:]
+            record.update(zip(COUNT_COLUMNS, counts))
+            req_total, req_done = counts[-2:]
+            record["rate"] = _ratio(record["done"], record["total"])
+            record["required_rate"] = _ratio(req_done, req_total)
+            rows.append(record)
+        return rows
+
+
+def _ratio(num, den):
+    return num / den if den else None
+
+
+# ---------------------------------------------------------------------------
+# Reading returned workbooks
+# ---------------------------------------------------------------------------
+
+
+@dataclass(frozen=True, slots=True)
+class Assessment:
+    """The 記入欄 and answers read from one returned workbook."""
+
+    name: str
+    respondent: Respondent
+    rows: tuple = ()      # (number, chapter, level, status, note, memo)
+    invalid: int = 0      # rows whose チェック結果 is not a known status
+    error: str = ""
+
+
+def read_assessment(path):
+    """Read the 記入欄 and every answer row of one returned workbook.
+
+    Like collect_excel.read_response(), errors are reported through
+    Assessment.error.
+    """
+    from collect_excel import READ_ERRORS, read_checklist
+
+    path = Path(path)
+    try:
+        cells = read_checklist(path, READ_COLUMNS)
+    except READ_ERRORS as e:
+        return Assessment(path.name, Respondent(), error=str(e))
+
+    def value(row, column):
+        return cells.get((row, column), "")
+
+    rows = []
+    invalid = 0
+    for row in sorted({row for row, _column in cells if row >= DATA_START_ROW}):
+        number = value(row, "B")
+        if not number:
+            continue
+        status = value(row, "A")
+        if status and status not in CHECK_STATUSES:
+            invalid += 1
+            status = ""
+        chapter = value(row, "C") or number.partition(".")[0]
+        rows.append((
+            number,
+            int(chapter) if chapter.isdigit() else 0,
+            value(row, "G"),
+            status,
+            value(row, "P") or None,
+            value(row, "Q") or None,
+        ))
+    respondent = Respondent.from_input_text(value(HEADER_ROW - 1, "A"))
+    return Assessment(path.name, respondent, tuple(rows), invalid)
+
+
+def read_assessments(paths, jobs=None):
+    """Read every workbook over a process pool, in the order of `paths`."""
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or len(paths) < 2:
+        return [read_assessment(path) for path in paths]
+    chunksize = max(1, len(paths) // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(read_assessment, paths, chunksize=chunksize))
+
+
+# ---------------------------------------------------------------------------
+# Trend output
+# ---------------------------------------------------------------------------
+
+# Trend row keys -> column headers
+TREND_FIELDS = {
+    "quarter": "四半期",
+    "assessments": "回答数",
+    "organization": "組織",
+    "date": "記入日",
+    "version": "版",
+    "chapter": "章",
+    "level": "準拠レベル",
+    "total": "項目数",
+    **{column: status or "未記入"
+       for status, column in STATUS_COLUMNS.items()},
+    "rate": "対応率",
+    "required_rate": "必須対応率",
+}
+RATE_FIELDS = ("rate", "required_rate")
+
+
+def trend_fields(rows):
+    return [key for key in TREND_FIELDS if rows and key in rows[0]]
+
+
+def write_trend_csv(rows, out):
+    writer = csv.writer(out)
+    fields = trend_fields(rows)
+    writer.writerow([TREND_FIELDS[key] for key in fields])
+    for record in rows:
+        writer.writerow([
+            "" if record[key] is None
+            else f"{record[key]:.4f}" if key in RATE_FIELDS
+            else record[key]
+            for key in fields
+        ])
+
+
+def print_trend(rows):
+    fields = trend_fields(rows)
+    table = [[TREND_FIELDS[key] for key in fields]]
+    for record in rows:
+        table.append([
+            "-" if record[key] is None
+            else f"{record[key]:.1%}" if key in RATE_FIELDS
+            else str(record[key])
+            for key in fields
+        ])
+    for line in table:
+        print("  ".join(line))
+
+
+def build_trend_workbook(rows, by):
+    """Build a workbook of the trend rows (write-only).
+
+    Sheets:
+        推移: the trend rows as in the CSV output
+        対応率: one row per assessment (or quarter) and one 対応率 column
+            per chapter or level, for charting
+    """
+    from openpyxl import Workbook
+    from openpyxl.styles import Font
+
+    from checklist import FONT_NAME
+    from checklist_excel import StyleRegistry, append_table, styled_cell
+
+    wb = Workbook(write_only=True)
+    styles = StyleRegistry(wb)
+    pct_style = styles.add(
+        "history-pct", font=Font(name=FONT_NAME, size=10),
+        number_format="0.0%",
+    )
+    fields = trend_fields(rows)
+
+    ws = wb.create_sheet("推移")
+    append_table(
+        ws,
+        styles,
+        [TREND_FIELDS[key] for key in fields],
+        [14 if key in ("organization", "quarter") else 10 for key in fields],
+        (
+            [
+                styled_cell(ws, record[key], pct_style) if key in RATE_FIELDS
+                else record[key]
+                for key in fields
+            ]
+            for record in rows
+        ),
+    )
+
+    keys = [key for key in fields
+            if key in ("quarter", "organization", "date", "version")]
+    groups = list(dict.fromkeys(record.get(by, "") for record in rows))
+    table = {}
+    for record in rows:
+        table.setdefault(tuple(record[key] for key in keys), {})[
+            record.get(by, "")] = record["rate"]
+    ws = wb.create_sheet("対応率")
+    append_table(
+        ws,
+        styles,
+        [TREND_FIELDS[key] for key in keys]
+        + [f"{g}章" if by == "chapter" else g or "全体" for g in groups],
+        [14] * len(keys) + [10] * len(groups),
+        (
+            [*key, *(styled_cell(ws, rates.get(g), pct_style) for g in groups)]
+            for key, rates in table.items()
+        ),
+    )
+    return wb
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Store returned checklists and report compliance trends."
+    )
+    db = argparse.ArgumentParser(add_help=False)
+    db.add_argument(
+        "--db",
+        type=Path,
+        default=DEFAULT_DB,
+        help=f"history database (default: {DEFAULT_DB})",
+    )
+    commands = parser.add_subparsers(dest="command", required=True,
+                                     metavar="COMMAND")
+
+    ingest = commands.add_parser(
+        "ingest", parents=[db], help="store the answers of returned workbooks"
+    )
+    ingest.add_argument(
+        "paths",
+        nargs="+",
+        metavar="PATH",
+        help="returned workbook (.xlsx) or a directory containing them",
+    )
+    ingest.add_argument(
+        "--version",
+        default=None,
+        help="checklist version of the workbooks "
+        "(default: the latest release in CHANGELOG.md)",
+    )
+    ingest.add_argument(
+        "--date",
+        default=None,
+        help="assessment date for workbooks whose 記入日 is blank",
+    )
+    ingest.add_argument(
+        "-j", "--jobs",
+        type=int,
+        default=None,
+        help="worker processes (default: number of CPUs)",
+    )
+
+    trend = commands.add_parser(
+        "trend", parents=[db], help="report 対応率 and 必須対応率 over time"
+    )
+    trend.add_argument(
+        "--by",
+        choices=TREND_GROUPS,
+        default="chapter",
+        help="one row per chapter, level or assessment "
+        "(default: %(default)s)",
+    )
+    scope = trend.add_mutually_exclusive_group()
+    scope.add_argument(
+        "--quarterly",
+        action="store_true",
+        help="sum all organizations per quarter",
+    )
+    scope.add_argument(
+        "--organization",
+        action="append",
+        default=[],
+        metavar="ORG",
+        help="only this organization (repeatable)",
+    )
+    trend.add_argument("--csv", metavar="FILE",
+                       help="write the trend as CSV ('-' for stdout)")
+    trend.add_argument("--json", metavar="FILE",
+                       help="write the trend as JSON ('-' for stdout)")
+    trend.add_argument("-o", "--output", type=Path, metavar="OUTPUT",
+                       help="write the trend workbook (.xlsx)")
+    args = parser.parse_args(argv)
+    if args.command == "ingest" and args.date and not iso_date(args.date):
+        ingest.error(f"--date: not a date: {args.date}")
+    return args
+
+
+def cmd_ingest(args):
+    from collect_excel import find_workbooks
+
+    paths = find_workbooks(args.paths)
+    if not paths:
+        print("Error: No workbooks found.", file=sys.stderr)
+        sys.exit(1)
+    version = args.version or checklist_version()
+    default_date = iso_date(args.date) if args.date else None
+
+    records = []
+    failed = []
+    for a in read_assessments(paths, args.jobs):
+        assessed_on = iso_date(a.respondent.date) or default_date
+        if a.error:
+            failed.append((a.name, a.error))
+        elif not a.respondent.organization:
+            failed.append((a.name, "組織名 is blank"))
+        elif assessed_on is None:
+            failed.append((a.name, "記入日 is blank (use --date)"))
+        else:
+            records.append(Record(a.respondent.organization, assessed_on,
+                                  version, a.rows, a.name))
+            if a.invalid:
+                print(f"Warning: {a.name}: {a.invalid} unknown チェック結果 "
+                      "stored as 未記入", file=sys.stderr)
+
+    start = time.perf_counter()
+    with HistoryStore(args.db) as store:
+        answers = store.add(records)
+        total = store.counts()
+    print(f"Stored {len(records)} of {len(paths)} workbooks "
+          f"({answers} answers, version {version or '-'}) in "
+          f"{(time.perf_counter() - start) * 1000:.0f}ms.")
+    print(f"{args.db}: {total[0]} assessments of {total[2]} organizations, "
+          f"{total[1]} answers")
+    for name, error in failed:
+        print(f"  {name}: {error}", file=sys.stderr)
+    if not records:
+        sys.exit(1)
+
+
+def cmd_trend(args):
+    if not args.db.exists():
+        print(f"Error: {args.db} not found (run ingest first).",
+              file=sys.stderr)
+        sys.exit(1)
+    start = time.perf_counter()
+    with HistoryStore(args.db) as store:
+        rows = store.trend(args.by, args.organization, args.quarterly)
+    elapsed = time.perf_counter() - start
+    quiet = "-" in (args.csv, args.json)
+    log = sys.stderr if quiet else sys.stdout
+
+    if not (args.csv or args.json or args.output):
+        print_trend(rows)
+    if args.csv == "-":
+        write_trend_csv(rows, sys.stdout)
+    elif args.csv:
+        with open(args.csv, "w", encoding="utf-8-sig", newline="") as f:
+            write_trend_csv(rows, f)
+        print(f"Generated: {args.csv}", file=log)
+    if args.json:
+        text = json.dumps(rows, ensure_ascii=False, indent=2) + "\n"
+        if args.json == "-":
+            sys.stdout.write(text)
+        else:
+            Path(args.json).write_text(text, encoding="utf-8")
+            print(f"Generated: {args.json}", file=log)
+    if args.output:
+        build_trend_workbook(rows, args.by).save(args.output)
+        print(f"Generated: {args.output}", file=log)
+    print(f"{len(rows)} rows in {elapsed * 1000:.1f}ms", file=log)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        {"ingest": cmd_ingest, "trend": cmd_trend}[args.command](args)
+    except (sqlite3.DatabaseError, ValueError) as e:
+        print(f"Error: {args.db}: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
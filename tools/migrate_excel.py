@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+生成AI利用ガイドライン チェックリスト — 回答移行スクリプト
+
+旧版のチェックリストに記入された回答（A列・P列・Q列）と記入欄（2行目）を、
+現在の src/ch*.md から生成する新版のチェックリストに移し替える。
+旧版のワークブックは tools/collect_excel.py と同じくワークシートの XML を
+ストリーミングで読み、回答を項目番号とチェック項目の文面（正規化したもの）で対応付ける。
+新版のブックはテンプレート（白紙のブック）の該当セルを書き換えて出力し、
+複数ファイルはプロセスプールで並列に処理する。
+
+Usage:
+    python tools/migrate_excel.py PATH [PATH ...] -o DIR [--report FILE]
+                                  [-j N]
+
+    PATH には記入済みのワークブック（.xlsx）またはそれを含むディレクトリを指定する。
+
+Output:
+    DIR/<元のファイル名>（新版のチェックリスト）
+    --report: 移行先のない回答（削除された項目の回答）の一覧（CSV）
+
+仕様書: tools/docs/excel-spec.md
+"""
+
+import argparse
+import csv
+import os
+import re
+import sys
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+from openpyxl.utils.exceptions import IllegalCharacterError
+
+from checklist import (
+    CHECK_STATUSES,
+    DATA_START_ROW,
+    HEADER_ROW,
+    NO_ANSWER,
+    Answer,
+    ParseCache,
+    Respondent,
+    iter_items,
+)
+from checklist_excel import load_template
+from collect_excel import READ_ERRORS, find_workbooks, read_checklist
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+
+# チェック結果, 項目番号, チェック項目, 備考, 対応状況メモ (row 2 column A: 記入欄)
+READ_COLUMNS = frozenset({"A", "B", "H", "P", "Q"})
+
+REPORT_FIELDS = ("ファイル", "項目番号", "チェック項目", "チェック結果", "備考",
+                 "対応状況メモ")
+
+# Everything but letters and digits is ignored when comparing item texts.
+RE_NOISE = re.compile(r"[\W_]+")
+
+
+# ---------------------------------------------------------------------------
+# Matching answers
+# ---------------------------------------------------------------------------
+
+
+@dataclass(frozen=True, slots=True)
+class Migration:
+    """The result of migrating one workbook."""
+
+    source: Path
+    output: Path
+    carried: int = 0      # answers written to the new workbook
+    renumbered: int = 0   # ... of which matched an item under a new number
+    orphans: tuple = ()   # (number, text, Answer) without a new item
+    invalid: int = 0      # rows whose チェック結果 is not a known status
+    error: str = ""
+
+
+def fingerprint(text):
+    """Normalise item text so that width, case and punctuation edits match."""
+    return RE_NOISE.sub("", unicodedata.normalize("NFKC", text).casefold())
+
+
+def read_answers(cells):
+    """Return ([(number, text, Answer)], invalid) of the answered rows."""
+    rows = []
+    invalid = 0
+    for row in sorted({row for row, _column in cells if row >= DATA_START_ROW}):
+        number = cells.get((row, "B"), "")
+        if not number:
+            continue
+        status = cells.get((row, "A"), "")
+        if status and status not in CHECK_STATUSES:
+            invalid += 1
+            status = ""
+        answer = Answer(status, cells.get((row, "P"), ""),
+                        cells.get((row, "Q"), ""))
+        if answer != NO_ANSWER:
+            rows.append((number, cells.get((row, "H"), ""), answer))
+    return rows, invalid
+
+
+def match_answers(targets, rows):
+    """Map answered old rows onto the new items.
+
+    `targets` lists (number, fingerprint) of the new items. A row first
+    goes to the item with the same text (so renumbered items keep their
+    answers, preferring the same number among equal texts), then to the
+    item with the same number (so reworded items keep theirs). Each row
+    and each item is used at most once.
+
+    Returns (answers by new item number, renumbered count, orphan rows).
+    """
+    by_text = {}
+    by_number = {}
+    for i, (number, text, _answer) in enumerate(rows):
+        by_text.setdefault(fingerprint(text), []).append(i)
+        by_number.setdefault(number, i)
+
+    used = set()
+    answers = {}
+    renumbered = 0
+    unmatched = []
+    for number, key in targets:
+        candidates = [i for i in by_text.get(key, ()) if i not in used]
+        if not candidates:
+            unmatched.append(number)
+            continue
+        same = by_number.get(number)
+        i = same if same in candidates else candidates[0]
+        used.add(i)
+        answers[number] = rows[i][2]
+        renumbered += rows[i][0] != number
+
+    for number in unmatched:
+        i = by_number.get(number)
+        if i is not None and i not in used:
+            used.add(i)
+            answers[number] = rows[i][2]
+
+    orphans = tuple(row for i, row in enumerate(rows) if i not in used)
+    return answers, renumbered, orphans
+
+
+# ---------------------------------------------------------------------------
+# Migrating workbooks
+# ---------------------------------------------------------------------------
+
+# Per-process state of migration workers, set once by _init_worker so that
+# the template is not pickled again for every workbook.
+_state = {}
+
+
+def _init_worker(template, targets):
+    _state.update(template=template, targets=targets)
+
+
+def migrate_workbook(job):
+    """Write the new-version workbook for one old workbook.
+
+    Unreadable files are reported through Migration.error instead of
+    raising, so that one broken file does not abort a whole batch.
+    """
+    source, output = job
+    try:
+        cells = read_checklist(source, READ_COLUMNS)
+    except READ_ERRORS as e:
+        return Migration(source, output, error=str(e))
+
+    respondent = Respondent.from_input_text(cells.get((HEADER_ROW - 1, "A"), ""))
+    rows, invalid = read_answers(cells)
+    answers, renumbered, orphans = match_answers(_state["targets"], rows)
+    try:
+        _state["template"].personalize(output, answers, respondent)
+    except (OSError, IllegalCharacterError) as e:
+        return Migration(source, output, error=str(e))
+    return Migration(source, output, len(answers), renumbered, orphans,
+                     invalid)
+
+
+def migrate_all(jobs, template, items, workers=None):
+    """Migrate every (source, output) job; results are in job order."""
+    targets = [(item.number, fingerprint(item.text)) for item in items]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(jobs) < 2:
+        _init_worker(template, targets)
+        return [migrate_workbook(job) for job in jobs]
+
+    # Large chunks keep the per-task IPC overhead small relative to the
+    # few milliseconds each workbook takes.
+    chunksize = max(1, len(jobs) // (workers * 4))
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(template, targets),
+    ) as pool:
+        return list(pool.map(migrate_workbook, jobs, chunksize=chunksize))
+
+
+def write_report(path, results):
+    """Write the orphaned answers as CSV (UTF-8 with BOM, for Excel)."""
+    with path.open("w", encoding="utf-8-sig", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(REPORT_FIELDS)
+        for result in results:
+            for number, text, answer in result.orphans:
+                writer.writerow([result.source.name, number, text,
+                                 answer.status, answer.note, answer.memo])
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Carry answers of filled-in workbooks over to the "
+        "current checklist release."
+    )
+    parser.add_argument(
+        "paths",
+        nargs="+",
+        metavar="PATH",
+        help="filled-in workbook (.xlsx) or a directory containing them",
+    )
+    parser.add_argument(
+        "-o", "--output-dir",
+        type=Path,
+        required=True,
+        help="directory for the migrated workbooks (same file names)",
+    )
+    parser.add_argument(
+        "--report",
+        type=Path,
+        metavar="FILE",
+        help="write the answers that have no item in the new release (CSV)",
+    )
+    parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        default=None,
+        help="worker processes (default: number of CPUs)",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    paths = find_workbooks(args.paths)
+    if not paths:
+        print("Error: No workbooks found.", file=sys.stderr)
+        sys.exit(1)
+
+    jobs = []
+    outputs = set()
+    for path in paths:
+        output = args.output_dir / path.name
+        if output.resolve() == path.resolve():
+            print(f"Error: {path} would be overwritten; choose another "
+                  "--output-dir.", file=sys.stderr)
+            sys.exit(1)
+        if output in outputs:
+            print(f"Error: duplicate file name {path.name}", file=sys.stderr)
+            sys.exit(1)
+        outputs.add(output)
+        jobs.append((path, output))
+
+    cache = ParseCache()
+    chapters = {}
+    items = list(iter_items(cache, chapters))
+    if not items:
+        print("Error: No items found. Check source files.", file=sys.stderr)
+        sys.exit(1)
+    template = load_template(items, chapters, cache=cache)
+
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+    start = time.perf_counter()
+    results = migrate_all(jobs, template, items, args.jobs)
+    elapsed = time.perf_counter() - start
+
+    failed = [r for r in results if r.error]
+    done = len(results) - len(failed)
+    carried = sum(r.carried for r in results)
+    renumbered = sum(r.renumbered for r in results)
+    orphans = sum(len(r.orphans) for r in results)
+    print(
+        f"Migrated {done} of {len(results)} workbooks to {args.output_dir} "
+        f"in {elapsed:.2f}s ({done / elapsed if elapsed else 0:.1f} "
+        "workbooks/s)"
+    )
+    print(f"Answers: {carried} carried over ({renumbered} renumbered), "
+          f"{orphans} orphaned.")
+    for r in results:
+        if r.orphans or r.invalid:
+            print(f"  {r.source.name}: {len(r.orphans)} orphaned, "
+                  f"{r.invalid} invalid", file=sys.stderr)
+    for r in failed:
+        print(f"  {r.source.name}: {r.error}", file=sys.stderr)
+
+    if args.report:
+        write_report(args.report, results)
+        print(f"Generated: {args.report}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,464 @@
+#!/usr/bin/env python3
+"""
+生成AI利用ガイドライン チェックリスト — ワークブック配信サービス
+
+チェック項目をメモリに保持したまま、HTTP のリクエストごとに記入欄を埋めたブックや
+準拠レベル・章・参照タグで絞り込んだブックを生成して返す（asyncio、標準ライブラリのみ）。
+生成済みのブックはパラメータと章ファイルのハッシュをキーに LRU キャッシュに保持し、
+ブックの構築はプロセスプールで行う。章ファイルが変更されると変更された章だけを再パースする。
+
+Usage:
+    python tools/serve_excel.py [--host HOST] [--port PORT] [-j N]
+                                [--cache-entries N] [--cache-mb MB]
+
+Endpoints:
+    GET /checklist.xlsx   ワークブック。クエリ: level, chapter, tag（カンマ区切り・複数指定可）,
+                          organization, person, date（記入欄）, summary（countifs / static）
+    GET /items.json       絞り込んだ項目（parse --json と同じ形式）。クエリ: level, chapter, tag
+    GET /stats            項目数・章ファイルのハッシュ・キャッシュの統計
+
+    例: /checklist.xlsx?level=Required&chapter=1,3&organization=総務部
+
+仕様書: tools/docs/excel-spec.md
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import sys
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from urllib.parse import parse_qs, quote, urlsplit
+
+from checklist import (
+    LEVELS,
+    NO_RESPONDENT,
+    OUTPUT_FILE,
+    REFERENCE_TAGS,
+    SUMMARY_ENGINES,
+    ChapterWatcher,
+    ParseCache,
+    Respondent,
+    item_record,
+    output_name,
+    select_items,
+)
+
+XLSX_TYPE = (
+    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+)
+MAX_HEADERS = 100
+MAX_DRAINED_BODY = 1 << 20   # request bodies read and discarded, in bytes
+REASONS = {
+    200: "OK", 400: "Bad Request", 404: "Not Found",
+    405: "Method Not Allowed", 500: "Internal Server Error",
+}
+
+
+# ---------------------------------------------------------------------------
+# Requests
+# ---------------------------------------------------------------------------
+
+
+def _split(query, name):
+    """Values of a repeatable, comma-separated query parameter."""
+    return [
+        value.strip()
+        for raw in query.get(name, ())
+        for value in raw.split(",")
+        if value.strip()
+    ]
+
+
+@dataclass(frozen=True, slots=True)
+class RenderRequest:
+    """Normalised parameters of a rendered workbook (the LRU key)."""
+
+    levels: tuple[str, ...] = ()
+    chapters: tuple[int, ...] = ()
+    tags: tuple[str, ...] = ()
+    respondent: Respondent = NO_RESPONDENT
+    summary: str = "countifs"
+
+    @classmethod
+    def from_query(cls, query):
+        """Build from a parse_qs() dict; raises ValueError on bad values."""
+        levels = set(_split(query, "level"))
+        if unknown := levels - set(LEVELS):
+            raise ValueError(f"unknown level: {', '.join(sorted(unknown))}")
+        tags = set(_split(query, "tag"))
+        if unknown := tags - set(REFERENCE_TAGS):
+            raise ValueError(f"unknown tag: {', '.join(sorted(unknown))}")
+        try:
+            chapters = {int(value) for value in _split(query, "chapter")}
+        except ValueError:
+            raise ValueError("chapter must be a number") from None
+        summary = query.get("summary", ["countifs"])[-1]
+        if summary not in SUMMARY_ENGINES:
+            raise ValueError(f"unknown summary engine: {summary}")
+
+        def field(name):
+            return query.get(name, [""])[-1].strip()
+
+        return cls(
+            tuple(level for level in LEVELS if level in levels),
+            tuple(sorted(chapters)),
+            tuple(tag for tag in REFERENCE_TAGS if tag in tags),
+            Respondent(field("organization"), field("person"), field("date")),
+            summary,
+        )
+
+    def select(self, items):
+        """Return the items passing the level, chapter and tag filters."""
+        return select_items(items, self.levels, self.chapters, self.tags)
+
+    def filename(self):
+        if self.respondent.organization:
+            return output_name(self.respondent.organization)
+        return OUTPUT_FILE.name
+
+
+def render_workbook(items, chapters, summary, respondent):
+    """Build and serialise a workbook; runs in the executor's processes."""
+    from checklist_excel import build_workbook, workbook_bytes
+
+    wb, _, _ = build_workbook(
+        items, chapters, summary=summary, respondent=respondent
+    )
+    return workbook_bytes(wb)
+
+
+# ---------------------------------------------------------------------------
+# Service
+# ---------------------------------------------------------------------------
+
+
+class RenderCache:
+    """LRU cache of rendered workbooks, bounded by entries and bytes."""
+
+    def __init__(self, max_entries=64, max_bytes=64 << 20):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        data = self.entries.get(key)
+        if data is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return data
+
+    def put(self, key, data):
+        if len(data) > self.max_bytes or self.max_entries <= 0:
+            return
+        old = self.entries.pop(key, None)
+        if old is not None:
+            self.size -= len(old)
+        self.entries[key] = data
+        self.size += len(data)
+        while (len(self.entries) > self.max_entries
+               or self.size > self.max_bytes):
+            _key, evicted = self.entries.popitem(last=False)
+            self.size -= len(evicted)
+
+    def stats(self):
+        return {
+            "entries": len(self.entries),
+            "bytes": self.size,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+class ChecklistService:
+    """Parsed items kept in memory, rendered on demand through a cache.
+
+    Before each request the chapter files are polled (ChapterWatcher) and
+    changed chapters re-parsed; the SHA-256 of the files is part of every
+    cache key, so stale workbooks are never served. Concurrent requests
+    for the same key share one render.
+
+    Polling and re-parsing read files, so refresh() runs them in a worker
+    thread, one refresh at a time, and swaps in the items, chapters and
+    digest together on the event loop.
+    """
+
+    def __init__(self, executor=None, cache=None, render_cache=None,
+                 paths=None):
+        self.executor = executor
+        self.watcher = ChapterWatcher(paths, cache)
+        self.renders = render_cache or RenderCache()
+        self._pending = {}   # key -> asyncio.Future of a running render
+        self._refreshing = asyncio.Lock()
+        self.items, self.chapters, self.digest = self._load()
+
+    def _load(self):
+        """Return (items, chapters, SHA-256 of the chapter files)."""
+        items, chapters = self.watcher.parsed()
+        h = hashlib.sha256()
+        for path in self.watcher.paths:
+            h.update(path.name.encode("utf-8") + b"\0")
+            if path.exists():
+                h.update(path.read_bytes())
+        return items, chapters, h.hexdigest()
+
+    def _refresh(self):
+        """Re-parse changed chapters; returns _load() or None if unchanged."""
+        changed = self.watcher.changed()
+        if not changed:
+            return None
+        self.watcher.refresh(changed)
+        return self._load()
+
+    async def refresh(self):
+        async with self._refreshing:
+            loop = asyncio.get_running_loop()
+            loaded = await loop.run_in_executor(None, self._refresh)
+        if loaded is not None:
+            self.items, self.chapters, self.digest = loaded
+
+    async def select(self, request):
+        await self.refresh()
+        return request.select(self.items)
+
+    async def render(self, request):
+        """Return (workbook bytes or None if no item matches, cache hit)."""
+        items = await self.select(request)
+        if not items:
+            return None, False
+        key = (self.digest, request)
+        data = self.renders.get(key)
+        if data is not None:
+            return data, True
+        pending = self._pending.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending), True
+
+        chapters = {
+            num: title for num, title in self.chapters.items()
+            if any(item.chapter_num == num for item in items)
+        }
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(
+            self.executor, render_workbook, items, chapters,
+            request.summary, request.respondent,
+        )
+        self._pending[key] = future
+        try:
+            data = await future
+        finally:
+            del self._pending[key]
+        self.renders.put(key, data)
+        return data, False
+
+    def stats(self):
+        return {
+            "items": len(self.items),
+            "chapters": len(self.chapters),
+            "source_sha256": self.digest,
+            "cache": self.renders.stats(),
+        }
+
+
+# ---------------------------------------------------------------------------
+# HTTP
+# ---------------------------------------------------------------------------
+
+
+def _response(status, body=b"", content_type="text/plain; charset=utf-8",
+              headers=(), keep_alive=True, head=False):
+    lines = [
+        f"HTTP/1.1 {status} {REASONS[status]}",
+        f"Content-Type: {content_type}",
+        f"Content-Length: {len(body)}",
+        f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        *headers,
+    ]
+    head_bytes = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+    return head_bytes if head else head_bytes + body
+
+
+def _json(data):
+    return json.dumps(data, ensure_ascii=False).encode("utf-8")
+
+
+async def handle_request(service, method, target):
+    """Return (status, body, content type, extra headers)."""
+    if method not in ("GET", "HEAD"):
+        return 405, b"GET or HEAD only\n", None, ("Allow: GET, HEAD",)
+    url = urlsplit(target)
+    query = parse_qs(url.query)
+    try:
+        request = RenderRequest.from_query(query)
+    except ValueError as exc:
+        return 400, f"{exc}\n".encode("utf-8"), None, ()
+
+    if url.path == "/checklist.xlsx":
+        start = time.perf_counter()
+        data, hit = await service.render(request)
+        if data is None:
+            return 404, b"no items match\n", None, ()
+        return 200, data, XLSX_TYPE, (
+            "Content-Disposition: attachment; "
+            f"filename*=UTF-8''{quote(request.filename())}",
+            f"X-Cache: {'hit' if hit else 'miss'}",
+            f"X-Render-Time: {time.perf_counter() - start:.4f}",
+        )
+    if url.path == "/items.json":
+        records = [
+            item_record(item) for item in await service.select(request)
+        ]
+        return 200, _json(records), "application/json", ()
+    if url.path == "/stats":
+        await service.refresh()
+        return 200, _json(service.stats()), "application/json", ()
+    return 404, b"not found\n", None, ()
+
+
+async def _serve_connection(service, reader, writer):
+    """Serve HTTP/1.x requests on one connection (keep-alive aware)."""
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            try:
+                method, target, version = line.decode("latin-1").split()
+            except ValueError:
+                writer.write(_response(400, b"bad request line\n",
+                                       keep_alive=False))
+                break
+            headers = {}
+            for _ in range(MAX_HEADERS):
+                header = await reader.readline()
+                if header in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = header.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+            connection = headers.get("connection", "").lower()
+            keep_alive = (
+                connection != "close"
+                if version == "HTTP/1.1" else connection == "keep-alive"
+            )
+            # No endpoint reads a body. Discard a small one so the next
+            # request starts where expected; otherwise close afterwards.
+            try:
+                length = int(headers.get("content-length", "0"))
+            except ValueError:
+                length = -1
+            if "transfer-encoding" in headers or not (
+                0 <= length <= MAX_DRAINED_BODY
+            ):
+                keep_alive = False
+            elif length:
+                await reader.readexactly(length)
+
+            try:
+                status, body, content_type, extra = await handle_request(
+                    service, method, target
+                )
+            except Exception as exc:  # keep serving other requests
+                print(f"Error: {method} {target}: {exc}", file=sys.stderr)
+                status, body, content_type, extra = (
+                    500, b"internal error\n", None, ()
+                )
+            writer.write(_response(
+                status, body,
+                content_type or "text/plain; charset=utf-8",
+                extra, keep_alive, head=method == "HEAD",
+            ))
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    except asyncio.CancelledError:
+        # Shutdown with the connection idle; nothing awaits this task, and
+        # Python 3.11 logs cancelled connection handlers as errors.
+        pass
+    finally:
+        writer.close()
+
+
+async def start_server(service, host="127.0.0.1", port=8000):
+    """Start serving `service`; returns the asyncio.Server."""
+    return await asyncio.start_server(
+        lambda reader, writer: _serve_connection(service, reader, writer),
+        host, port,
+    )
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Serve personalized or filtered checklist workbooks "
+        "over HTTP."
+    )
+    parser.add_argument("--host", default="127.0.0.1",
+                        help="address to listen on (default: %(default)s)")
+    parser.add_argument("--port", type=int, default=8000,
+                        help="port to listen on (default: %(default)s)")
+    parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        default=None,
+        help="worker processes building workbooks (default: number of CPUs)",
+    )
+    parser.add_argument(
+        "--cache-entries",
+        type=int,
+        default=64,
+        help="rendered workbooks kept in memory (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--cache-mb",
+        type=int,
+        default=64,
+        help="memory limit of the rendered workbooks (default: %(default)s)",
+    )
+    return parser.parse_args(argv)
+
+
+async def serve(args):
+    with ProcessPoolExecutor(args.jobs) as executor:
+        # Start the workers before accepting connections: a worker forked
+        # later would inherit the open client sockets and keep a closed
+        # connection from reaching its client.
+        executor.submit(int).result()
+        service = ChecklistService(
+            executor,
+            ParseCache(),
+            RenderCache(args.cache_entries, args.cache_mb << 20),
+        )
+        server = await start_server(service, args.host, args.port)
+        print(f"Parsed {len(service.items)} checklist items from "
+              f"{len(service.chapters)} chapters.")
+        for sock in server.sockets:
+            host, port = sock.getsockname()[:2]
+            print(f"Serving on http://{host}:{port}/checklist.xlsx")
+        async with server:
+            await server.serve_forever()
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""checklist_export: item rows and the sink pipeline."""
+
+import csv
+import dataclasses
+import io
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stderr
+from pathlib import Path
+from unittest import mock
+
+from checklist import REFERENCE_TAGS, scan_chapter
+from checklist_export import (
+    EXPORT_BATCH,
+    EXPORT_FIELDS,
+    CsvSink,
+    JsonlSink,
+    OdsSink,
+    export_items,
+    item_row,
+)
+
+CHAPTER = """\
+# 1. ガバナンス体制 (GOVERN)
+
+## 1.1 組織体制・責任
+
+- 1.1.A. [Required] 責任者が定められている [NIST: GOVERN 2.3] [METI]
+  - **説明**: 判断が遅れる。
+  - **定義例**: 「理事長を責任者とする」
+- 1.1.B. [Option] 規程が <周知> & 更新されている
+"""
+
+
+def sample_items(copies=1):
+    """The CHAPTER items, repeated under new numbers `copies` times."""
+    items = list(scan_chapter(CHAPTER.splitlines(True), {}))
+    return [
+        dataclasses.replace(item, number=f"{item.number}{n or ''}")
+        for n in range(copies) for item in items
+    ]
+
+
+class FailingSink(JsonlSink):
+    """Fails on the `fail_at`-th item; optionally fails to discard too."""
+
+    def __init__(self, path, fail_at, discard_error=None):
+        super().__init__(path)
+        self.fail_at = fail_at
+        self.discard_error = discard_error
+        self.written = 0
+
+    def write(self, item):
+        self.written += 1
+        if self.written == self.fail_at:
+            raise ValueError("sink failed")
+        super().write(item)
+
+    def discard(self):
+        super().discard()
+        if self.discard_error is not None:
+            raise self.discard_error
+
+
+class ItemRowTest(unittest.TestCase):
+    def test_columns(self):
+        first, second = sample_items()
+        row = item_row(first)
+        self.assertEqual(len(row), len(EXPORT_FIELDS))
+        self.assertEqual(row[:7], ["1.1.A", 1, "ガバナンス体制 (GOVERN)", "1.1",
+                                   "組織体制・責任", "Required",
+                                   "責任者が定められている"])
+        marks = dict(zip(REFERENCE_TAGS, row[7:-1]))
+        self.assertEqual(marks["NIST"], "○")
+        self.assertEqual(marks["METI"], "○")
+        self.assertEqual(sum(1 for mark in marks.values() if mark), 2)
+        self.assertEqual(row[-1], "NIST: GOVERN 2.3")
+        self.assertEqual(item_row(second)[-1], "")
+
+
+class ExportItemsTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = Path(tmp.name)
+
+    def export(self, name, items, threads):
+        paths = [self.dir / f"{name}.{ext}" for ext in ("jsonl", "csv", "ods")]
+        sinks = [JsonlSink(paths[0]), CsvSink(paths[1]), OdsSink(paths[2])]
+        self.assertEqual(export_items(items, sinks, threads=threads),
+                         len(items))
+        return [path.read_bytes() for path in paths]
+
+    def test_outputs(self):
+        items = sample_items()
+        jsonl, csv_data, _ods = self.export("items", items, threads=False)
+        records = [json.loads(line) for line in jsonl.decode().splitlines()]
+        self.assertEqual([r["number"] for r in records], ["1.1.A", "1.1.B"])
+        self.assertEqual(records[0]["example"], "「理事長を責任者とする」")
+        rows = list(csv.reader(io.StringIO(csv_data.decode("utf-8-sig"))))
+        self.assertEqual(rows[0], list(EXPORT_FIELDS))
+        self.assertEqual(rows[2][6], "規程が <周知> & 更新されている")
+
+    def test_threads_write_the_same_files(self):
+        items = sample_items(copies=EXPORT_BATCH)   # several batches
+        with mock.patch.dict(os.environ, {"SOURCE_DATE_EPOCH": "1700000000"}):
+            sequential = self.export("sequential", items, threads=False)
+            threaded = self.export("threaded", items, threads=True)
+        self.assertEqual(sequential, threaded)
+
+    def test_failure_discards_the_unfinished_sinks(self):
+        items = sample_items(copies=EXPORT_BATCH)
+        for threads in (False, True):
+            with self.subTest(threads=threads):
+                sinks = [FailingSink(self.dir / "bad.jsonl", fail_at=100),
+                         CsvSink(self.dir / "good.csv")]
+                with self.assertRaisesRegex(ValueError, "sink failed"):
+                    export_items(items, sinks, threads=threads)
+                # Without threads no sink completes; with threads the
+                # CSV sink may have finished before the error was seen.
+                names = {path.name for path in self.dir.iterdir()}
+                self.assertLessEqual(names, set() if not threads
+                                     else {"good.csv"})
+
+    def test_failed_discard_is_reported(self):
+        sinks = [FailingSink(self.dir / "bad.jsonl", fail_at=1,
+                             discard_error=OSError("busy"))]
+        stderr = io.StringIO()
+        with redirect_stderr(stderr), \
+                self.assertRaisesRegex(ValueError, "sink failed"):
+            export_items(sample_items(), sinks)
+        self.assertIn("bad.jsonl", stderr.getvalue())
+        self.assertIn("busy", stderr.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
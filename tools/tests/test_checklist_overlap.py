@@ -0,0 +1,124 @@
+"""checklist_overlap: shingles, Jaccard, LSH banding and candidates."""
+
+import itertools
+import random
+import unittest
+
+from checklist import ChecklistItem
+from checklist_overlap import (
+    MIN_RECALL,
+    NUM_PERM,
+    SignatureCache,
+    candidate_probability,
+    find_overlaps,
+    jaccard,
+    lsh_bands,
+    lsh_candidates,
+    minhash,
+    shingles,
+)
+
+
+class ShinglesTest(unittest.TestCase):
+    def test_folding(self):
+        self.assertEqual(shingles("ＡＢ、ｃｄ"), {"abc", "bcd"})
+        self.assertEqual(shingles("ab"), {"ab"})
+        self.assertEqual(shingles("。、"), set())
+
+
+class JaccardTest(unittest.TestCase):
+    def test_values(self):
+        self.assertEqual(jaccard({"a", "b"}, {"b", "c"}), 1 / 3)
+        self.assertEqual(jaccard({"a"}, {"a"}), 1.0)
+        self.assertEqual(jaccard({"a"}, {"b"}), 0.0)
+        self.assertEqual(jaccard(set(), set()), 1.0)
+        self.assertEqual(jaccard(set(), {"a"}), 0.0)
+
+
+class LshBandsTest(unittest.TestCase):
+    def test_bands_divide_the_signature(self):
+        for threshold in (0.05, 0.2, 0.3, 0.5, 0.8, 0.95):
+            with self.subTest(threshold=threshold):
+                self.assertEqual(NUM_PERM % lsh_bands(threshold), 0)
+
+    def test_recall_at_the_threshold(self):
+        for threshold in (0.05, 0.2, 0.3, 0.5, 0.8, 0.95):
+            with self.subTest(threshold=threshold):
+                bands = lsh_bands(threshold)
+                self.assertGreaterEqual(
+                    candidate_probability(threshold, bands), MIN_RECALL
+                )
+                # The next wider banding would fall short.
+                wider = [b for b in range(1, bands) if NUM_PERM % b == 0]
+                if wider:
+                    self.assertLess(
+                        candidate_probability(threshold, wider[-1]),
+                        MIN_RECALL,
+                    )
+
+    def test_known_bandings(self):
+        self.assertEqual(lsh_bands(0.5), 40)
+        self.assertEqual(lsh_bands(0.3), 60)
+        self.assertEqual(lsh_bands(0.2), 120)
+
+    def test_unreachable_threshold(self):
+        self.assertEqual(lsh_bands(0.01), NUM_PERM)
+        self.assertLess(candidate_probability(0.01, NUM_PERM), MIN_RECALL)
+
+
+class LshCandidatesTest(unittest.TestCase):
+    def test_shared_band(self):
+        first = list(range(NUM_PERM))
+        second = [-1] * NUM_PERM
+        second[3:6] = first[3:6]            # the second band of 3 values
+        third = [-2] * NUM_PERM
+        self.assertEqual(lsh_candidates([first, second, third], 40),
+                         {(0, 1)})
+        # With bands of 4 values no band of the second matches entirely.
+        self.assertEqual(lsh_candidates([first, second, third], 30), set())
+
+    def test_identical_signatures(self):
+        signature = list(range(NUM_PERM))
+        self.assertEqual(lsh_candidates([signature] * 3, 40),
+                         {(0, 1), (0, 2), (1, 2)})
+
+
+class FindOverlapsTest(unittest.TestCase):
+    def test_matches_all_pairs_comparison(self):
+        rng = random.Random(1)
+        words = ["規程", "体制", "記録", "周知", "教育", "監査", "評価", "更新"]
+        texts = ["".join(rng.choices(words, k=12)) for _ in range(30)]
+        # Near copies of the first three texts, edited to varying degrees.
+        texts += [texts[0] + "必要", texts[1][:-4], texts[2][8:] + "監査"]
+        items = [ChecklistItem(f"1.1.{n}", None, None, "Required", text, 0)
+                 for n, text in enumerate(texts)]
+        sets = [shingles(text) for text in texts]
+        for threshold in (0.3, 0.5, 0.8):
+            with self.subTest(threshold=threshold):
+                expected = {
+                    (items[i].number, items[j].number)
+                    for i, j in itertools.combinations(range(len(items)), 2)
+                    if jaccard(sets[i], sets[j]) >= threshold
+                }
+                found = find_overlaps(items, threshold=threshold,
+                                      bodies=False)
+                self.assertEqual(
+                    {(o.first.number, o.second.number) for o in found},
+                    expected,
+                )
+                self.assertEqual(
+                    [o.similarity for o in found],
+                    sorted((o.similarity for o in found), reverse=True),
+                )
+
+    def test_signature_cache_reuses_unchanged_items(self):
+        cache = SignatureCache()
+        a = shingles("規程が定められている")
+        self.assertEqual(cache.signature("1.1.A", a), minhash(a))
+        cache.signature("1.1.A", a)
+        cache.signature("1.1.A", shingles("規程が周知されている"))
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+
+
+if __name__ == "__main__":
+    unittest.main()
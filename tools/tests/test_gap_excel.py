@@ -0,0 +1,124 @@
+"""gap_excel: rates, percentiles and priorities of the gap analysis."""
+
+import unittest
+
+from checklist import TAG_BITS, ChecklistItem
+from gap_excel import (
+    RATE_COLUMNS,
+    STATUS_CODES,
+    STATUSES,
+    AnswerMatrix,
+    _priority_order,
+    analyze,
+    np,
+    percentile_ranks,
+)
+
+
+def item(number, level, *tags):
+    mask = 0
+    for tag in tags:
+        mask |= TAG_BITS[tag]
+    return ChecklistItem(number, None, None, level, number, mask)
+
+
+ITEMS = (
+    item("1.1.A", "Required", "NIST", "METI"),   # weight 3
+    item("1.1.B", "Required"),                   # weight 1
+    item("1.1.C", "Recommended", "NIST"),        # weight 2
+    item("1.1.D", "Option"),                     # weight 1
+)
+
+
+def matrix(*answers):
+    """An AnswerMatrix of organizations X, Y, ... answering ITEMS."""
+    names = tuple("XYZ"[:len(answers)])
+    status = np.array([[STATUS_CODES[s] for s in row] for row in answers],
+                      dtype=np.uint8)
+    return AnswerMatrix(ITEMS, names, ("2026-04-01",) * len(names), status)
+
+
+@unittest.skipIf(np is None, "NumPy is not installed")
+class AnalyzeTest(unittest.TestCase):
+    def setUp(self):
+        self.analysis = analyze(matrix(
+            ["未対応", "一部対応", "未対応", "対応済"],   # X
+            ["対応済", "対応済", "該当なし", ""],         # Y
+        ))
+
+    def rates(self, o):
+        return dict(zip(RATE_COLUMNS, self.analysis.rates[o].tolist()))
+
+    def test_scores(self):
+        np.testing.assert_allclose(self.analysis.scores,
+                                   [[3.0, 0.5, 2.0, 0.0], [0.0] * 4])
+        np.testing.assert_allclose(self.analysis.gap_scores, [5.5, 0.0])
+
+    def test_rates(self):
+        x, y = self.rates(0), self.rates(1)
+        self.assertEqual((x["overall"], x["required"]), (0.25, 0.0))
+        self.assertEqual((y["overall"], y["required"]), (0.5, 1.0))
+        self.assertEqual((x["NIST"], y["NIST"]), (0.0, 0.5))
+        self.assertEqual((x["METI"], y["METI"]), (0.0, 1.0))
+        # No item is tagged JDLA: the rate is undefined, not 0.
+        self.assertTrue(np.isnan(x["JDLA"]) and np.isnan(y["JDLA"]))
+
+    def test_percentiles(self):
+        overall = RATE_COLUMNS.index("overall")
+        np.testing.assert_allclose(
+            self.analysis.percentiles[:, overall], [25.0, 75.0]
+        )
+        jdla = RATE_COLUMNS.index("JDLA")
+        self.assertTrue(np.isnan(self.analysis.percentiles[:, jdla]).all())
+
+    def test_priorities(self):
+        # Required gaps first (heavier first), then Recommended; items
+        # without a gap are never listed.
+        self.assertEqual(self.analysis.priorities.tolist(),
+                         [[0, 1, 2, -1], [-1, -1, -1, -1]])
+        self.assertEqual(self.analysis.item_order.tolist(), [0, 1, 2, -1])
+
+    def test_counts(self):
+        counts = self.analysis.counts
+        self.assertEqual(counts.shape, (len(ITEMS), len(STATUSES)))
+        self.assertEqual(counts.sum(axis=1).tolist(), [2] * len(ITEMS))
+        self.assertEqual(counts[3, STATUS_CODES[""]], 1)
+
+    def test_top(self):
+        analysis = analyze(matrix(["未対応"] * 4), top=2)
+        self.assertEqual(analysis.priorities.tolist(), [[0, 1]])
+
+    def test_no_organizations(self):
+        analysis = analyze(AnswerMatrix(ITEMS, (), (),
+                                        np.zeros((0, 4), np.uint8)))
+        self.assertEqual(analysis.rates.shape, (0, len(RATE_COLUMNS)))
+        self.assertEqual(analysis.item_order.tolist(), [-1] * 4)
+
+
+@unittest.skipIf(np is None, "NumPy is not installed")
+class PriorityOrderTest(unittest.TestCase):
+    def test_level_before_score(self):
+        scores = np.array([5.0, 1.0, 0.5])
+        ranks = np.array([2, 1, 0])
+        weights = np.array([5.0, 1.0, 1.0])
+        self.assertEqual(_priority_order(scores, ranks, weights, 3).tolist(),
+                         [2, 1, 0])
+
+    def test_ties_keep_item_order(self):
+        scores = np.array([[1.0, 2.0, 1.0, 0.0]])
+        ranks = np.zeros(4, dtype=int)
+        weights = np.ones(4)
+        self.assertEqual(_priority_order(scores, ranks, weights, 4).tolist(),
+                         [[1, 0, 2, -1]])
+
+
+@unittest.skipIf(np is None, "NumPy is not installed")
+class PercentileRanksTest(unittest.TestCase):
+    def test_ties_and_nan(self):
+        ranks = percentile_ranks(np.array([[1.0], [1.0], [2.0], [np.nan]]))
+        np.testing.assert_allclose(ranks[:3, 0], [100 / 3, 100 / 3, 250 / 3])
+        self.assertTrue(np.isnan(ranks[3, 0]))
+
+
+if __name__ == "__main__":
+    unittest.main()
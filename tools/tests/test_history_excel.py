@@ -0,0 +1,123 @@
+"""history_excel: the incremental rollup tables of the history store."""
+
+import tempfile
+import unittest
+from pathlib import Path
+
+from history_excel import (
+    COUNT_COLUMNS,
+    HistoryStore,
+    Record,
+    iso_date,
+    quarter,
+)
+
+
+def record(organization, assessed_on, statuses, version="1.0"):
+    """A Record answering items 1.1.A, 1.1.B, ... with `statuses`.
+
+    Every other item is Required; items after the second are chapter 2.
+    """
+    rows = tuple(
+        (f"1.1.{chr(ord('A') + i)}", 1 if i < 2 else 2,
+         "Required" if i % 2 == 0 else "Option", status, "", "")
+        for i, status in enumerate(statuses)
+    )
+    return Record(organization, assessed_on, version, rows)
+
+
+class DatesTest(unittest.TestCase):
+    def test_iso_date(self):
+        self.assertEqual(iso_date("2026年4月1日"), "2026-04-01")
+        self.assertEqual(iso_date("2026/12/31"), "2026-12-31")
+        self.assertIsNone(iso_date("2026年2月30日"))
+        self.assertIsNone(iso_date("＿＿＿＿＿"))
+        self.assertIsNone(iso_date(None))
+
+    def test_quarter(self):
+        self.assertEqual(quarter("2026-01-01"), "2026Q1")
+        self.assertEqual(quarter("2026-06-30"), "2026Q2")
+        self.assertEqual(quarter("2026-10-01"), "2026Q4")
+
+
+class HistoryStoreTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.store = HistoryStore(Path(tmp.name) / "history.sqlite3")
+        self.addCleanup(self.store.close)
+
+    def assertQuarterRollupConsistent(self):
+        """rollup_quarter must equal the sums of rollup per quarter."""
+        columns = ", ".join(COUNT_COLUMNS)
+        sums = ", ".join(f"SUM(r.{column})" for column in COUNT_COLUMNS)
+        stored = self.store.db.execute(
+            f"SELECT quarter, chapter, level, {columns} FROM rollup_quarter "
+            f"WHERE total != 0 ORDER BY 1, 2, 3"
+        ).fetchall()
+        recomputed = self.store.db.execute(
+            f"SELECT a.quarter, r.chapter, r.level, {sums} FROM rollup r "
+            f"JOIN assessments a ON a.id = r.assessment_id "
+            f"GROUP BY 1, 2, 3 ORDER BY 1, 2, 3"
+        ).fetchall()
+        self.assertEqual(stored, recomputed)
+
+    def test_rates(self):
+        self.store.add([record("A", "2026-04-01",
+                               ["対応済", "未対応", "一部対応", ""])])
+        (row,) = self.store.trend(by="total")
+        self.assertEqual((row["organization"], row["date"]),
+                         ("A", "2026-04-01"))
+        self.assertEqual((row["total"], row["done"], row["partial"],
+                          row["open"], row["blank"]), (4, 1, 1, 1, 1))
+        self.assertEqual(row["rate"], 0.25)
+        self.assertEqual(row["required_rate"], 0.5)   # 1.1.A and 1.1.C
+
+        by_chapter = self.store.trend(by="chapter")
+        self.assertEqual([(r["chapter"], r["rate"]) for r in by_chapter],
+                         [(1, 0.5), (2, 0.0)])
+
+    def test_reingest_replaces_the_assessment(self):
+        self.store.add([record("A", "2026-04-01", ["未対応", "未対応"]),
+                        record("B", "2026-05-01", ["対応済", "未対応"])])
+        self.store.add([record("A", "2026-04-01", ["対応済", "対応済"])])
+
+        self.assertEqual(self.store.counts(), (2, 4, 2))
+        rows = self.store.trend(by="total")
+        self.assertEqual([(r["organization"], r["done"]) for r in rows],
+                         [("A", 2), ("B", 1)])
+        (q2,) = self.store.trend(by="total", quarterly=True)
+        self.assertEqual((q2["quarter"], q2["assessments"]), ("2026Q2", 2))
+        self.assertEqual((q2["total"], q2["done"], q2["open"]), (4, 3, 1))
+        self.assertQuarterRollupConsistent()
+
+    def test_reingest_with_fewer_chapters(self):
+        # The replaced assessment had a chapter 2 that the new one lacks;
+        # its quarter counts must drop to zero, not linger.
+        self.store.add([record("A", "2026-07-01",
+                               ["対応済", "対応済", "未対応"])])
+        self.store.add([record("A", "2026-07-01", ["一部対応"])])
+        rows = self.store.trend(by="chapter", quarterly=True)
+        self.assertEqual([(r["chapter"], r["total"], r["partial"])
+                          for r in rows], [(1, 1, 1)])
+        self.assertQuarterRollupConsistent()
+
+    def test_versions_are_separate_assessments(self):
+        self.store.add([record("A", "2026-04-01", ["対応済"], "1.0"),
+                        record("A", "2026-04-01", ["未対応"], "1.1")])
+        self.assertEqual(self.store.counts(), (2, 2, 1))
+        self.assertEqual(
+            [r["version"] for r in self.store.trend(by="total")],
+            ["1.0", "1.1"],
+        )
+        self.assertQuarterRollupConsistent()
+
+    def test_organization_filter(self):
+        self.store.add([record("A", "2026-04-01", ["対応済"]),
+                        record("B", "2026-04-01", ["未対応"])])
+        rows = self.store.trend(by="total", organizations=["B"])
+        self.assertEqual([r["organization"] for r in rows], ["B"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+"""migrate_excel: matching old answers onto the new items."""
+
+import unittest
+
+from checklist import Answer
+from migrate_excel import fingerprint, match_answers
+
+DONE = Answer("対応済")
+PARTIAL = Answer("一部対応", note="備考")
+NONE = Answer("未対応")
+
+
+def targets(*pairs):
+    return [(number, fingerprint(text)) for number, text in pairs]
+
+
+class FingerprintTest(unittest.TestCase):
+    def test_ignores_width_case_and_punctuation(self):
+        self.assertEqual(fingerprint("ＡＩ利用規程が、定められている。"),
+                         fingerprint("ai利用規程が定められている"))
+        self.assertEqual(fingerprint("(NIST) Policy - v1"),
+                         fingerprint("nistpolicyv1"))
+
+    def test_keeps_wording(self):
+        self.assertNotEqual(fingerprint("規程が定められている"),
+                            fingerprint("規程が周知されている"))
+
+
+class MatchAnswersTest(unittest.TestCase):
+    def test_same_number_and_text(self):
+        answers, renumbered, orphans = match_answers(
+            targets(("1.1.A", "規程がある")), [("1.1.A", "規程がある", DONE)]
+        )
+        self.assertEqual(answers, {"1.1.A": DONE})
+        self.assertEqual(renumbered, 0)
+        self.assertEqual(orphans, ())
+
+    def test_renumbered_item_follows_its_text(self):
+        rows = [("1.1.A", "規程がある", DONE), ("1.1.B", "体制がある", NONE)]
+        answers, renumbered, orphans = match_answers(
+            targets(("1.1.A", "体制がある"), ("1.1.B", "規程がある")), rows
+        )
+        self.assertEqual(answers, {"1.1.A": NONE, "1.1.B": DONE})
+        self.assertEqual(renumbered, 2)
+        self.assertEqual(orphans, ())
+
+    def test_reworded_item_keeps_its_number(self):
+        answers, renumbered, orphans = match_answers(
+            targets(("1.1.A", "規程が定められ、周知されている")),
+            [("1.1.A", "規程が定められている", PARTIAL)],
+        )
+        self.assertEqual(answers, {"1.1.A": PARTIAL})
+        self.assertEqual(renumbered, 0)
+        self.assertEqual(orphans, ())
+
+    def test_equal_texts_prefer_the_same_number(self):
+        rows = [("2.1.A", "記録を残す", DONE), ("2.2.A", "記録を残す", NONE)]
+        answers, renumbered, _orphans = match_answers(
+            targets(("2.2.A", "記録を残す"), ("2.1.A", "記録を残す")), rows
+        )
+        self.assertEqual(answers, {"2.1.A": DONE, "2.2.A": NONE})
+        self.assertEqual(renumbered, 0)
+
+    def test_text_match_wins_over_number_match(self):
+        # 1.1.B was deleted and 1.1.C moved up: 1.1.B's old answer must
+        # not land on the item now numbered 1.1.B.
+        rows = [("1.1.B", "削除された項目", NONE), ("1.1.C", "残る項目", DONE)]
+        answers, renumbered, orphans = match_answers(
+            targets(("1.1.B", "残る項目")), rows
+        )
+        self.assertEqual(answers, {"1.1.B": DONE})
+        self.assertEqual(renumbered, 1)
+        self.assertEqual(orphans, (("1.1.B", "削除された項目", NONE),))
+
+    def test_each_row_is_used_once(self):
+        answers, _renumbered, orphans = match_answers(
+            targets(("1.1.A", "同じ文面"), ("1.1.B", "同じ文面")),
+            [("1.1.A", "同じ文面", DONE)],
+        )
+        self.assertEqual(answers, {"1.1.A": DONE})
+        self.assertEqual(orphans, ())
+
+    def test_unmatched_rows_are_orphans(self):
+        rows = [("9.9.Z", "なくなった項目", PARTIAL)]
+        answers, renumbered, orphans = match_answers(
+            targets(("1.1.A", "新しい項目")), rows
+        )
+        self.assertEqual(answers, {})
+        self.assertEqual(renumbered, 0)
+        self.assertEqual(orphans, tuple(rows))
+
+
+if __name__ == "__main__":
+    unittest.main()